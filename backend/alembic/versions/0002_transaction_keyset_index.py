@@ -0,0 +1,25 @@
+"""transaction keyset index
+
+Backs keyset pagination of the transaction list:
+WHERE user_id = ? ORDER BY transaction_date DESC, id DESC.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 04:01:10.583207
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_transactions_user_date_id', 'transactions', ['user_id', 'transaction_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_transactions_user_date_id', table_name='transactions')
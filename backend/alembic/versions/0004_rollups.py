@@ -0,0 +1,96 @@
+"""daily and monthly rollups
+
+Per-user, per-period, per-category totals that analytics read instead of
+scanning transactions. Existing transactions are rolled up here; from then
+on the write paths keep the tables current.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 04:01:22.731069
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Created by 0001 along with categories
+category_type = postgresql.ENUM('INCOME', 'EXPENSE', name='categorytype', create_type=False)
+
+transactions = sa.table('transactions',
+    sa.column('amount', sa.Numeric(precision=10, scale=2)),
+    sa.column('transaction_date', sa.DateTime()),
+    sa.column('user_id', sa.Integer()),
+    sa.column('category_id', sa.Integer()),
+)
+categories = sa.table('categories',
+    sa.column('id', sa.Integer()),
+    sa.column('type', category_type),
+)
+
+
+def create_rollup_table(name):
+    op.create_table(name,
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('category_type', category_type, nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'period_start', 'category_id', name=f'uq_{name}_user_period_category')
+    )
+    op.create_index(op.f(f'ix_{name}_id'), name, ['id'], unique=False)
+
+
+def populate(name, period_start):
+    """Roll up every existing transaction into the name table"""
+    now = datetime.utcnow()
+    grouped = sa.select(
+        transactions.c.user_id,
+        period_start,
+        transactions.c.category_id,
+        categories.c.type,
+        sa.func.sum(transactions.c.amount),
+        sa.func.count(),
+        sa.literal(now, sa.DateTime()),
+        sa.literal(now, sa.DateTime()),
+    ).select_from(
+        transactions.join(categories, transactions.c.category_id == categories.c.id)
+    ).group_by(transactions.c.user_id, period_start, transactions.c.category_id, categories.c.type)
+
+    columns = ['user_id', 'period_start', 'category_id', 'category_type', 'total_amount', 'transaction_count', 'created_at', 'updated_at']
+    rollups = sa.table(name, *(sa.column(column) for column in columns))
+    op.execute(rollups.insert().from_select(columns, grouped))
+
+
+def upgrade():
+    create_rollup_table('daily_rollups')
+    create_rollup_table('monthly_rollups')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        day = sa.cast(transactions.c.transaction_date, sa.Date)
+        month = sa.cast(sa.func.date_trunc('month', transactions.c.transaction_date), sa.Date)
+    else:
+        day = sa.func.date(transactions.c.transaction_date)
+        month = sa.func.strftime('%Y-%m-01', transactions.c.transaction_date)
+    populate('daily_rollups', day)
+    populate('monthly_rollups', month)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_monthly_rollups_id'), table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
+
+    op.drop_index(op.f('ix_daily_rollups_id'), table_name='daily_rollups')
+    op.drop_table('daily_rollups')
@@ -0,0 +1,98 @@
+"""balance checkpoints
+
+Month-start running balances that balance history starts from instead of
+summing a user's whole ledger. Checkpoints up to the current month are
+computed here for existing transactions; refresh_balance_checkpoints.py
+extends them afterwards.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 04:01:29.904418
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+transactions = sa.table('transactions',
+    sa.column('amount', sa.Numeric(precision=10, scale=2)),
+    sa.column('transaction_date', sa.DateTime()),
+    sa.column('user_id', sa.Integer()),
+    sa.column('category_id', sa.Integer()),
+)
+categories = sa.table('categories',
+    sa.column('id', sa.Integer()),
+    sa.column('type', postgresql.ENUM('INCOME', 'EXPENSE', name='categorytype', create_type=False)),
+)
+balance_checkpoints = sa.table('balance_checkpoints',
+    sa.column('user_id', sa.Integer()),
+    sa.column('checkpoint_date', sa.Date()),
+    sa.column('balance', sa.Numeric(precision=16, scale=2)),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime()),
+)
+
+
+def next_month(month):
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def upgrade():
+    op.create_table('balance_checkpoints',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('checkpoint_date', sa.Date(), nullable=False),
+    sa.Column('balance', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'checkpoint_date', name='uq_balance_checkpoints_user_date')
+    )
+    op.create_index(op.f('ix_balance_checkpoints_id'), 'balance_checkpoints', ['id'], unique=False)
+
+    if op.get_context().as_sql:
+        # Offline SQL can't run the computation below; refresh_balance_checkpoints.py --rebuild does the same
+        return
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        month = sa.func.to_char(transactions.c.transaction_date, 'YYYY-MM-01')
+    else:
+        month = sa.func.strftime('%Y-%m-01', transactions.c.transaction_date)
+    signed = sa.case((categories.c.type == 'INCOME', transactions.c.amount), else_=-transactions.c.amount)
+    this_month = datetime.utcnow().date().replace(day=1)
+
+    # Net change per user and month, for months before the current one
+    nets = defaultdict(dict)
+    for user_id, period, net in bind.execute(
+        sa.select(transactions.c.user_id, month, sa.func.sum(signed))
+        .select_from(transactions.join(categories, transactions.c.category_id == categories.c.id))
+        .where(transactions.c.transaction_date < datetime.combine(this_month, datetime.min.time()))
+        .group_by(transactions.c.user_id, month)
+    ):
+        nets[user_id][date.fromisoformat(period)] = Decimal(net)
+
+    # A checkpoint on each month start after the user's first transaction
+    now = datetime.utcnow()
+    for user_id, by_month in nets.items():
+        rows = []
+        current, balance = min(by_month), Decimal("0")
+        while current < this_month:
+            balance += by_month.get(current, Decimal("0"))
+            current = next_month(current)
+            rows.append({'user_id': user_id, 'checkpoint_date': current, 'balance': balance, 'created_at': now, 'updated_at': now})
+        op.bulk_insert(balance_checkpoints, rows)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_balance_checkpoints_id'), table_name='balance_checkpoints')
+    op.drop_table('balance_checkpoints')
@@ -0,0 +1,68 @@
+"""subscriptions
+
+Recurring payments found by the subscription detector, and the per-user
+watermark of the last transaction it has scanned. Both start empty: the
+first detection run per user scans their whole history.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 04:01:36.117640
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('subscriptions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('merchant_key', sa.String(), nullable=False),
+    sa.Column('band', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('cadence', sa.Enum('WEEKLY', 'MONTHLY', 'YEARLY', name='subscriptioncadence'), nullable=False),
+    sa.Column('average_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('last_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('occurrences', sa.Integer(), nullable=False),
+    sa.Column('first_date', sa.Date(), nullable=False),
+    sa.Column('last_date', sa.Date(), nullable=False),
+    sa.Column('next_expected_date', sa.Date(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'merchant_key', 'band', name='uq_subscriptions_user_merchant_band')
+    )
+    op.create_index(op.f('ix_subscriptions_id'), 'subscriptions', ['id'], unique=False)
+
+    op.create_table('subscription_scans',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('scanned_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_subscription_scans_id'), 'subscription_scans', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_subscription_scans_id'), table_name='subscription_scans')
+    op.drop_table('subscription_scans')
+
+    op.drop_index(op.f('ix_subscriptions_id'), table_name='subscriptions')
+    op.drop_table('subscriptions')
+
+    # PostgreSQL keeps enum types after their tables are dropped
+    sa.Enum(name='subscriptioncadence').drop(op.get_bind(), checkfirst=True)
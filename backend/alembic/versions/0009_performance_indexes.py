@@ -0,0 +1,45 @@
+"""performance indexes
+
+Indexes for the hot queries: per-user category lookups, per-category
+transaction filters and rollup rebuilds, category deletes, and the
+revocation list sync. On PostgreSQL they are built CONCURRENTLY, so
+existing tables stay writable during the upgrade.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 04:01:25.456157
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_categories_user_id', 'categories', ['user_id']),
+    ('ix_transactions_user_category_date', 'transactions', ['user_id', 'category_id', 'transaction_date']),
+    ('ix_transactions_category_id', 'transactions', ['category_id']),
+    ('ix_daily_rollups_category_id', 'daily_rollups', ['category_id']),
+    ('ix_monthly_rollups_category_id', 'monthly_rollups', ['category_id']),
+    ('ix_subscriptions_category_id', 'subscriptions', ['category_id']),
+    ('ix_revoked_tokens_created_at', 'revoked_tokens', ['created_at']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""archived transactions
+
+Cold storage for transactions moved out of the hot table by
+archive_transactions.py. Same columns as transactions plus archived_at;
+ids are carried over from the hot table.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 04:05:53.095303
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archived_transactions',
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('transaction_date', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_transactions_id'), 'archived_transactions', ['id'], unique=False)
+    op.create_index('ix_archived_transactions_user_content_hash', 'archived_transactions', ['user_id', 'content_hash'], unique=False)
+    op.create_index('ix_archived_transactions_user_date_id', 'archived_transactions', ['user_id', 'transaction_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_archived_transactions_user_date_id', table_name='archived_transactions')
+    op.drop_index('ix_archived_transactions_user_content_hash', table_name='archived_transactions')
+    op.drop_index(op.f('ix_archived_transactions_id'), table_name='archived_transactions')
+    op.drop_table('archived_transactions')
@@ -0,0 +1,79 @@
+"""transaction merchant key
+
+Adds merchant_key, the normalized description subscription detection groups
+by, to transactions and archived_transactions, fills it in for existing rows
+and indexes it per user so rescans of a few merchants don't read the whole
+ledger.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:12:40.518305
+"""
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+TABLES = [
+    ('transactions', 'ix_transactions_user_merchant_key'),
+    ('archived_transactions', 'ix_archived_transactions_user_merchant_key'),
+]
+
+
+def merchant_key(description):
+    # Frozen copy of transaction_service.normalize_description
+    text = unicodedata.normalize("NFKC", description or "").casefold()
+    return " ".join(re.sub(r"[\W\d_]+", " ", text).split())
+
+
+def backfill(bind, name):
+    table = sa.table(name,
+        sa.column('id', sa.Integer()),
+        sa.column('description', sa.String()),
+        sa.column('merchant_key', sa.String()),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.description)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id')).values(merchant_key=sa.bindparam('key')),
+            [{'row_id': row.id, 'key': merchant_key(row.description)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    for table, _ in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('merchant_key', sa.String(), nullable=True))
+
+    # Offline SQL can't compute the keys; run this revision online
+    if not op.get_context().as_sql:
+        for table, _ in TABLES:
+            backfill(op.get_bind(), table)
+
+    # Indexed after the backfill, so it isn't maintained row by row
+    for table, index in TABLES:
+        op.create_index(index, table, ['user_id', 'merchant_key'], unique=False)
+
+
+def downgrade():
+    for table, index in reversed(TABLES):
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('merchant_key')
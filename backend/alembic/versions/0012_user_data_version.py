@@ -0,0 +1,28 @@
+"""user data version
+
+Adds users.data_version, the per-user counter every ledger write bumps in
+its own transaction. The analytics and columnar ledger caches key their
+entries on it, so a write invalidates them in every worker process.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 09:47:03.661972
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,28 @@
+"""user last write time
+
+Adds users.last_write_at, set in the same transaction as the data_version
+bump. Read-your-writes routing reads it on the primary, so every worker
+process keeps a user who just wrote off the lagging replica.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 14:12:40.318205
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('last_write_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('last_write_at')
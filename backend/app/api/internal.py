@@ -0,0 +1,65 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from ..core.config import settings
+from ..utils.cache import analytics_cache
+from ..utils.auth import auth_cache
+from ..utils.revocation import revocation_list
+from ..utils.password_hashing import password_hasher
+from ..utils.database import (
+    SessionLocal, pool_metrics, async_pool_metrics, read_pool_metrics, async_read_pool_metrics
+)
+from ..utils.read_routing import read_router
+from ..utils.query_metrics import route_metrics
+from ..services.job_service import job_runner, job_counts
+
+def verify_internal_token(authorization: Optional[str] = Header(None)):
+    """Allow only requests bearing INTERNAL_API_TOKEN; without one configured
+    the internal endpoints don't exist"""
+    if not settings.internal_api_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.internal_api_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal API token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+# Operational metrics and stats, kept off the public API: they expose per-route
+# traffic, SQL and pool internals
+router = APIRouter(dependencies=[Depends(verify_internal_token)], include_in_schema=False)
+
+@router.get("/internal/cache-stats")
+async def cache_stats():
+    return analytics_cache.stats()
+
+@router.get("/internal/auth-cache-stats")
+async def auth_cache_stats():
+    return {**auth_cache.stats(), "revocation": revocation_list.stats()}
+
+@router.get("/internal/password-hashing-stats")
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+@router.get("/internal/db-pool-stats")
+async def db_pool_stats():
+    stats = {"sync": pool_metrics.stats(), "read_routing": read_router.stats()}
+    for metrics in (read_pool_metrics, async_pool_metrics, async_read_pool_metrics):
+        if metrics is not None:
+            stats[metrics.name] = metrics.stats()
+    return stats
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/internal/job-stats")
+def job_stats():
+    db = SessionLocal()
+    try:
+        return {**job_runner.stats(), "jobs": job_counts(db)}
+    finally:
+        db.close()
@@ -1,42 +1,51 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import func, case
 from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from ...models.transaction import Transaction
 from ...models.category import Category, CategoryType
-from ...models.user import User
-from ...utils.database import get_db
-from ...utils.auth import get_current_user
+from ...models.rollup import DailyRollup, MonthlyRollup
+from ...models.subscription import Subscription, SubscriptionCadence
+from ...utils.read_routing import get_read_db
+from ...utils.auth import CurrentUser, get_current_user
+from ...utils.cache import analytics_cache
+from ...services.trends_service import compute_trends, estimate_bucket_count, MAX_BUCKETS
+from ...services.archive_service import ledger_entity
+from ...services.balance_service import compute_balance_history
+from ...services.ledger_engine import ledger_cache, month_over_month, forecast
+from ...services.subscription_service import CADENCES
 
 router = APIRouter()
 
-@router.get("/summary")
-def get_financial_summary(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> Dict[str, Any]:
-    query = db.query(Transaction).join(Category).filter(
-        Transaction.user_id == current_user.id
-    )
+def _rollup_for_range(start_date: Optional[date], end_date: Optional[date]):
+    """Pick the coarsest rollup table that answers the date range exactly"""
+    starts_on_month = start_date is None or start_date.day == 1
+    ends_on_month = end_date is None or (end_date + timedelta(days=1)).day == 1
+    return MonthlyRollup if starts_on_month and ends_on_month else DailyRollup
 
+def _apply_period_range(query, model, start_date: Optional[date], end_date: Optional[date]):
     if start_date:
-        query = query.filter(func.date(Transaction.transaction_date) >= start_date)
+        query = query.filter(model.period_start >= start_date)
     if end_date:
-        query = query.filter(func.date(Transaction.transaction_date) <= end_date)
-
-    # Calculate total income and expenses
-    income = query.filter(Category.type == CategoryType.INCOME).with_entities(
-        func.coalesce(func.sum(Transaction.amount), 0)
-    ).scalar() or Decimal('0')
+        query = query.filter(model.period_start <= end_date)
+    return query
 
-    expenses = query.filter(Category.type == CategoryType.EXPENSE).with_entities(
-        func.coalesce(func.sum(Transaction.amount), 0)
-    ).scalar() or Decimal('0')
+def _summary(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]) -> Dict[str, Any]:
+    # Income and expenses in one pass over the rollups via conditional aggregation
+    model = _rollup_for_range(start_date, end_date)
+    query = db.query(
+        func.coalesce(func.sum(case((model.category_type == CategoryType.INCOME, model.total_amount), else_=0)), 0).label('income'),
+        func.coalesce(func.sum(case((model.category_type == CategoryType.EXPENSE, model.total_amount), else_=0)), 0).label('expenses'),
+    ).filter(
+        model.user_id == user_id
+    )
+    totals = _apply_period_range(query, model, start_date, end_date).one()
 
+    income = Decimal(totals.income or 0)
+    expenses = Decimal(totals.expenses or 0)
     balance = income - expenses
 
     return {
@@ -49,58 +58,46 @@ def get_financial_summary(
         }
     }
 
-@router.get("/spending-by-category")
-def get_spending_by_category(
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
+def _spending_by_category(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]) -> List[Dict[str, Any]]:
+    model = _rollup_for_range(start_date, end_date)
     query = db.query(
         Category.name,
         Category.color,
-        func.sum(Transaction.amount).label('total')
-    ).join(Transaction).filter(
-        Transaction.user_id == current_user.id,
-        Category.type == CategoryType.EXPENSE
+        func.sum(model.total_amount).label('total')
+    ).join(Category, model.category_id == Category.id).filter(
+        model.user_id == user_id,
+        model.category_type == CategoryType.EXPENSE,
+        model.transaction_count > 0
     )
+    results = _apply_period_range(query, model, start_date, end_date).group_by(
+        Category.id, Category.name, Category.color
+    ).all()
 
-    if start_date:
-        query = query.filter(func.date(Transaction.transaction_date) >= start_date)
-    if end_date:
-        query = query.filter(func.date(Transaction.transaction_date) <= end_date)
-
-    results = query.group_by(Category.id, Category.name, Category.color).all()
+    grand_total = sum((result.total for result in results), Decimal('0'))
 
     return [
         {
             "category": result.name,
             "color": result.color,
             "amount": float(result.total),
-            "percentage": 0  # Will be calculated on frontend
+            "percentage": round(float(result.total / grand_total * 100), 2) if grand_total else 0
         }
         for result in results
     ]
 
-@router.get("/monthly-trends")
-def get_monthly_trends(
-    year: int = Query(..., description="Year to analyze"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> Dict[str, List[Dict[str, Any]]]:
-    query = db.query(
-        extract('month', Transaction.transaction_date).label('month'),
-        Category.type,
-        func.sum(Transaction.amount).label('total')
-    ).join(Category).filter(
-        Transaction.user_id == current_user.id,
-        extract('year', Transaction.transaction_date) == year
+def _monthly_trends(db: Session, user_id: int, year: int) -> Dict[str, List[Dict[str, Any]]]:
+    results = db.query(
+        MonthlyRollup.period_start,
+        MonthlyRollup.category_type,
+        func.sum(MonthlyRollup.total_amount).label('total')
+    ).filter(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.period_start >= date(year, 1, 1),
+        MonthlyRollup.period_start < date(year + 1, 1, 1)
     ).group_by(
-        extract('month', Transaction.transaction_date),
-        Category.type
-    ).order_by('month')
-
-    results = query.all()
+        MonthlyRollup.period_start,
+        MonthlyRollup.category_type
+    ).all()
 
     # Initialize monthly data
     monthly_data = {
@@ -110,23 +107,35 @@ def get_monthly_trends(
 
     # Fill in actual data
     for result in results:
-        month_idx = int(result.month) - 1
-        if result.type == CategoryType.INCOME:
+        month_idx = result.period_start.month - 1
+        if result.category_type == CategoryType.INCOME:
             monthly_data["income"][month_idx]["amount"] = float(result.total)
         else:
             monthly_data["expenses"][month_idx]["amount"] = float(result.total)
 
     return monthly_data
 
-@router.get("/recent-transactions")
-def get_recent_transactions(
-    limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> List[Dict[str, Any]]:
-    transactions = db.query(Transaction).join(Category).filter(
-        Transaction.user_id == current_user.id
-    ).order_by(Transaction.transaction_date.desc()).limit(limit).all()
+def _recent_transactions(db: Session, user_id: int, limit: int) -> List[Dict[str, Any]]:
+    def newest(ledger, since: Optional[datetime] = None):
+        query = db.query(
+            ledger.id,
+            ledger.amount,
+            ledger.description,
+            ledger.transaction_date,
+            Category.name.label("category_name"),
+            Category.type.label("category_type"),
+            Category.color.label("category_color"),
+        ).join(Category, ledger.category_id == Category.id).filter(ledger.user_id == user_id)
+        if since is not None:
+            query = query.filter(ledger.transaction_date >= since)
+        return query.order_by(ledger.transaction_date.desc()).limit(limit).all()
+
+    rows = newest(Transaction)
+    # The hot table answers on its own unless archived rows could be among the newest
+    since = rows[-1].transaction_date if len(rows) == limit else None
+    ledger = ledger_entity(db, user_id, since)
+    if ledger is not Transaction:
+        rows = newest(ledger, since)
 
     return [
         {
@@ -135,10 +144,302 @@ def get_recent_transactions(
             "description": t.description,
             "transaction_date": t.transaction_date.isoformat(),
             "category": {
-                "name": t.category.name,
-                "type": t.category.type.value,
-                "color": t.category.color
+                "name": t.category_name,
+                "type": t.category_type.value,
+                "color": t.category_color
             }
         }
-        for t in transactions
-    ]
\ No newline at end of file
+        for t in rows
+    ]
+
+def _parse_number_list(value: str, name: str, low: float, high: float) -> List[float]:
+    try:
+        numbers = sorted({float(part) for part in value.split(",") if part.strip()})
+    except ValueError:
+        numbers = []
+    if not numbers or numbers[0] < low or numbers[-1] > high:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} must be a comma-separated list of numbers between {low:g} and {high:g}"
+        )
+    return numbers
+
+def _resolve_bucketed_range(bucket: str, start_date: Optional[date], end_date: Optional[date], tz: str):
+    """Validate tz and fill in the default one-year range for bucketed endpoints"""
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown timezone"
+        )
+
+    end_date = end_date or datetime.now(zone).date()
+    start_date = start_date or end_date - timedelta(days=365)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    if estimate_bucket_count(start_date, end_date, bucket) > MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range spans more than {MAX_BUCKETS} {bucket} buckets"
+        )
+
+    return zone, start_date, end_date
+
+@router.get("/summary")
+def get_financial_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "summary", {"start_date": start_date, "end_date": end_date},
+        lambda: _summary(db, current_user.id, start_date, end_date)
+    )
+
+@router.get("/spending-by-category")
+def get_spending_by_category(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "spending-by-category", {"start_date": start_date, "end_date": end_date},
+        lambda: _spending_by_category(db, current_user.id, start_date, end_date)
+    )
+
+@router.get("/monthly-trends")
+def get_monthly_trends(
+    year: int = Query(..., description="Year to analyze"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, List[Dict[str, Any]]]:
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "monthly-trends", {"year": year},
+        lambda: _monthly_trends(db, current_user.id, year)
+    )
+
+@router.get("/recent-transactions")
+def get_recent_transactions(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "recent-transactions", {"limit": limit},
+        lambda: _recent_transactions(db, current_user.id, limit)
+    )
+
+@router.get("/dashboard")
+def get_dashboard(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    year: Optional[int] = Query(None, description="Year for monthly trends, defaults to the current year"),
+    recent_limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Everything the home screen needs in one request: summary, spending by
+    category, monthly trends and recent transactions (one query each).
+    """
+    year = year or datetime.utcnow().year
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "dashboard",
+        {"start_date": start_date, "end_date": end_date, "year": year, "recent_limit": recent_limit},
+        lambda: {
+            "summary": _summary(db, current_user.id, start_date, end_date),
+            "spending_by_category": _spending_by_category(db, current_user.id, start_date, end_date),
+            "monthly_trends": _monthly_trends(db, current_user.id, year),
+            "recent_transactions": _recent_transactions(db, current_user.id, recent_limit),
+        }
+    )
+
+@router.get("/trends")
+def get_trends(
+    bucket: str = Query("month", pattern="^(day|week|month|quarter|year)$"),
+    start_date: Optional[date] = Query(None, description="Defaults to one year before end_date"),
+    end_date: Optional[date] = Query(None, description="Defaults to today in the given timezone"),
+    category_id: Optional[int] = None,
+    type: Optional[CategoryType] = None,
+    tz: str = Query("UTC", description="IANA timezone used to assign transactions to buckets"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Income and expense totals per day/week/month/quarter/year over any date
+    range, bucketed in SQL with a single grouped query. Empty buckets are
+    returned with zero amounts. Weeks start on Monday.
+    """
+    zone, start_date, end_date = _resolve_bucketed_range(bucket, start_date, end_date, tz)
+
+    params = {
+        "bucket": bucket, "start_date": start_date, "end_date": end_date,
+        "category_id": category_id, "type": type, "tz": tz,
+    }
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "trends", params,
+        lambda: compute_trends(
+            db, current_user.id, bucket, start_date, end_date, zone,
+            category_id=category_id, category_type=type
+        )
+    )
+
+@router.get("/balance-history")
+def get_balance_history(
+    bucket: str = Query("month", pattern="^(day|week|month|quarter|year)$"),
+    start_date: Optional[date] = Query(None, description="Defaults to one year before end_date"),
+    end_date: Optional[date] = Query(None, description="Defaults to today in the given timezone"),
+    tz: str = Query("UTC", description="IANA timezone used to assign transactions to buckets"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Signed running balance (income minus expenses, all time) at the end of
+    each bucket. The opening balance starts from the nearest balance
+    checkpoint, so only rows after it are summed.
+    """
+    zone, start_date, end_date = _resolve_bucketed_range(bucket, start_date, end_date, tz)
+
+    params = {"bucket": bucket, "start_date": start_date, "end_date": end_date, "tz": tz}
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "balance-history", params,
+        lambda: compute_balance_history(db, current_user.id, bucket, start_date, end_date, zone)
+    )
+
+@router.get("/rolling")
+def get_rolling_sums(
+    windows: str = Query("7,30,90", description="Comma-separated trailing window lengths in days"),
+    start_date: Optional[date] = Query(None, description="Defaults to 90 days before end_date"),
+    end_date: Optional[date] = Query(None, description="Defaults to today (UTC)"),
+    type: Optional[CategoryType] = Query(None, description="Only income or expenses; signed net when omitted"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Trailing N-day sums for every day in the range, computed on the cached columnar ledger"""
+    window_list = [int(w) for w in _parse_number_list(windows, "windows", 1, 366)]
+    end_date = end_date or datetime.utcnow().date()
+    start_date = start_date or end_date - timedelta(days=90)
+    _resolve_bucketed_range("day", start_date, end_date, "UTC")
+
+    def compute():
+        sums = ledger_cache.get(db, current_user.id).rolling_sums(start_date, end_date, window_list, type)
+        days = (end_date - start_date).days + 1
+        return {
+            "windows": window_list,
+            "series": [
+                {
+                    "date": (start_date + timedelta(days=i)).isoformat(),
+                    **{f"sum_{window}": round(float(sums[window][i]), 2) for window in window_list},
+                }
+                for i in range(days)
+            ]
+        }
+
+    params = {"windows": window_list, "start_date": start_date, "end_date": end_date, "type": type}
+    return analytics_cache.get_or_compute(db, current_user.id, "rolling", params, compute)
+
+@router.get("/category-percentiles")
+def get_category_percentiles(
+    percentiles: str = Query("50,75,90,95", description="Comma-separated percentiles (0-100)"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """Per-category transaction amount percentiles"""
+    percentile_list = _parse_number_list(percentiles, "percentiles", 0, 100)
+
+    def compute():
+        stats = ledger_cache.get(db, current_user.id).category_percentiles(start_date, end_date, percentile_list)
+        categories = db.query(Category).filter(Category.user_id == current_user.id).all()
+        return [
+            {
+                "category_id": category.id,
+                "category": category.name,
+                "type": category.type.value,
+                **stats[category.id],
+            }
+            for category in categories if category.id in stats
+        ]
+
+    params = {"percentiles": percentile_list, "start_date": start_date, "end_date": end_date}
+    return analytics_cache.get_or_compute(db, current_user.id, "category-percentiles", params, compute)
+
+@router.get("/month-over-month")
+def get_month_over_month(
+    months: int = Query(12, ge=1, le=120),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """Monthly income/expense totals with change from the previous month"""
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "month-over-month", {"months": months},
+        lambda: month_over_month(ledger_cache.get(db, current_user.id), months)
+    )
+
+@router.get("/forecast")
+def get_forecast(
+    months: int = Query(3, ge=1, le=24, description="Months to forecast"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Income and expense forecast for the coming months from a linear trend over
+    monthly totals, with a calendar-month seasonal adjustment once there are
+    at least 24 months of history.
+    """
+    return analytics_cache.get_or_compute(
+        db, current_user.id, "forecast", {"months": months},
+        lambda: forecast(ledger_cache.get(db, current_user.id), months)
+    )
+
+@router.get("/subscriptions")
+def get_subscriptions(
+    include_inactive: bool = Query(False, description="Include subscriptions whose next payment is overdue"),
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Recurring payments found by the subscription detector. Detection runs in the
+    background after transaction writes and in the batch job, so this is a plain
+    read of the stored results.
+    """
+    today = datetime.utcnow().date()
+    subscriptions = db.query(Subscription).filter(
+        Subscription.user_id == current_user.id
+    ).order_by(Subscription.next_expected_date, Subscription.id).all()
+
+    results = []
+    monthly_total = Decimal("0")
+    for subscription in subscriptions:
+        period, tolerance, _ = CADENCES[subscription.cadence]
+        is_active = subscription.next_expected_date + timedelta(days=tolerance) >= today
+        if not is_active and not include_inactive:
+            continue
+
+        monthly_cost = Decimal(subscription.average_amount) * Decimal(str(CADENCES[SubscriptionCadence.MONTHLY][0] / period))
+        if is_active:
+            monthly_total += monthly_cost
+        results.append({
+            "id": subscription.id,
+            "description": subscription.description,
+            "category_id": subscription.category_id,
+            "cadence": subscription.cadence.value,
+            "average_amount": float(subscription.average_amount),
+            "last_amount": float(subscription.last_amount),
+            "monthly_cost": round(float(monthly_cost), 2),
+            "occurrences": subscription.occurrences,
+            "first_date": subscription.first_date,
+            "last_date": subscription.last_date,
+            "next_expected_date": subscription.next_expected_date,
+            "confidence": subscription.confidence,
+            "is_active": is_active,
+        })
+
+    return {"subscriptions": results, "monthly_total": round(float(monthly_total), 2)}
\ No newline at end of file
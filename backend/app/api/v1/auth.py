@@ -1,15 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import timedelta
-from ...schemas.user import UserCreate, UserLogin, UserResponse, Token
+from typing import Optional
+from ...schemas.user import UserCreate, UserLogin, UserResponse, Token, RefreshRequest, LogoutRequest
 from ...models.user import User
 from ...utils.database import get_db
-from ...utils.auth import verify_password, get_password_hash, create_access_token, get_current_user
-from ...core.config import settings
+from ...utils.auth import get_current_user, get_token_claims, CurrentUser
+from ...utils.password_hashing import password_hasher, PasswordHashingOverloaded
 from ...services.category_service import create_default_categories
+from ...services.token_service import issue_tokens, rotate_refresh_token, revoke_access_token, revoke_refresh_token
 
 router = APIRouter()
 
+def _overloaded():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=UserResponse)
 def register(user: UserCreate, db: Session = Depends(get_db)):
     # Check if user already exists
@@ -20,8 +28,14 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
 
+    # Don't hold a pooled connection while waiting for the hash
+    db.rollback()
+
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = password_hasher.hash(user.password)
+    except PasswordHashingOverloaded:
+        raise _overloaded()
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -40,24 +54,54 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 def login(user: UserLogin, db: Session = Depends(get_db)):
     # Authenticate user
     db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    user_id = db_user.id if db_user else None
+    hashed_password = db_user.hashed_password if db_user else None
+
+    # Don't hold a pooled connection while waiting for the hash
+    db.rollback()
+
+    valid, new_hash = False, None
+    if user_id is not None:
+        try:
+            valid, new_hash = password_hasher.verify_and_update(user.password, hashed_password)
+        except PasswordHashingOverloaded:
+            raise _overloaded()
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
 
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": str(db_user.id)}, expires_delta=access_token_expires
-    )
+    # Upgrade hashes made with outdated parameters (e.g. fewer rounds) while we have the password
+    if new_hash:
+        db.query(User).filter(User.id == user_id).update({User.hashed_password: new_hash})
+        db.commit()
+
+    # Create access token and a refresh token starting a new session
+    return issue_tokens(db, user_id)
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/refresh", response_model=Token)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access/refresh token pair. The refresh
+    token is single-use: reusing a rotated token revokes the whole session.
+    """
+    return rotate_refresh_token(db, payload.refresh_token)
 
 @router.post("/logout")
-def logout(current_user: User = Depends(get_current_user)):
+def logout(
+    payload: Optional[LogoutRequest] = None,
+    claims: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
     """
-    Logout endpoint. Since JWT tokens are stateless, logout is handled client-side
-    by discarding the token. This endpoint simply confirms the user was authenticated.
+    Revoke the access token used for this request and, when given, the session
+    of the refresh token. Revoked access tokens are rejected from an in-memory
+    set, so the check costs no database query per request.
     """
+    revoke_access_token(db, claims)
+    if payload and payload.refresh_token:
+        revoke_refresh_token(db, payload.refresh_token, current_user.id)
     return {"message": "Successfully logged out"}
\ No newline at end of file
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ...schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
 from ...models.category import Category
-from ...models.user import User
 from ...utils.database import get_db
-from ...utils.auth import get_current_user
+from ...utils.read_routing import get_read_db
+from ...utils.auth import CurrentUser, get_current_user
+from ...utils.cache import analytics_cache
+from ...services.rollup_service import update_category_type, delete_category_rollups
+from ...services.balance_service import refresh_balance_checkpoints
+from ...services.subscription_service import delete_category_subscriptions, run_subscription_refresh
 
 router = APIRouter()
 
@@ -13,18 +17,19 @@ router = APIRouter()
 def create_category(
     category: CategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     db_category = Category(**category.dict(), user_id=current_user.id)
     db.add(db_category)
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
     db.refresh(db_category)
     return db_category
 
 @router.get("/", response_model=List[CategoryResponse])
 def get_categories(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     categories = db.query(Category).filter(Category.user_id == current_user.id).all()
     return categories
@@ -32,8 +37,8 @@ def get_categories(
 @router.get("/{category_id}", response_model=CategoryResponse)
 def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     category = db.query(Category).filter(
         Category.id == category_id,
@@ -52,8 +57,9 @@ def get_category(
 def update_category(
     category_id: int,
     category_update: CategoryUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     category = db.query(Category).filter(
         Category.id == category_id,
@@ -66,18 +72,33 @@ def update_category(
             detail="Category not found"
         )
 
-    for field, value in category_update.dict(exclude_unset=True).items():
+    updates = category_update.dict(exclude_unset=True)
+    type_changed = "type" in updates and updates["type"] != category.type
+    if type_changed:
+        update_category_type(db, category.id, updates["type"])
+
+    for field, value in updates.items():
         setattr(category, field, value)
 
+    if type_changed:
+        # Flipping a category's type flips the sign of all its transactions
+        db.flush()
+        refresh_balance_checkpoints(db, current_user.id, rebuild=True)
+
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
+    if type_changed:
+        # Only expense categories are scanned for subscriptions
+        background_tasks.add_task(run_subscription_refresh, current_user.id, full=True)
     db.refresh(category)
     return category
 
 @router.delete("/{category_id}")
 def delete_category(
     category_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     category = db.query(Category).filter(
         Category.id == category_id,
@@ -90,6 +111,12 @@ def delete_category(
             detail="Category not found"
         )
 
+    delete_category_rollups(db, category.id)
+    delete_category_subscriptions(db, category.id)
     db.delete(category)
+    db.flush()
+    refresh_balance_checkpoints(db, current_user.id, rebuild=True)
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
+    background_tasks.add_task(run_subscription_refresh, current_user.id, full=True)
     return {"detail": "Category deleted successfully"}
\ No newline at end of file
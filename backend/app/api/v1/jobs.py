@@ -0,0 +1,109 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ...schemas.job import JobCreate, JobResponse
+from ...models.job import Job, JobStatus
+from ...utils.database import get_db
+from ...utils.auth import CurrentUser, get_current_user
+from ...services.job_service import submit_job, cancel_job, delete_job_result
+
+router = APIRouter()
+
+def _get_user_job(db: Session, job_id: int, user_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    payload: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Queue a long-running job (export, yearly_report or rebuild_rollups) and return
+    immediately. Poll GET /jobs/{id} for status and progress, then download the
+    output from GET /jobs/{id}/result.
+    """
+    try:
+        return submit_job(db, current_user.id, payload.type, payload.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
+        )
+
+@router.get("/", response_model=List[JobResponse])
+def get_jobs(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    query = db.query(Job).filter(Job.user_id == current_user.id)
+    if status_filter:
+        query = query.filter(Job.status == status_filter)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return _get_user_job(db, job_id, current_user.id)
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Cancel a queued job, or ask a running one to stop at its next progress check"""
+    job = _get_user_job(db, job_id, current_user.id)
+    return cancel_job(db, job)
+
+@router.get("/{job_id}/result")
+def get_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    job = _get_user_job(db, job_id, current_user.id)
+    if job.status != JobStatus.SUCCEEDED or not job.result_path:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job has no result"
+        )
+
+    return FileResponse(
+        job.result_path,
+        media_type=job.result_media_type,
+        filename=f"{job.type}-{job.id}{os.path.splitext(job.result_path)[1]}"
+    )
+
+@router.delete("/{job_id}")
+def delete_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Delete a finished job and its result file"""
+    job = _get_user_job(db, job_id, current_user.id)
+    if job.status in (JobStatus.PENDING, JobStatus.RUNNING):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cancel the job before deleting it"
+        )
+
+    delete_job_result(job)
+    db.delete(job)
+    db.commit()
+    return {"detail": "Job deleted successfully"}
@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import codecs
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import tuple_
+from typing import List, Optional, Union
 from datetime import datetime
-from ...schemas.transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from ...schemas.transaction import (
+    TransactionCreate, TransactionResponse, TransactionUpdate, TransactionPage,
+    TransactionBulkCreate, TransactionBulkResponse, TransactionImportResponse,
+)
 from ...models.transaction import Transaction
 from ...models.category import Category
-from ...models.user import User
 from ...utils.database import get_db
-from ...utils.auth import get_current_user
+from ...utils.read_routing import get_read_db, read_session_factory
+from ...utils.auth import CurrentUser, get_current_user
+from ...utils.cache import analytics_cache
+from ...utils.pagination import encode_cursor, decode_cursor
+from ...services.transaction_service import bulk_create_transactions, compute_content_hash, normalize_description
+from ...services.rollup_service import update_rollups, rollup_entry
+from ...services.import_service import parse_csv, parse_ofx, import_transactions
+from ...services.export_service import iter_export_csv, iter_export_ndjson
+from ...services.subscription_service import run_subscription_refresh
 
 router = APIRouter()
 
 @router.post("/", response_model=TransactionResponse)
 def create_transaction(
     transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     # Verify category belongs to user
     category = db.query(Category).filter(
@@ -29,23 +43,151 @@ def create_transaction(
             detail="Category not found"
         )
 
-    db_transaction = Transaction(**transaction.dict(), user_id=current_user.id)
+    db_transaction = Transaction(
+        **transaction.dict(),
+        user_id=current_user.id,
+        content_hash=compute_content_hash(transaction.transaction_date, transaction.amount, transaction.description),
+        merchant_key=normalize_description(transaction.description)
+    )
     db.add(db_transaction)
+    update_rollups(db, added=[rollup_entry(db_transaction)])
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
+    background_tasks.add_task(run_subscription_refresh, current_user.id)
     db.refresh(db_transaction)
     return db_transaction
 
-@router.get("/", response_model=List[TransactionResponse])
+@router.post("/bulk", response_model=TransactionBulkResponse)
+def create_transactions_bulk(
+    payload: TransactionBulkCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create many transactions in a single request. Categories are validated in one
+    query and rows are written with batched multi-row inserts in one transaction.
+    Items with an unknown category are reported in `results` and skipped.
+    """
+    results = bulk_create_transactions(
+        db, current_user.id, [item.dict() for item in payload.transactions]
+    )
+    background_tasks.add_task(run_subscription_refresh, current_user.id)
+    created = sum(1 for result in results if result["id"] is not None)
+
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }
+
+@router.post("/import", response_model=TransactionImportResponse)
+def import_statement(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ofx)$", description="Defaults to the file extension"),
+    default_category_id: Optional[int] = Query(None, description="Category for rows without a matching category name"),
+    default_income_category_id: Optional[int] = Query(
+        None, description="Category for money-in rows (positive signed amounts) without a matching category name; "
+                          "defaults to default_category_id"
+    ),
+    amount_sign: str = Query(
+        "positive", pattern="^(positive|signed)$",
+        description="CSV only. positive: amounts are magnitudes and negative ones are rejected; "
+                    "signed: negative is money out, positive money in. OFX amounts are always signed."
+    ),
+    encoding: str = Query("utf-8-sig", description="Text encoding of the file, e.g. latin-1 or cp1252"),
+    date_column: str = "date",
+    amount_column: str = "amount",
+    description_column: str = "description",
+    category_column: Optional[str] = "category",
+    notes_column: Optional[str] = None,
+    date_format: Optional[str] = Query(None, description="strptime format; ISO 8601 when omitted"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Import a CSV or OFX bank statement. The upload is parsed as a stream and
+    written in fixed-size batches; lines already in the ledger (e.g. from an
+    earlier, overlapping statement) are skipped as duplicates, so an import
+    cut short can simply be repeated.
+    """
+    if format is None:
+        format = "ofx" if (file.filename or "").lower().endswith((".ofx", ".qfx")) else "csv"
+
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown encoding: {encoding}"
+        )
+
+    if format == "ofx" and default_category_id is None and default_income_category_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="OFX statements have no categories: pass default_category_id and/or default_income_category_id"
+        )
+
+    for category_id in (default_category_id, default_income_category_id):
+        if category_id is None:
+            continue
+        category = db.query(Category).filter(
+            Category.id == category_id,
+            Category.user_id == current_user.id
+        ).first()
+
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+
+    if format == "ofx":
+        records = parse_ofx(file.file, encoding=encoding)
+    else:
+        records = parse_csv(
+            file.file,
+            date_column=date_column,
+            amount_column=amount_column,
+            description_column=description_column,
+            category_column=category_column,
+            notes_column=notes_column,
+            date_format=date_format,
+            encoding=encoding,
+        )
+
+    try:
+        return import_transactions(
+            db, current_user.id, records,
+            default_category_id=default_category_id,
+            default_income_category_id=default_income_category_id,
+            signed_amounts=format == "ofx" or amount_sign == "signed",
+        )
+    finally:
+        # Batches are committed as they go, so rescan even if a later batch fails
+        background_tasks.add_task(run_subscription_refresh, current_user.id)
+
+@router.get("/", response_model=Union[TransactionPage, List[TransactionResponse]])
 def get_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the returned next_cursor. When set, skip is ignored."
+    ),
     category_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    # Load categories in the same query so serializing the nested
+    # CategoryResponse doesn't issue one lazy load per row
+    query = db.query(Transaction).options(joinedload(Transaction.category)).filter(
+        Transaction.user_id == current_user.id
+    )
 
     if category_id:
         query = query.filter(Transaction.category_id == category_id)
@@ -56,16 +198,67 @@ def get_transactions(
     if end_date:
         query = query.filter(Transaction.transaction_date <= end_date)
 
-    transactions = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
-    return transactions
+    query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+    # Legacy offset pagination, kept for clients that don't send a cursor
+    if cursor is None:
+        return query.offset(skip).limit(limit).all()
+
+    # Keyset pagination: seek past the last row of the previous page via the
+    # (user_id, transaction_date, id) index instead of scanning `skip` rows
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transaction.transaction_date, Transaction.id) < tuple_(last_date, last_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    transactions = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.transaction_date, last.id)
+
+    return {"data": transactions, "next_cursor": next_cursor}
+
+@router.get("/export")
+def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Stream the user's full ledger, oldest first, as CSV or NDJSON. Rows are read
+    through a server-side cursor with categories joined in the same query.
+    """
+    filters = {
+        "category_id": category_id, "start_date": start_date, "end_date": end_date,
+        "session_factory": read_session_factory(current_user.id),
+    }
+
+    if format == "ndjson":
+        return StreamingResponse(
+            iter_export_ndjson(current_user.id, **filters),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="transactions.ndjson"'}
+        )
+
+    return StreamingResponse(
+        iter_export_csv(current_user.id, **filters),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="transactions.csv"'}
+    )
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    transaction = db.query(Transaction).filter(
+    transaction = db.query(Transaction).options(joinedload(Transaction.category)).filter(
         Transaction.id == transaction_id,
         Transaction.user_id == current_user.id
     ).first()
@@ -82,8 +275,9 @@ def get_transaction(
 def update_transaction(
     transaction_id: int,
     transaction_update: TransactionUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
@@ -109,18 +303,31 @@ def update_transaction(
                 detail="Category not found"
             )
 
+    previous = rollup_entry(transaction)
+    previous_merchant = transaction.merchant_key
     for field, value in transaction_update.dict(exclude_unset=True).items():
         setattr(transaction, field, value)
+    transaction.content_hash = compute_content_hash(
+        transaction.transaction_date, transaction.amount, transaction.description
+    )
+    transaction.merchant_key = normalize_description(transaction.description)
 
+    update_rollups(db, added=[rollup_entry(transaction)], removed=[previous])
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
+    background_tasks.add_task(
+        run_subscription_refresh, current_user.id,
+        merchant_keys={previous_merchant, transaction.merchant_key}
+    )
     db.refresh(transaction)
     return transaction
 
 @router.delete("/{transaction_id}")
 def delete_transaction(
     transaction_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id,
@@ -133,6 +340,10 @@ def delete_transaction(
             detail="Transaction not found"
         )
 
+    update_rollups(db, removed=[rollup_entry(transaction)])
+    merchant = transaction.merchant_key
     db.delete(transaction)
+    analytics_cache.invalidate_user(db, current_user.id)
     db.commit()
+    background_tasks.add_task(run_subscription_refresh, current_user.id, merchant_keys={merchant})
     return {"detail": "Transaction deleted successfully"}
\ No newline at end of file
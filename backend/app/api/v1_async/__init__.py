@@ -0,0 +1 @@
+# Async API v1 routes, served instead of app.api.v1 when ASYNC_DATABASE is set
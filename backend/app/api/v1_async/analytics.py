@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from ..v1 import analytics as sync_analytics
+from .common import async_endpoint
+
+# The analytics endpoints are mostly served from analytics_cache and the ledger
+# cache; on a miss their grouped queries run through the async driver.
+# The NumPy-backed ones are mounted as the plain sync endpoints instead:
+# building the columnar ledger and computing over it is CPU work that would
+# block the event loop under run_sync, so FastAPI runs them in its threadpool
+# with a sync Session.
+router = APIRouter()
+
+router.get("/summary")(async_endpoint(sync_analytics.get_financial_summary))
+router.get("/spending-by-category")(async_endpoint(sync_analytics.get_spending_by_category))
+router.get("/monthly-trends")(async_endpoint(sync_analytics.get_monthly_trends))
+router.get("/recent-transactions")(async_endpoint(sync_analytics.get_recent_transactions))
+router.get("/dashboard")(async_endpoint(sync_analytics.get_dashboard))
+router.get("/trends")(async_endpoint(sync_analytics.get_trends))
+router.get("/balance-history")(async_endpoint(sync_analytics.get_balance_history))
+router.get("/rolling")(sync_analytics.get_rolling_sums)
+router.get("/category-percentiles")(sync_analytics.get_category_percentiles)
+router.get("/month-over-month")(sync_analytics.get_month_over_month)
+router.get("/forecast")(sync_analytics.get_forecast)
+router.get("/subscriptions")(async_endpoint(sync_analytics.get_subscriptions))
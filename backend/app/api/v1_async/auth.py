@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...schemas.user import UserCreate, UserLogin, UserResponse, Token
+from ...models.user import User
+from ...utils.database import get_async_db
+from ...utils.password_hashing import password_hasher, PasswordHashingOverloaded
+from ...services.category_service import create_default_categories
+from ...services.token_service import issue_tokens
+from ..v1 import auth as sync_auth
+from .common import async_endpoint
+
+router = APIRouter()
+
+@router.post("/register", response_model=UserResponse)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check if user already exists
+    db_user = await db.scalar(select(User).where(User.email == user.email))
+    if db_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+
+    # Don't hold a pooled connection while waiting for the hash
+    await db.rollback()
+
+    # Create new user
+    try:
+        hashed_password = await password_hasher.hash_async(user.password)
+    except PasswordHashingOverloaded:
+        raise sync_auth._overloaded()
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        full_name=user.full_name
+    )
+    db.add(db_user)
+    await db.commit()
+
+    # Create default categories for the new user
+    await db.run_sync(create_default_categories, db_user.id)
+
+    await db.refresh(db_user)
+    return db_user
+
+@router.post("/login", response_model=Token)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    # Authenticate user
+    row = (await db.execute(
+        select(User.id, User.hashed_password).where(User.email == user.email)
+    )).first()
+
+    # Don't hold a pooled connection while waiting for the hash
+    await db.rollback()
+
+    valid, new_hash = False, None
+    if row is not None:
+        try:
+            valid, new_hash = await password_hasher.verify_and_update_async(user.password, row.hashed_password)
+        except PasswordHashingOverloaded:
+            raise sync_auth._overloaded()
+
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
+    # Upgrade hashes made with outdated parameters (e.g. fewer rounds) while we have the password
+    if new_hash:
+        await db.execute(update(User).where(User.id == row.id).values(hashed_password=new_hash))
+        await db.commit()
+
+    # Create access token and a refresh token starting a new session
+    return await db.run_sync(issue_tokens, row.id)
+
+router.post("/refresh", response_model=Token)(async_endpoint(sync_auth.refresh))
+router.post("/logout")(async_endpoint(sync_auth.logout))
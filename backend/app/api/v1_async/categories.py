@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ...schemas.category import CategoryCreate, CategoryResponse
+from ...models.category import Category
+from ...utils.database import get_async_db
+from ...utils.auth import CurrentUser, get_current_user_async
+from ...utils.read_routing import get_async_read_db
+from ...utils.cache import analytics_cache
+from ..v1 import categories as sync_categories
+from .common import async_endpoint
+
+router = APIRouter()
+
+@router.post("/", response_model=CategoryResponse)
+async def create_category(
+    category: CategoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    db_category = Category(**category.dict(), user_id=current_user.id)
+    db.add(db_category)
+    await db.run_sync(lambda session: analytics_cache.invalidate_user(session, current_user.id))
+    await db.commit()
+    return db_category
+
+@router.get("/", response_model=List[CategoryResponse])
+async def get_categories(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    categories = await db.scalars(select(Category).where(Category.user_id == current_user.id))
+    return categories.all()
+
+@router.get("/{category_id}", response_model=CategoryResponse)
+async def get_category(
+    category_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    category = await db.scalar(select(Category).where(
+        Category.id == category_id,
+        Category.user_id == current_user.id
+    ))
+
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+
+    return category
+
+# Type changes and deletes rewrite rollups, balance checkpoints and subscriptions:
+# the logic is shared with the sync router
+router.put("/{category_id}", response_model=CategoryResponse)(async_endpoint(sync_categories.update_category))
+router.delete("/{category_id}")(async_endpoint(sync_categories.delete_category))
@@ -0,0 +1,44 @@
+import functools
+import inspect
+from typing import Any, Callable
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...utils.database import get_async_db
+from ...utils.auth import get_current_user_async
+from ...utils.read_routing import get_read_db, get_async_read_db
+
+async def run_sync_endpoint(db: AsyncSession, endpoint: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a sync app.api.v1 endpoint on an AsyncSession.
+
+    The endpoint gets the AsyncSession's underlying Session; its queries are
+    executed by the async driver through SQLAlchemy's greenlet bridge, so no
+    threadpool thread is held while waiting on the database.
+    """
+    return await db.run_sync(lambda session: endpoint(*args, db=session, **kwargs))
+
+def async_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a sync app.api.v1 endpoint as an async one with the same parameters.
+
+    Its db (primary or read) and current_user dependencies are swapped for
+    the async ones, and FastAPI resolves every other parameter before the
+    call, so defaults declared with Query() never leak into the sync function.
+    """
+    parameters = []
+    for parameter in inspect.signature(endpoint).parameters.values():
+        if parameter.name == "db":
+            read_only = parameter.default.dependency is get_read_db
+            parameter = parameter.replace(
+                annotation=AsyncSession,
+                default=Depends(get_async_read_db if read_only else get_async_db)
+            )
+        elif parameter.name == "current_user":
+            parameter = parameter.replace(default=Depends(get_current_user_async))
+        parameters.append(parameter)
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        db = kwargs.pop("db")
+        return await run_sync_endpoint(db, endpoint, **kwargs)
+
+    wrapper.__signature__ = inspect.signature(endpoint).replace(parameters=parameters)
+    return wrapper
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ...schemas.job import JobResponse
+from ...models.job import Job, JobStatus
+from ...utils.database import get_async_db
+from ...utils.auth import CurrentUser, get_current_user_async
+from ..v1 import jobs as sync_jobs
+from .common import async_endpoint
+
+router = APIRouter()
+
+router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)(async_endpoint(sync_jobs.create_job))
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    stmt = select(Job).where(Job.user_id == current_user.id)
+    if status_filter:
+        stmt = stmt.where(Job.status == status_filter)
+    return (await db.scalars(stmt.order_by(Job.id.desc()).limit(limit))).all()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    job = await db.scalar(select(Job).where(Job.id == job_id, Job.user_id == current_user.id))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+router.post("/{job_id}/cancel", response_model=JobResponse)(async_endpoint(sync_jobs.cancel))
+router.get("/{job_id}/result")(async_endpoint(sync_jobs.get_job_result))
+router.delete("/{job_id}")(async_endpoint(sync_jobs.delete_job))
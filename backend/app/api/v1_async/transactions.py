@@ -0,0 +1,138 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Union
+from datetime import datetime
+from ...schemas.transaction import (
+    TransactionCreate, TransactionResponse, TransactionUpdate, TransactionPage,
+    TransactionBulkResponse, TransactionImportResponse,
+)
+from ...models.transaction import Transaction
+from ...utils.database import get_async_db
+from ...utils.auth import CurrentUser, get_current_user_async
+from ...utils.read_routing import get_async_read_db
+from ...utils.pagination import encode_cursor, decode_cursor
+from ..v1 import transactions as sync_transactions
+from .common import async_endpoint, run_sync_endpoint
+
+router = APIRouter()
+
+async def _load_transaction(db: AsyncSession, transaction_id: int, user_id: int) -> Transaction:
+    transaction = await db.scalar(select(Transaction).options(joinedload(Transaction.category)).where(
+        Transaction.id == transaction_id,
+        Transaction.user_id == user_id
+    ))
+
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+
+    return transaction
+
+@router.post("/", response_model=TransactionResponse)
+async def create_transaction(
+    transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    created = await run_sync_endpoint(
+        db, sync_transactions.create_transaction, transaction, background_tasks, current_user=current_user
+    )
+    return await _load_transaction(db, created.id, current_user.id)
+
+# Bulk inserts and statement imports spend most of their time building rows
+# and hashing in Python. run_sync would do that on the event loop, so they are
+# mounted as the plain sync endpoints, which FastAPI runs in its threadpool
+# with a sync Session.
+router.post("/bulk", response_model=TransactionBulkResponse)(sync_transactions.create_transactions_bulk)
+router.post("/import", response_model=TransactionImportResponse)(sync_transactions.import_statement)
+
+@router.get("/", response_model=Union[TransactionPage, List[TransactionResponse]])
+async def get_transactions(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor. Pass an empty value for the first page, "
+                    "then the returned next_cursor. When set, skip is ignored."
+    ),
+    category_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    stmt = select(Transaction).options(joinedload(Transaction.category)).where(
+        Transaction.user_id == current_user.id
+    )
+
+    if category_id:
+        stmt = stmt.where(Transaction.category_id == category_id)
+
+    if start_date:
+        stmt = stmt.where(Transaction.transaction_date >= start_date)
+
+    if end_date:
+        stmt = stmt.where(Transaction.transaction_date <= end_date)
+
+    stmt = stmt.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+    if cursor is None:
+        return (await db.scalars(stmt.offset(skip).limit(limit))).all()
+
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Transaction.transaction_date, Transaction.id) < tuple_(last_date, last_id)
+        )
+
+    transactions = (await db.scalars(stmt.limit(limit + 1))).all()
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.transaction_date, last.id)
+
+    return {"data": transactions, "next_cursor": next_cursor}
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    # The stream owns a sync session and is iterated in the threadpool
+    return sync_transactions.export_transactions(
+        format=format, category_id=category_id, start_date=start_date, end_date=end_date,
+        current_user=current_user
+    )
+
+@router.get("/{transaction_id}", response_model=TransactionResponse)
+async def get_transaction(
+    transaction_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    return await _load_transaction(db, transaction_id, current_user.id)
+
+@router.put("/{transaction_id}", response_model=TransactionResponse)
+async def update_transaction(
+    transaction_id: int,
+    transaction_update: TransactionUpdate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async)
+):
+    await run_sync_endpoint(
+        db, sync_transactions.update_transaction, transaction_id, transaction_update, background_tasks,
+        current_user=current_user
+    )
+    return await _load_transaction(db, transaction_id, current_user.id)
+
+router.delete("/{transaction_id}")(async_endpoint(sync_transactions.delete_transaction))
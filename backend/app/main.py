@@ -1,13 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import auth, transactions, categories, analytics
-from app.models.base import Base
-from app.models import user, category, transaction  # Import all models to register them
-from app.utils.database import engine
+from app.models import user, category, transaction, rollup, balance_checkpoint, subscription, job, token  # Import all models to register them
 from app.core.config import settings
+from app.utils.revocation import revocation_list
+from app.utils.password_hashing import password_hasher
+from app.utils.query_metrics import QueryMetricsMiddleware
+from app.services.job_service import job_runner
+from app.api import internal
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Same API surface either way; the async routers run on AsyncSession
+if settings.async_database:
+    from app.api.v1_async import auth, transactions, categories, analytics, jobs
+else:
+    from app.api.v1 import auth, transactions, categories, analytics, jobs
 
 app = FastAPI(
     title=settings.api_title,
@@ -23,11 +28,28 @@ app.add_middleware(
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
 )
+if settings.sql_metrics_enabled:
+    app.add_middleware(QueryMetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+# /metrics and /internal/*, only with INTERNAL_API_TOKEN set and sent as a bearer token
+app.include_router(internal.router)
+
+@app.on_event("startup")
+def start_background_workers():
+    revocation_list.start()
+    if settings.job_runner == "in_process":
+        job_runner.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    job_runner.stop()
+    revocation_list.stop()
+    password_hasher.shutdown()
 
 @app.get("/")
 async def root():
@@ -35,4 +57,4 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "Personal Finance API is running"}
\ No newline at end of file
+    return {"status": "healthy", "message": "Personal Finance API is running"}
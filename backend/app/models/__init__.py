@@ -1,5 +1,10 @@
 from .user import User
 from .category import Category
-from .transaction import Transaction
+from .transaction import Transaction, ArchivedTransaction
+from .rollup import DailyRollup, MonthlyRollup
+from .balance_checkpoint import BalanceCheckpoint
+from .subscription import Subscription, SubscriptionScan
+from .job import Job
+from .token import RefreshToken, RevokedToken
 
-__all__ = ["User", "Category", "Transaction"]
\ No newline at end of file
+__all__ = ["User", "Category", "Transaction", "ArchivedTransaction", "DailyRollup", "MonthlyRollup", "BalanceCheckpoint", "Subscription", "SubscriptionScan", "Job", "RefreshToken", "RevokedToken"]
\ No newline at end of file
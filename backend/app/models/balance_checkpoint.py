@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date, ForeignKey, Numeric, UniqueConstraint
+from .base import BaseModel
+
+class BalanceCheckpoint(BaseModel):
+    """Signed balance of all of a user's transactions before checkpoint_date (a month start)"""
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("user_id", "checkpoint_date", name="uq_balance_checkpoints_user_date"),
+    )
+
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    checkpoint_date = Column(Date, nullable=False)
+    balance = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Enum
+from sqlalchemy import Column, String, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import BaseModel
@@ -9,6 +9,10 @@ class CategoryType(enum.Enum):
 
 class Category(BaseModel):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Every category listing and lookup is scoped to the user
+        Index("ix_categories_user_id", "user_id"),
+    )
 
     name = Column(String, nullable=False)
     color = Column(String, nullable=True)  # Hex color code
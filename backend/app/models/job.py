@@ -0,0 +1,39 @@
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
+import enum
+from .base import BaseModel
+
+class JobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class Job(BaseModel):
+    """A background job, claimed and executed by the job runner"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # The runner polls for the oldest runnable jobs
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    user_id = Column(ForeignKey("users.id"), nullable=False, index=True)
+    type = Column(String, nullable=False)
+    params = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    progress = Column(Float, nullable=False, default=0)  # 0..1
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=True)  # Earliest start, set by retry backoff
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    result_path = Column(String, nullable=True)
+    result_media_type = Column(String, nullable=True)
+    worker = Column(String, nullable=True)  # host:pid of the runner executing the job
+    heartbeat_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def has_result(self) -> bool:
+        return self.result_path is not None
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, Enum, ForeignKey, Index, Integer, Numeric, UniqueConstraint
+from .base import BaseModel
+from .category import CategoryType
+
+class DailyRollup(BaseModel):
+    """Per-user, per-day, per-category transaction totals"""
+    __tablename__ = "daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period_start", "category_id", name="uq_daily_rollups_user_period_category"),
+        Index("ix_daily_rollups_category_id", "category_id"),
+    )
+
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    category_id = Column(ForeignKey("categories.id"), nullable=False)
+    category_type = Column(Enum(CategoryType), nullable=False)
+    total_amount = Column(Numeric(precision=14, scale=2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+class MonthlyRollup(BaseModel):
+    """Per-user, per-month, per-category transaction totals (period_start is the 1st)"""
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period_start", "category_id", name="uq_monthly_rollups_user_period_category"),
+        Index("ix_monthly_rollups_category_id", "category_id"),
+    )
+
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    period_start = Column(Date, nullable=False)
+    category_id = Column(ForeignKey("categories.id"), nullable=False)
+    category_type = Column(Enum(CategoryType), nullable=False)
+    total_amount = Column(Numeric(precision=14, scale=2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
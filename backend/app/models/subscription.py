@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Date, DateTime, Enum, Float, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint
+import enum
+from .base import BaseModel
+
+class SubscriptionCadence(enum.Enum):
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+class Subscription(BaseModel):
+    """A recurring payment detected in a user's expense transactions"""
+    __tablename__ = "subscriptions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "merchant_key", "band", name="uq_subscriptions_user_merchant_band"),
+        Index("ix_subscriptions_category_id", "category_id"),
+    )
+
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    merchant_key = Column(String, nullable=False)  # Normalized description
+    band = Column(Integer, nullable=False)  # Amount cluster within the merchant, 0 = cheapest
+    description = Column(String, nullable=False)  # Latest original description
+    category_id = Column(ForeignKey("categories.id"), nullable=False)
+    cadence = Column(Enum(SubscriptionCadence), nullable=False)
+    average_amount = Column(Numeric(precision=10, scale=2), nullable=False)
+    last_amount = Column(Numeric(precision=10, scale=2), nullable=False)
+    occurrences = Column(Integer, nullable=False)
+    first_date = Column(Date, nullable=False)
+    last_date = Column(Date, nullable=False)
+    next_expected_date = Column(Date, nullable=False)
+    confidence = Column(Float, nullable=False)  # Share of intervals matching the cadence
+
+class SubscriptionScan(BaseModel):
+    """Per-user watermark of the last transaction the subscription detector has seen"""
+    __tablename__ = "subscription_scans"
+
+    user_id = Column(ForeignKey("users.id"), nullable=False, unique=True)
+    last_transaction_id = Column(Integer, nullable=False, default=0)
+    scanned_at = Column(DateTime, nullable=True)
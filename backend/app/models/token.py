@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
+from .base import BaseModel
+
+class RefreshToken(BaseModel):
+    """An issued refresh token. Each refresh rotates it: the old row is revoked
+    and points at its replacement; all rotations of one login share a family."""
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(64), index=True, nullable=False)
+    user_id = Column(ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by = Column(String(64), nullable=True)
+
+class RevokedToken(BaseModel):
+    """A revoked access token, kept until it would have expired anyway"""
+    __tablename__ = "revoked_tokens"
+
+    __table_args__ = (
+        # Incremental sync of the in-memory revocation list
+        Index("ix_revoked_tokens_created_at", "created_at"),
+    )
+
+    jti = Column(String(64), unique=True, nullable=False)
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
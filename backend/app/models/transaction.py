@@ -1,9 +1,21 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Numeric
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Numeric, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class Transaction(BaseModel):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Supports keyset pagination: WHERE user_id = ? ORDER BY transaction_date DESC, id DESC
+        Index("ix_transactions_user_date_id", "user_id", "transaction_date", "id"),
+        # Duplicate detection when re-importing overlapping statements
+        Index("ix_transactions_user_content_hash", "user_id", "content_hash"),
+        # Subscription rescans of the merchants touched by a write
+        Index("ix_transactions_user_merchant_key", "user_id", "merchant_key"),
+        # Per-category filters, rollup rebuilds and subscription rescans
+        Index("ix_transactions_user_category_date", "user_id", "category_id", "transaction_date"),
+        # Category type changes and deletes touch all of a category's rows
+        Index("ix_transactions_category_id", "category_id"),
+    )
 
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     description = Column(String, nullable=False)
@@ -11,6 +23,34 @@ class Transaction(BaseModel):
     transaction_date = Column(DateTime, nullable=False)
     user_id = Column(ForeignKey("users.id"), nullable=False)
     category_id = Column(ForeignKey("categories.id"), nullable=False)
+    content_hash = Column(String(64), nullable=True)  # compute_content_hash, for import dedup
+    merchant_key = Column(String, nullable=True)  # normalize_description, for subscription detection
 
     user = relationship("User", back_populates="transactions")
-    category = relationship("Category", back_populates="transactions")
\ No newline at end of file
+    category = relationship("Category", back_populates="transactions")
+
+
+class ArchivedTransaction(BaseModel):
+    """A transaction moved out of the hot table by archive_transactions.py.
+
+    Keeps the original id and timestamps. Rollups and balance checkpoints
+    are unaffected by archiving, so they still cover these rows.
+    """
+    __tablename__ = "archived_transactions"
+    __table_args__ = (
+        # Range scans when analytics or exports reach into archived periods
+        Index("ix_archived_transactions_user_date_id", "user_id", "transaction_date", "id"),
+        # Duplicate detection for imports of old statements
+        Index("ix_archived_transactions_user_content_hash", "user_id", "content_hash"),
+        Index("ix_archived_transactions_user_merchant_key", "user_id", "merchant_key"),
+    )
+
+    amount = Column(Numeric(precision=10, scale=2), nullable=False)
+    description = Column(String, nullable=False)
+    notes = Column(Text, nullable=True)
+    transaction_date = Column(DateTime, nullable=False)
+    user_id = Column(ForeignKey("users.id"), nullable=False)
+    category_id = Column(ForeignKey("categories.id"), nullable=False)
+    content_hash = Column(String(64), nullable=True)
+    merchant_key = Column(String, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Integer, DateTime
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -9,6 +9,10 @@ class User(BaseModel):
     hashed_password = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Bumped by every write to the user's ledger; analytics caches key on it
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set with data_version; reads stay on the primary for a while after it
+    last_write_at = Column(DateTime, nullable=True)
 
     transactions = relationship("Transaction", back_populates="user")
     categories = relationship("Category", back_populates="user")
\ No newline at end of file
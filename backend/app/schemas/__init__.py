@@ -1,9 +1,17 @@
-from .user import UserCreate, UserResponse, UserLogin
+from .user import UserCreate, UserResponse, UserLogin, Token, RefreshRequest, LogoutRequest
 from .category import CategoryCreate, CategoryResponse, CategoryUpdate
-from .transaction import TransactionCreate, TransactionResponse, TransactionUpdate
+from .transaction import (
+    TransactionCreate, TransactionResponse, TransactionUpdate, TransactionPage,
+    TransactionBulkCreate, TransactionBulkResult, TransactionBulkResponse,
+    TransactionImportError, TransactionImportResponse,
+)
+from .job import JobCreate, JobResponse, ExportJobParams, YearlyReportJobParams, RebuildRollupsJobParams
 
 __all__ = [
-    "UserCreate", "UserResponse", "UserLogin",
+    "UserCreate", "UserResponse", "UserLogin", "Token", "RefreshRequest", "LogoutRequest",
     "CategoryCreate", "CategoryResponse", "CategoryUpdate",
-    "TransactionCreate", "TransactionResponse", "TransactionUpdate"
+    "TransactionCreate", "TransactionResponse", "TransactionUpdate", "TransactionPage",
+    "TransactionBulkCreate", "TransactionBulkResult", "TransactionBulkResponse",
+    "TransactionImportError", "TransactionImportResponse",
+    "JobCreate", "JobResponse", "ExportJobParams", "YearlyReportJobParams", "RebuildRollupsJobParams"
 ]
\ No newline at end of file
@@ -15,6 +15,7 @@ class CategoryUpdate(BaseModel):
     name: Optional[str] = None
     color: Optional[str] = None
     icon: Optional[str] = None
+    type: Optional[CategoryType] = None
 
 class CategoryResponse(CategoryBase):
     id: int
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from ..models.job import JobStatus
+
+class ExportJobParams(BaseModel):
+    format: Literal["csv", "ndjson"] = "csv"
+    category_id: Optional[int] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+class YearlyReportJobParams(BaseModel):
+    year: int = Field(..., ge=1900, le=2100)
+
+class RebuildRollupsJobParams(BaseModel):
+    pass
+
+class JobCreate(BaseModel):
+    type: Literal["export", "yearly_report", "rebuild_rollups"]
+    params: Dict[str, Any] = {}
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: JobStatus
+    progress: float
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    has_result: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
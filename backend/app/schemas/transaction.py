@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from .category import CategoryResponse
 
 class TransactionBase(BaseModel):
@@ -27,4 +27,31 @@ class TransactionResponse(TransactionBase):
     category: CategoryResponse
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TransactionPage(BaseModel):
+    data: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+class TransactionBulkCreate(BaseModel):
+    transactions: List[TransactionCreate] = Field(..., min_length=1, max_length=10000)
+
+class TransactionBulkResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class TransactionBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TransactionBulkResult]
+
+class TransactionImportError(BaseModel):
+    line: int
+    error: str
+
+class TransactionImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[TransactionImportError]
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, insert, literal, select, union_all
+from sqlalchemy.orm import Session, aliased
+from ..models.transaction import ArchivedTransaction, Transaction
+from ..utils.cache import analytics_cache
+
+# Columns shared by the hot and archive tables, in the order of the union
+LEDGER_COLUMNS = (
+    "id", "amount", "description", "notes", "transaction_date",
+    "user_id", "category_id", "content_hash", "merchant_key", "created_at", "updated_at",
+)
+
+def latest_archived_date(db: Session, user_id: int) -> Optional[datetime]:
+    """Date of the user's newest archived transaction, or None if nothing is archived"""
+    return db.query(func.max(ArchivedTransaction.transaction_date)).filter(
+        ArchivedTransaction.user_id == user_id
+    ).scalar()
+
+def ledger_entity(db: Session, user_id: int, start: Optional[datetime] = None):
+    """Query entity over a user's hot and archived transactions.
+
+    Use it in place of Transaction in read queries that must see the whole
+    history: it exposes the same attributes (ledger.amount,
+    ledger.transaction_date, ...). When nothing from start onwards is
+    archived it is Transaction itself, so queries over recent periods don't
+    pay for the union. Both branches are already restricted to user_id and
+    start. Join categories with an explicit onclause.
+    """
+    latest = latest_archived_date(db, user_id)
+    if latest is None or (start is not None and latest < start):
+        return Transaction
+
+    branches = []
+    for model in (Transaction, ArchivedTransaction):
+        stmt = select(*(getattr(model, name) for name in LEDGER_COLUMNS)).where(model.user_id == user_id)
+        if start is not None:
+            stmt = stmt.where(model.transaction_date >= start)
+        branches.append(stmt)
+    return aliased(Transaction, union_all(*branches).subquery("ledger"), adapt_on_names=True)
+
+def archive_transactions(db: Session, user_id: int, before: datetime, batch_size: int = 5000) -> int:
+    """Move a user's transactions dated before `before` to the archive table.
+
+    Rows are copied and deleted in batches, each committed on its own, so the
+    hot table shrinks without one long transaction. Totals don't change, so
+    rollups and balance checkpoints stay valid. Returns the number of rows moved.
+    """
+    newest_id = None
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite hands out max(rowid) + 1, so archiving the newest row would let
+        # the next insert reuse an id that already exists in the archive
+        newest_id = db.query(func.max(Transaction.id)).scalar()
+
+    moved = 0
+    while True:
+        query = db.query(Transaction.id).filter(
+            Transaction.user_id == user_id,
+            Transaction.transaction_date < before
+        )
+        if newest_id is not None:
+            query = query.filter(Transaction.id != newest_id)
+        ids = [row[0] for row in query.order_by(Transaction.transaction_date, Transaction.id).limit(batch_size)]
+        if not ids:
+            break
+
+        archived_at = datetime.utcnow()
+        db.execute(insert(ArchivedTransaction).from_select(
+            [*LEDGER_COLUMNS, "archived_at"],
+            select(*(getattr(Transaction, name) for name in LEDGER_COLUMNS), literal(archived_at)).where(
+                Transaction.id.in_(ids)
+            )
+        ))
+        db.query(Transaction).filter(Transaction.id.in_(ids)).delete(synchronize_session=False)
+        analytics_cache.invalidate_user(db, user_id)
+        db.commit()
+        moved += len(ids)
+
+    return moved
@@ -0,0 +1,168 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from ..models.balance_checkpoint import BalanceCheckpoint
+from ..models.category import Category, CategoryType
+from ..models.transaction import Transaction
+from .archive_service import ledger_entity
+from .trends_service import (
+    bucket_expression, local_time_expression, local_midnight_utc, iter_buckets, next_bucket,
+)
+
+def signed_amount(ledger=Transaction):
+    """Transaction amount as it affects the balance: income adds, expenses subtract"""
+    return case((Category.type == CategoryType.INCOME, ledger.amount), else_=-ledger.amount)
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def balance_before(db: Session, user_id: int, moment: datetime) -> Decimal:
+    """Balance of all transactions before moment.
+
+    Starts from the nearest checkpoint at or before moment and only sums the
+    rows after it, instead of the user's whole history.
+    """
+    checkpoint = db.query(BalanceCheckpoint).filter(
+        BalanceCheckpoint.user_id == user_id,
+        BalanceCheckpoint.checkpoint_date <= moment.date()
+    ).order_by(BalanceCheckpoint.checkpoint_date.desc()).first()
+
+    since = datetime.combine(checkpoint.checkpoint_date, time.min) if checkpoint else None
+    ledger = ledger_entity(db, user_id, since)
+    query = db.query(func.coalesce(func.sum(signed_amount(ledger)), 0)).select_from(ledger).join(
+        Category, ledger.category_id == Category.id
+    ).filter(
+        ledger.user_id == user_id,
+        ledger.transaction_date < moment
+    )
+    opening = Decimal("0")
+    if checkpoint:
+        opening = Decimal(checkpoint.balance)
+        query = query.filter(ledger.transaction_date >= since)
+
+    return opening + Decimal(query.scalar() or 0)
+
+def apply_balance_deltas(db: Session, deltas: Dict[Tuple[int, date], Decimal]):
+    """Correct checkpoints after signed per-(user, day) balance changes.
+
+    Checkpoints sit on month starts, so a change on any day of month M shifts
+    every checkpoint from the start of month M + 1 onwards. Does not commit.
+    """
+    monthly: Dict[Tuple[int, date], Decimal] = defaultdict(Decimal)
+    for (user_id, day), delta in deltas.items():
+        monthly[(user_id, next_bucket(day.replace(day=1), "month"))] += delta
+
+    for (user_id, affected_from), delta in monthly.items():
+        if not delta:
+            continue
+        db.query(BalanceCheckpoint).filter(
+            BalanceCheckpoint.user_id == user_id,
+            BalanceCheckpoint.checkpoint_date >= affected_from
+        ).update(
+            {BalanceCheckpoint.balance: BalanceCheckpoint.balance + delta},
+            synchronize_session=False
+        )
+
+def refresh_balance_checkpoints(db: Session, user_id: int, rebuild: bool = False, until: Optional[date] = None) -> int:
+    """Create the user's missing month-start checkpoints up to until (default: this month).
+
+    Extends forward from the latest checkpoint with one grouped query; with
+    rebuild, all checkpoints are recomputed from scratch. Does not commit.
+    Returns the number of checkpoints created.
+    """
+    until = (until or datetime.utcnow().date()).replace(day=1)
+    if rebuild:
+        db.query(BalanceCheckpoint).filter(BalanceCheckpoint.user_id == user_id).delete(synchronize_session=False)
+
+    latest = db.query(BalanceCheckpoint).filter(
+        BalanceCheckpoint.user_id == user_id
+    ).order_by(BalanceCheckpoint.checkpoint_date.desc()).first()
+
+    since = datetime.combine(latest.checkpoint_date, time.min) if latest else None
+    ledger = ledger_entity(db, user_id, since)
+    month = bucket_expression(db.get_bind().dialect.name, "month", ledger.transaction_date).label("month")
+    query = db.query(month, func.sum(signed_amount(ledger)).label("net")).select_from(ledger).join(
+        Category, ledger.category_id == Category.id
+    ).filter(
+        ledger.user_id == user_id,
+        ledger.transaction_date < datetime.combine(until, time.min)
+    )
+    if latest:
+        query = query.filter(ledger.transaction_date >= since)
+    net_by_month = {_to_date(row.month): Decimal(row.net) for row in query.group_by(month).all()}
+
+    if latest:
+        start, balance = latest.checkpoint_date, Decimal(latest.balance)
+    elif net_by_month:
+        start, balance = min(net_by_month), Decimal("0")
+    else:
+        return 0
+
+    created = []
+    current = start
+    while current < until:
+        balance += net_by_month.get(current, Decimal("0"))
+        current = next_bucket(current, "month")
+        created.append({"user_id": user_id, "checkpoint_date": current, "balance": balance})
+
+    if created:
+        db.bulk_insert_mappings(BalanceCheckpoint, created)
+    return len(created)
+
+def compute_balance_history(
+    db: Session,
+    user_id: int,
+    bucket: str,
+    start_date: date,
+    end_date: date,
+    tz: ZoneInfo,
+) -> Dict[str, Any]:
+    """Running balance at the end of each bucket, via a window function over bucket nets"""
+    start_utc = local_midnight_utc(start_date, tz)
+    end_utc = local_midnight_utc(end_date + timedelta(days=1), tz)
+    opening = balance_before(db, user_id, start_utc)
+
+    ledger = ledger_entity(db, user_id, start_utc)
+    dialect = db.get_bind().dialect.name
+    period = bucket_expression(dialect, bucket, local_time_expression(dialect, tz, start_utc, end_utc, ledger.transaction_date))
+    net = func.sum(signed_amount(ledger))
+    rows = db.query(
+        period.label("period"),
+        net.label("net"),
+        func.sum(net).over(order_by=period).label("running"),
+    ).select_from(ledger).join(Category, ledger.category_id == Category.id).filter(
+        ledger.user_id == user_id,
+        ledger.transaction_date >= start_utc,
+        ledger.transaction_date < end_utc,
+    ).group_by(period).all()
+
+    by_period = {_to_date(row.period): (Decimal(row.net), Decimal(row.running)) for row in rows}
+
+    series = []
+    running = Decimal("0")
+    for period_start in iter_buckets(start_date, end_date, bucket):
+        period_net = Decimal("0")
+        if period_start in by_period:
+            period_net, running = by_period[period_start]
+        series.append({
+            "period_start": period_start.isoformat(),
+            "net": float(period_net),
+            "balance": float(opening + running),
+        })
+
+    return {
+        "bucket": bucket,
+        "timezone": tz.key,
+        "start_date": start_date,
+        "end_date": end_date,
+        "opening_balance": float(opening),
+        "series": series,
+    }
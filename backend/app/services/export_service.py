@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.category import Category
+from ..utils.database import SessionLocal
+from .archive_service import ledger_entity
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_YIELD_PER = 1000
+
+EXPORT_COLUMNS = [
+    "id", "transaction_date", "amount", "description", "notes",
+    "category_id", "category", "category_type",
+]
+
+def _export_statement(db: Session, user_id: int, start_date: Optional[datetime], end_date: Optional[datetime], category_id: Optional[int]):
+    ledger = ledger_entity(db, user_id, start_date)
+    stmt = select(
+        ledger.id,
+        ledger.transaction_date,
+        ledger.amount,
+        ledger.description,
+        ledger.notes,
+        ledger.category_id,
+        Category.name.label("category"),
+        Category.type.label("category_type"),
+    ).join(Category, ledger.category_id == Category.id).where(
+        ledger.user_id == user_id
+    )
+
+    if category_id:
+        stmt = stmt.where(ledger.category_id == category_id)
+    if start_date:
+        stmt = stmt.where(ledger.transaction_date >= start_date)
+    if end_date:
+        stmt = stmt.where(ledger.transaction_date <= end_date)
+
+    return stmt.order_by(ledger.transaction_date, ledger.id).execution_options(yield_per=EXPORT_YIELD_PER)
+
+def _iter_rows(user_id: int, session_factory=SessionLocal, **filters) -> Iterator[tuple]:
+    # The response body is produced after the request's get_db session may have
+    # been closed, so the stream owns its own session for its whole lifetime
+    db = session_factory()
+    try:
+        for partition in db.execute(_export_statement(db, user_id, **filters)).partitions():
+            yield partition
+    finally:
+        db.close()
+
+def iter_export_csv(user_id: int, **filters) -> Iterator[str]:
+    """Yield the user's ledger as CSV text, one chunk per fetched partition"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for partition in _iter_rows(user_id, **filters):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in partition:
+            writer.writerow([
+                row.id,
+                row.transaction_date.isoformat(),
+                row.amount,
+                row.description,
+                row.notes or "",
+                row.category_id,
+                row.category,
+                row.category_type.value,
+            ])
+        yield buffer.getvalue()
+
+def iter_export_ndjson(user_id: int, **filters) -> Iterator[str]:
+    """Yield the user's ledger as newline-delimited JSON, one chunk per fetched partition"""
+    for partition in _iter_rows(user_id, **filters):
+        yield "".join(
+            json.dumps({
+                "id": row.id,
+                "transaction_date": row.transaction_date.isoformat(),
+                "amount": str(row.amount),
+                "description": row.description,
+                "notes": row.notes,
+                "category_id": row.category_id,
+                "category": row.category,
+                "category_type": row.category_type.value,
+            }, ensure_ascii=False) + "\n"
+            for row in partition
+        )
@@ -0,0 +1,262 @@
+import csv
+import html
+import io
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from ..models.category import Category, CategoryType
+from ..models.transaction import ArchivedTransaction, Transaction
+from ..utils.cache import analytics_cache
+from .transaction_service import compute_content_hash, insert_transaction_rows
+
+# Rows written (and committed) per batch while importing
+IMPORT_BATCH_SIZE = 1000
+
+# Cap on per-row error messages returned, so a bad file can't grow the response unbounded
+MAX_IMPORT_ERRORS = 100
+
+class ImportRowError(ValueError):
+    pass
+
+def _parse_amount(value: str) -> Decimal:
+    try:
+        return Decimal(value.strip().replace(",", ""))
+    except (InvalidOperation, AttributeError):
+        raise ImportRowError(f"Invalid amount: {value!r}")
+
+def _parse_date(value: str, date_format: Optional[str]) -> datetime:
+    try:
+        if date_format:
+            return datetime.strptime(value.strip(), date_format)
+        return datetime.fromisoformat(value.strip())
+    except (ValueError, AttributeError):
+        raise ImportRowError(f"Invalid date: {value!r}")
+
+def parse_csv(
+    stream: BinaryIO,
+    date_column: str = "date",
+    amount_column: str = "amount",
+    description_column: str = "description",
+    category_column: Optional[str] = "category",
+    notes_column: Optional[str] = None,
+    date_format: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+) -> Iterator[Dict[str, Any]]:
+    """Yield one parsed record per CSV line without reading the whole file.
+
+    Malformed lines become error records. If the file stops decoding as
+    encoding, an error record is yielded and parsing stops there.
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    reader = csv.DictReader(text)
+
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield {"line": reader.line_num + 1, "error": f"Not valid {encoding} text after line {reader.line_num}; "
+                                                      "the rest of the file was not imported"}
+            return
+        except csv.Error as e:
+            yield {"line": reader.line_num, "error": f"Malformed CSV: {e}"}
+            continue
+
+        line = reader.line_num
+        try:
+            yield {
+                "line": line,
+                "transaction_date": _parse_date(row.get(date_column), date_format),
+                "amount": _parse_amount(row.get(amount_column)),
+                "description": (row.get(description_column) or "").strip(),
+                "category": (row.get(category_column) or "").strip() if category_column else "",
+                "notes": (row.get(notes_column) or None) if notes_column else None,
+            }
+        except ImportRowError as e:
+            yield {"line": line, "error": str(e)}
+
+def _iter_ofx_tags(stream: BinaryIO, encoding: str, chunk_size: int = 64 * 1024) -> Iterator[tuple]:
+    """Tokenize an OFX (SGML or XML) document into (tag, value) pairs chunk by chunk"""
+    text = io.TextIOWrapper(stream, encoding=encoding, errors="replace")
+    buffer = ""
+    while True:
+        chunk = text.read(chunk_size)
+        if not chunk:
+            break
+        parts = (buffer + chunk).split("<")
+        # The text after the last "<" may continue in the next chunk
+        buffer = parts.pop()
+        for part in parts:
+            if ">" in part:
+                tag, _, value = part.partition(">")
+                yield tag.strip().upper(), value.strip()
+    if ">" in buffer:
+        tag, _, value = buffer.partition(">")
+        yield tag.strip().upper(), value.strip()
+
+_OFX_DATE = re.compile(r"^(\d{8})(\d{6})?")
+
+def _parse_ofx_date(value: str) -> datetime:
+    match = _OFX_DATE.match(value)
+    if not match:
+        raise ImportRowError(f"Invalid date: {value!r}")
+    return datetime.strptime(match.group(1) + (match.group(2) or "000000"), "%Y%m%d%H%M%S")
+
+def parse_ofx(stream: BinaryIO, encoding: str = "utf-8") -> Iterator[Dict[str, Any]]:
+    """Yield one parsed record per <STMTTRN> block of an OFX statement.
+
+    Amounts keep the statement's sign (negative for money out); records have
+    no category.
+    """
+    current = None
+    index = 0
+    for tag, value in _iter_ofx_tags(stream, encoding):
+        if tag == "STMTTRN":
+            current = {}
+        elif tag == "/STMTTRN" and current is not None:
+            index += 1
+            try:
+                yield {
+                    "line": index,
+                    "transaction_date": _parse_ofx_date(current.get("DTPOSTED", "")),
+                    "amount": _parse_amount(current.get("TRNAMT", "")),
+                    "description": current.get("NAME") or current.get("MEMO") or "",
+                    "category": "",
+                    "notes": current.get("MEMO") if current.get("NAME") else None,
+                }
+            except ImportRowError as e:
+                yield {"line": index, "error": str(e)}
+            current = None
+        elif current is not None and not tag.startswith("/") and value:
+            # XML and SGML statements escape &, < and > in NAME and MEMO
+            current[tag] = html.unescape(value)
+
+def _batched(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def import_transactions(
+    db: Session,
+    user_id: int,
+    records: Iterator[Dict[str, Any]],
+    default_category_id: Optional[int] = None,
+    default_income_category_id: Optional[int] = None,
+    signed_amounts: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Write parsed statement records for a user in fixed-size batches.
+
+    Category names are resolved against the user's categories once up front;
+    rows without a matching name use default_category_id, or for money in
+    default_income_category_id when given. Without signed_amounts, amounts
+    are magnitudes in the category's direction and negative ones are
+    rejected. With it, negative amounts are money out and must land in an
+    expense category, positive ones in an income category.
+
+    Rows whose content hash already existed for the user before the import
+    started are skipped, so overlapping statements can be re-imported safely.
+    Each batch is committed on its own to keep memory and transaction size flat.
+    """
+    categories = {}
+    category_types = {}
+    for category_id, name, category_type in db.query(Category.id, Category.name, Category.type).filter(
+        Category.user_id == user_id
+    ):
+        categories[name.strip().lower()] = category_id
+        category_types[category_id] = category_type
+
+    # Only rows present before this import count as duplicates; identical lines
+    # within the file (e.g. two equal purchases on one day) are all kept
+    max_existing_id = db.query(Transaction.id).filter(
+        Transaction.user_id == user_id
+    ).order_by(Transaction.id.desc()).limit(1).scalar() or 0
+
+    summary = {"imported": 0, "duplicates": 0, "failed": 0, "errors": []}
+
+    def fail(line, message):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_IMPORT_ERRORS:
+            summary["errors"].append({"line": line, "error": message})
+
+    for batch in _batched(records, batch_size):
+        rows = []
+        for record in batch:
+            if "error" in record:
+                fail(record["line"], record["error"])
+                continue
+            if not record["description"]:
+                fail(record["line"], "Missing description")
+                continue
+
+            amount = record["amount"]
+            direction = None
+            if signed_amounts:
+                if amount > 0:
+                    direction = CategoryType.INCOME
+                elif amount < 0:
+                    direction = CategoryType.EXPENSE
+            elif amount < 0:
+                fail(record["line"], f"Negative amount {amount}; import with signed amounts if negative means money out")
+                continue
+
+            category_id = categories.get(record["category"].lower())
+            if category_id is None:
+                category_id = default_category_id
+                if direction == CategoryType.INCOME and default_income_category_id is not None:
+                    category_id = default_income_category_id
+            if category_id is None:
+                fail(record["line"], f"Unknown category: {record['category']!r}")
+                continue
+            if direction is not None and category_types[category_id] != direction:
+                fail(record["line"], f"Amount {amount} doesn't match {category_types[category_id].value} category")
+                continue
+
+            # Amounts are stored unsigned; the category type carries the direction
+            amount = abs(amount)
+            rows.append({
+                "amount": amount,
+                "description": record["description"],
+                "notes": record["notes"],
+                "transaction_date": record["transaction_date"],
+                "category_id": category_id,
+                "user_id": user_id,
+                "content_hash": compute_content_hash(record["transaction_date"], amount, record["description"]),
+            })
+
+        if not rows:
+            continue
+
+        hashes = {row["content_hash"] for row in rows}
+        existing = {
+            row.content_hash for row in db.query(Transaction.content_hash).filter(
+                Transaction.user_id == user_id,
+                Transaction.id <= max_existing_id,
+                Transaction.content_hash.in_(hashes)
+            )
+        }
+        # Statements old enough to overlap archived rows
+        existing.update(
+            row.content_hash for row in db.query(ArchivedTransaction.content_hash).filter(
+                ArchivedTransaction.user_id == user_id,
+                ArchivedTransaction.content_hash.in_(hashes)
+            )
+        )
+        new_rows = [row for row in rows if row["content_hash"] not in existing]
+        summary["duplicates"] += len(rows) - len(new_rows)
+
+        if new_rows:
+            insert_transaction_rows(db, new_rows)
+            analytics_cache.invalidate_user(db, user_id)
+            db.commit()
+            summary["imported"] += len(new_rows)
+
+    return summary
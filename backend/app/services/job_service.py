@@ -0,0 +1,431 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.category import Category, CategoryType
+from ..models.job import Job, JobStatus
+from ..models.rollup import MonthlyRollup
+from ..schemas.job import ExportJobParams, YearlyReportJobParams, RebuildRollupsJobParams
+from ..utils.cache import analytics_cache
+from ..utils.database import SessionLocal
+from .archive_service import ledger_entity
+from .balance_service import refresh_balance_checkpoints
+from .export_service import iter_export_csv, iter_export_ndjson
+from .rollup_service import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress/heartbeat writes of a running job
+PROGRESS_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation of its job was requested"""
+
+
+class JobContext:
+    """What a job handler sees of its job: progress reporting, cancellation
+    checks and where to write its result file"""
+
+    def __init__(self, job_id: int, user_id: int, worker: str):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.worker = worker
+        self._last_write = 0.0
+        self.files = []
+
+    def progress(self, fraction: float, force: bool = False):
+        """Record progress (0..1) and a heartbeat; raises JobCancelled if cancellation was requested"""
+        self._report({Job.progress: min(max(fraction, 0.0), 1.0)}, force)
+
+    def heartbeat(self):
+        """Record a heartbeat without changing progress, for steps that can't
+        measure theirs; raises JobCancelled if cancellation was requested"""
+        self._report({}, force=False)
+
+    def _report(self, values: Dict[Any, Any], force: bool):
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == self.job_id, Job.worker == self.worker).update(
+                {**values, Job.heartbeat_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+            cancel_requested = db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar()
+        finally:
+            db.close()
+
+        if cancel_requested:
+            raise JobCancelled()
+
+    def result_file(self, extension: str) -> str:
+        os.makedirs(settings.job_results_dir, exist_ok=True)
+        path = os.path.abspath(os.path.join(settings.job_results_dir, f"job-{self.job_id}.{extension}"))
+        self.files.append(path)
+        return path
+
+    def discard_files(self):
+        """Remove partial output of an attempt that did not succeed"""
+        for path in self.files:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _export_job(ctx: JobContext, params: Dict[str, Any]) -> Tuple[str, str]:
+    """Full-history (or filtered) ledger export written to a file"""
+    options = ExportJobParams(**params)
+    filters = {"category_id": options.category_id, "start_date": options.start_date, "end_date": options.end_date}
+
+    db = SessionLocal()
+    try:
+        ledger = ledger_entity(db, ctx.user_id, options.start_date)
+        query = db.query(func.count(ledger.id)).filter(ledger.user_id == ctx.user_id)
+        if options.category_id:
+            query = query.filter(ledger.category_id == options.category_id)
+        if options.start_date:
+            query = query.filter(ledger.transaction_date >= options.start_date)
+        if options.end_date:
+            query = query.filter(ledger.transaction_date <= options.end_date)
+        total = query.scalar() or 0
+    finally:
+        db.close()
+
+    if options.format == "ndjson":
+        chunks, media_type = iter_export_ndjson(ctx.user_id, **filters), "application/x-ndjson"
+    else:
+        chunks, media_type = iter_export_csv(ctx.user_id, **filters), "text/csv"
+
+    path = ctx.result_file(options.format)
+    lines = 0
+    # closing() releases the export's server-side cursor if the job is cancelled
+    with closing(chunks), open(path, "w", encoding="utf-8", newline="") as out:
+        for chunk in chunks:
+            out.write(chunk)
+            lines += chunk.count("\n")
+            if total:
+                ctx.progress(lines / total)
+    return path, media_type
+
+
+def _yearly_report_job(ctx: JobContext, params: Dict[str, Any]) -> Tuple[str, str]:
+    """Month-by-month and per-category income/expense report for one year"""
+    options = YearlyReportJobParams(**params)
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            MonthlyRollup.period_start,
+            MonthlyRollup.category_id,
+            MonthlyRollup.category_type,
+            Category.name,
+            MonthlyRollup.total_amount,
+            MonthlyRollup.transaction_count,
+        ).join(Category, MonthlyRollup.category_id == Category.id).filter(
+            MonthlyRollup.user_id == ctx.user_id,
+            MonthlyRollup.period_start >= date(options.year, 1, 1),
+            MonthlyRollup.period_start < date(options.year + 1, 1, 1),
+        ).order_by(MonthlyRollup.period_start).all()
+    finally:
+        db.close()
+    ctx.progress(0.5, force=True)
+
+    months = {month: {"month": f"{options.year}-{month:02d}", "income": Decimal("0"), "expenses": Decimal("0")} for month in range(1, 13)}
+    categories: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        key = "income" if row.category_type == CategoryType.INCOME else "expenses"
+        months[row.period_start.month][key] += Decimal(row.total_amount)
+        category = categories.setdefault(row.category_id, {
+            "category_id": row.category_id,
+            "category_name": row.name,
+            "type": row.category_type.value,
+            "total": Decimal("0"),
+            "transaction_count": 0,
+            "monthly": [0.0] * 12,
+        })
+        category["total"] += Decimal(row.total_amount)
+        category["transaction_count"] += row.transaction_count
+        category["monthly"][row.period_start.month - 1] = float(row.total_amount)
+
+    income = sum(month["income"] for month in months.values())
+    expenses = sum(month["expenses"] for month in months.values())
+    report = {
+        "year": options.year,
+        "total_income": float(income),
+        "total_expenses": float(expenses),
+        "balance": float(income - expenses),
+        "months": [
+            {**month, "income": float(month["income"]), "expenses": float(month["expenses"]),
+             "net": float(month["income"] - month["expenses"])}
+            for month in months.values()
+        ],
+        "categories": sorted(
+            ({**category, "total": float(category["total"])} for category in categories.values()),
+            key=lambda category: category["total"], reverse=True
+        ),
+    }
+
+    path = ctx.result_file("json")
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump(report, out, ensure_ascii=False)
+    return path, "application/json"
+
+
+def _rebuild_rollups_job(ctx: JobContext, params: Dict[str, Any]) -> None:
+    """Recompute the user's rollups and balance checkpoints from their transactions"""
+    RebuildRollupsJobParams(**params)
+    db = SessionLocal()
+    try:
+        # Heartbeats from inside the rebuild keep a long one from looking stale and being requeued
+        rebuild_rollups(db, user_id=ctx.user_id, heartbeat=ctx.heartbeat)
+        ctx.progress(0.5, force=True)
+        refresh_balance_checkpoints(db, ctx.user_id, rebuild=True)
+        analytics_cache.invalidate_user(db, ctx.user_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# type -> (params model, handler). Handlers return (result path, media type) or None.
+JOB_HANDLERS: Dict[str, Tuple[Any, Callable[[JobContext, Dict[str, Any]], Optional[Tuple[str, str]]]]] = {
+    "export": (ExportJobParams, _export_job),
+    "yearly_report": (YearlyReportJobParams, _yearly_report_job),
+    "rebuild_rollups": (RebuildRollupsJobParams, _rebuild_rollups_job),
+}
+
+
+def submit_job(db: Session, user_id: int, job_type: str, params: Dict[str, Any]) -> Job:
+    """Validate params and enqueue a job. Commits. Raises pydantic's ValidationError on bad params."""
+    params_model, _ = JOB_HANDLERS[job_type]
+    validated = params_model(**params)
+    job = Job(
+        user_id=user_id,
+        type=job_type,
+        params=validated.model_dump_json(),
+        status=JobStatus.PENDING,
+        max_attempts=settings.job_max_attempts,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    job_runner.wake()
+    return job
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    """Cancel a pending job immediately; a running job stops at its next progress check. Commits."""
+    if job.status == JobStatus.PENDING:
+        db.query(Job).filter(Job.id == job.id, Job.status == JobStatus.PENDING).update(
+            {Job.status: JobStatus.CANCELLED, Job.cancel_requested: True, Job.finished_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+    elif job.status == JobStatus.RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def delete_job_result(job: Job):
+    if job.result_path and os.path.exists(job.result_path):
+        os.remove(job.result_path)
+
+
+def recover_stale_jobs(db: Session) -> int:
+    """Requeue running jobs whose runner stopped sending heartbeats (e.g. it crashed). Commits."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.job_stale_seconds)
+    stale = or_(Job.heartbeat_at < cutoff, Job.heartbeat_at.is_(None))
+    requeued = db.query(Job).filter(
+        Job.status == JobStatus.RUNNING, stale, Job.attempts < Job.max_attempts, Job.cancel_requested.is_(False)
+    ).update({Job.status: JobStatus.PENDING, Job.worker: None}, synchronize_session=False)
+    db.query(Job).filter(Job.status == JobStatus.RUNNING, stale).update(
+        {Job.status: JobStatus.FAILED, Job.error: "Runner stopped responding", Job.finished_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+    return requeued
+
+
+def claim_next_job(db: Session, worker: str) -> Optional[int]:
+    """Atomically move the oldest runnable pending job to running for this worker. Commits."""
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(
+        Job.status == JobStatus.PENDING,
+        or_(Job.run_after.is_(None), Job.run_after <= now),
+    ).order_by(Job.id).limit(5).all()
+
+    for (job_id,) in candidates:
+        # Compare-and-set on status, so two runners never claim the same job
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == JobStatus.PENDING).update({
+            Job.status: JobStatus.RUNNING,
+            Job.worker: worker,
+            Job.attempts: Job.attempts + 1,
+            Job.started_at: now,
+            Job.heartbeat_at: now,
+            Job.progress: 0,
+        }, synchronize_session=False)
+        db.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def execute_job(job_id: int, worker: str):
+    """Run a claimed job's handler and record the outcome, scheduling a retry on failure"""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).one()
+        ctx = JobContext(job.id, job.user_id, worker)
+        values: Dict[Any, Any] = {Job.finished_at: datetime.utcnow()}
+        try:
+            _, handler = JOB_HANDLERS[job.type]
+            ctx.progress(0.0, force=True)
+            result = handler(ctx, json.loads(job.params))
+        except JobCancelled:
+            ctx.discard_files()
+            values[Job.status] = JobStatus.CANCELLED
+        except Exception as e:
+            ctx.discard_files()
+            db.refresh(job)
+            values[Job.error] = f"{type(e).__name__}: {e}"
+            if job.cancel_requested:
+                values[Job.status] = JobStatus.CANCELLED
+            elif job.attempts < job.max_attempts:
+                backoff = settings.job_retry_backoff_seconds * 2 ** (job.attempts - 1)
+                values.update({
+                    Job.status: JobStatus.PENDING,
+                    Job.run_after: datetime.utcnow() + timedelta(seconds=backoff),
+                    Job.finished_at: None,
+                    Job.worker: None,
+                })
+            else:
+                values[Job.status] = JobStatus.FAILED
+        else:
+            values.update({Job.status: JobStatus.SUCCEEDED, Job.progress: 1.0, Job.error: None})
+            if result:
+                values.update({Job.result_path: result[0], Job.result_media_type: result[1]})
+
+        # Only the worker that still owns the job records the outcome
+        db.query(Job).filter(Job.id == job_id, Job.worker == worker, Job.status == JobStatus.RUNNING).update(
+            values, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class JobRunner:
+    """Claims pending jobs from the jobs table and runs them in a bounded thread pool.
+
+    Runs inside the API process (JOB_RUNNER=in_process) or standalone via
+    run_jobs.py. Several runners may share a database: claiming is atomic.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._slots = threading.BoundedSemaphore(workers)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self.completed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._thread = threading.Thread(target=self.run_forever, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def wake(self):
+        """Dispatch without waiting for the next poll (e.g. right after a submit)"""
+        self._wake.set()
+
+    def run_forever(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        last_recovery = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_recovery > settings.job_stale_seconds / 4:
+                    with closing(SessionLocal()) as db:
+                        recover_stale_jobs(db)
+                    last_recovery = time.monotonic()
+                self.dispatch()
+            except Exception:
+                # E.g. the database is briefly unavailable; try again on the next poll
+                logger.exception("Job runner %s failed to recover or dispatch jobs", self.name)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def dispatch(self):
+        """Claim jobs while there are free workers"""
+        while not self._stop.is_set() and self._slots.acquire(blocking=False):
+            try:
+                with closing(SessionLocal()) as db:
+                    job_id = claim_next_job(db, self.name)
+            except Exception:
+                self._slots.release()
+                raise
+            if job_id is None:
+                self._slots.release()
+                return
+            self._pool.submit(self._run, job_id)
+
+    def _run(self, job_id: int):
+        try:
+            execute_job(job_id, self.name)
+        except Exception:
+            # The outcome couldn't be recorded; recover_stale_jobs requeues the job
+            logger.exception("Job %s failed outside its handler", job_id)
+        finally:
+            self.completed += 1
+            self._slots.release()
+            self.wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"worker": self.name, "running": self.running, "workers": self.workers, "completed": self.completed}
+
+
+def job_counts(db: Session) -> Dict[str, int]:
+    counts = defaultdict(int)
+    for status, count in db.query(Job.status, func.count(Job.id)).group_by(Job.status).all():
+        counts[status.value] = count
+    return dict(counts)
+
+
+job_runner = JobRunner(settings.job_workers, settings.job_poll_interval_seconds)
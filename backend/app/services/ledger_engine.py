@@ -0,0 +1,271 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.category import Category, CategoryType
+from ..utils.cache import analytics_cache
+from .archive_service import ledger_entity
+
+# Rows fetched per round trip while loading a ledger
+LEDGER_LOAD_CHUNK = 10000
+
+
+class ColumnarLedger:
+    """A user's transactions as parallel NumPy arrays, sorted by date.
+
+    dates are datetime64[D], amounts are unsigned float64, category_ids are
+    int64 and is_income marks rows whose category is an income category.
+    """
+
+    def __init__(self, dates: np.ndarray, amounts: np.ndarray, category_ids: np.ndarray, is_income: np.ndarray):
+        self.dates = dates
+        self.amounts = amounts
+        self.category_ids = category_ids
+        self.is_income = is_income
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.amounts.nbytes + self.category_ids.nbytes + self.is_income.nbytes
+
+    @classmethod
+    def load(cls, db: Session, user_id: int) -> "ColumnarLedger":
+        """Load with a single four-column projection, converting it chunk by chunk.
+
+        Day truncation, float conversion and the income flag are done in SQL
+        so rows arrive as plain scalars NumPy can convert without per-row
+        Decimal/Enum/datetime processing.
+        """
+        ledger = ledger_entity(db, user_id)
+        stmt = select(
+            func.date(ledger.transaction_date),
+            cast(ledger.amount, Float),
+            ledger.category_id,
+            case((Category.type == CategoryType.INCOME, 1), else_=0),
+        ).join(Category, ledger.category_id == Category.id).where(
+            ledger.user_id == user_id
+        ).order_by(ledger.transaction_date).execution_options(yield_per=LEDGER_LOAD_CHUNK)
+
+        chunks = []
+        for partition in db.execute(stmt).partitions():
+            dates, amounts, category_ids, is_income = zip(*partition)
+            chunks.append((
+                np.array(dates, dtype="datetime64[D]"),
+                np.array(amounts, dtype=np.float64),
+                np.array(category_ids, dtype=np.int64),
+                np.array(is_income, dtype=bool),
+            ))
+
+        if not chunks:
+            return cls(
+                np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64),
+                np.array([], dtype=np.int64), np.array([], dtype=bool),
+            )
+        return cls(*(np.concatenate(column) for column in zip(*chunks)))
+
+    def _mask(self, start: Optional[date], end: Optional[date], kind: Optional[CategoryType]) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if start:
+            mask &= self.dates >= np.datetime64(start, "D")
+        if end:
+            mask &= self.dates <= np.datetime64(end, "D")
+        if kind == CategoryType.INCOME:
+            mask &= self.is_income
+        elif kind == CategoryType.EXPENSE:
+            mask &= ~self.is_income
+        return mask
+
+    def daily_totals(self, start: date, end: date, kind: Optional[CategoryType]) -> np.ndarray:
+        """Totals per day over [start, end] (signed income minus expenses when kind is None)"""
+        origin = np.datetime64(start, "D")
+        days = int((np.datetime64(end, "D") - origin).astype(int)) + 1
+        mask = self._mask(start, end, kind)
+        amounts = self.amounts[mask]
+        if kind is None:
+            amounts = np.where(self.is_income[mask], amounts, -amounts)
+        offsets = (self.dates[mask] - origin).astype(np.int64)
+        return np.bincount(offsets, weights=amounts, minlength=days)
+
+    def rolling_sums(self, start: date, end: date, windows: Sequence[int], kind: Optional[CategoryType]) -> Dict[int, np.ndarray]:
+        """Trailing window sums for each day in [start, end], including days before start"""
+        lookback = max(windows) - 1
+        history_start = (np.datetime64(start, "D") - lookback).astype(date)
+        totals = self.daily_totals(history_start, end, kind)
+        cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+        index = np.arange(lookback, len(totals)) + 1
+        return {window: cumulative[index] - cumulative[index - window] for window in windows}
+
+    def category_percentiles(self, start: Optional[date], end: Optional[date], percentiles: Sequence[float]) -> Dict[int, Dict[str, Any]]:
+        """Per-category count and amount percentiles, grouped with one sort"""
+        mask = self._mask(start, end, None)
+        category_ids = self.category_ids[mask]
+        amounts = self.amounts[mask]
+        if not len(amounts):
+            return {}
+
+        order = np.lexsort((amounts, category_ids))
+        category_ids, amounts = category_ids[order], amounts[order]
+        boundaries = np.flatnonzero(np.diff(category_ids)) + 1
+        starts = np.concatenate(([0], boundaries))
+
+        results = {}
+        for category_id, group in zip(category_ids[starts], np.split(amounts, boundaries)):
+            values = np.percentile(group, percentiles)
+            results[int(category_id)] = {
+                "count": int(len(group)),
+                "total": float(group.sum()),
+                **{f"p{p:g}": float(v) for p, v in zip(percentiles, values)},
+            }
+        return results
+
+    def monthly_totals(self) -> Dict[str, np.ndarray]:
+        """Income and expense totals per calendar month from the first to the last month"""
+        if not len(self):
+            return {"months": np.array([], dtype="datetime64[M]"), "income": np.array([]), "expenses": np.array([])}
+        months = self.dates.astype("datetime64[M]")
+        first = months[0]
+        offsets = (months - first).astype(np.int64)
+        size = int(offsets[-1]) + 1
+        return {
+            "months": first + np.arange(size),
+            "income": np.bincount(offsets, weights=np.where(self.is_income, self.amounts, 0.0), minlength=size),
+            "expenses": np.bincount(offsets, weights=np.where(self.is_income, 0.0, self.amounts), minlength=size),
+        }
+
+
+def month_over_month(ledger: ColumnarLedger, months: int) -> List[Dict[str, Any]]:
+    """Monthly totals with absolute and percentage change from the previous month"""
+    totals = ledger.monthly_totals()
+    changes = {}
+    for key in ("income", "expenses"):
+        values = totals[key]
+        previous = np.concatenate(([np.nan], values[:-1]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes[key] = (values - previous, np.where(previous > 0, (values - previous) / previous * 100, np.nan))
+
+    def optional(value, digits=None):
+        if np.isnan(value):
+            return None
+        return round(float(value), digits) if digits else float(value)
+
+    rows = [
+        {
+            "month": str(month) + "-01",
+            "income": float(totals["income"][i]),
+            "expenses": float(totals["expenses"][i]),
+            "income_delta": optional(changes["income"][0][i]),
+            "expenses_delta": optional(changes["expenses"][0][i]),
+            "income_change_pct": optional(changes["income"][1][i], 2),
+            "expenses_change_pct": optional(changes["expenses"][1][i], 2),
+        }
+        for i, month in enumerate(totals["months"])
+    ]
+    return rows[-months:]
+
+
+def forecast(ledger: ColumnarLedger, horizon: int) -> Dict[str, Any]:
+    """Linear trend per series, plus a calendar-month seasonal term with 24+ months of history"""
+    totals = ledger.monthly_totals()
+    months = totals["months"]
+    count = len(months)
+    if count == 0:
+        return {"method": None, "history_months": 0, "forecast": []}
+
+    x = np.arange(count, dtype=np.float64)
+    future_x = np.arange(count, count + horizon, dtype=np.float64)
+    future_months = months[-1] + np.arange(1, horizon + 1)
+    seasonal = count >= 24
+
+    predictions = {}
+    for key in ("income", "expenses"):
+        values = totals[key]
+        if count >= 2:
+            slope, intercept = np.polyfit(x, values, 1)
+        else:
+            slope, intercept = 0.0, float(values[0])
+        fitted = slope * x + intercept
+        predicted = slope * future_x + intercept
+
+        if seasonal:
+            # Mean residual per calendar month, applied to the matching future months
+            calendar = months.astype(np.int64) % 12
+            residual_sum = np.bincount(calendar, weights=values - fitted, minlength=12)
+            residual_count = np.bincount(calendar, minlength=12)
+            season = np.divide(residual_sum, residual_count, out=np.zeros(12), where=residual_count > 0)
+            predicted = predicted + season[future_months.astype(np.int64) % 12]
+
+        predictions[key] = np.maximum(predicted, 0.0)
+
+    return {
+        "method": "linear+seasonal" if seasonal else "linear",
+        "history_months": count,
+        "forecast": [
+            {
+                "month": str(month) + "-01",
+                "income": round(float(predictions["income"][i]), 2),
+                "expenses": round(float(predictions["expenses"][i]), 2),
+                "net": round(float(predictions["income"][i] - predictions["expenses"][i]), 2),
+            }
+            for i, month in enumerate(future_months)
+        ],
+    }
+
+
+class LedgerCache:
+    """Per-user ColumnarLedger cache, invalidated by the analytics data version
+    and bounded by the total size of the cached arrays"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, db: Session, user_id: int) -> ColumnarLedger:
+        # Read the version before loading: a write that commits mid-load bumps
+        # it afterwards, so the next call reloads
+        version = analytics_cache.data_version(db, user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+
+        ledger = ColumnarLedger.load(db, user_id)
+        with self._lock:
+            old = self._entries.pop(user_id, None)
+            if old:
+                self._bytes -= old[1].nbytes
+            if ledger.nbytes <= self.max_bytes:
+                self._entries[user_id] = (version, ledger)
+                self._bytes += ledger.nbytes
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted.nbytes
+                    self.evictions += 1
+        return ledger
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "users": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+ledger_cache = LedgerCache(settings.ledger_cache_max_bytes)
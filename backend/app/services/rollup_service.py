@@ -0,0 +1,181 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models.category import Category, CategoryType
+from ..models.rollup import DailyRollup, MonthlyRollup
+from ..models.user import User
+from .archive_service import ledger_entity
+from .balance_service import apply_balance_deltas
+
+# Rollup buckets per INSERT ... ON CONFLICT statement, well under SQLite's bound parameter limit
+UPSERT_BATCH_SIZE = 500
+
+# Grouped rows read between heartbeat calls while rebuilding
+REBUILD_HEARTBEAT_ROWS = 1000
+
+# (user_id, transaction_date, category_id, amount)
+RollupEntry = Tuple[int, datetime, int, Decimal]
+
+def rollup_entry(transaction) -> RollupEntry:
+    """Snapshot the fields of a transaction that rollups depend on"""
+    return (transaction.user_id, transaction.transaction_date, transaction.category_id, transaction.amount)
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def _upsert_deltas(db: Session, model, deltas: Dict[tuple, list], category_types: Dict[int, CategoryType]):
+    """Add {(user_id, period_start, category_id): [amount, count]} to a rollup table.
+
+    One multi-row INSERT ... ON CONFLICT DO UPDATE per batch of buckets, so
+    buckets are created or incremented atomically whatever other writers do.
+    Rows are sorted so concurrent writers lock buckets in the same order.
+    """
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    rows = [
+        {
+            "user_id": user_id,
+            "period_start": period_start,
+            "category_id": category_id,
+            "category_type": category_types[category_id],
+            "total_amount": amount,
+            "transaction_count": count,
+        }
+        for (user_id, period_start, category_id), (amount, count) in sorted(deltas.items())
+        if amount or count
+    ]
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(model).values(rows[start:start + UPSERT_BATCH_SIZE])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[model.user_id, model.period_start, model.category_id],
+            set_={
+                "total_amount": model.total_amount + stmt.excluded.total_amount,
+                "transaction_count": model.transaction_count + stmt.excluded.transaction_count,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+def update_rollups(db: Session, added: Iterable[RollupEntry] = (), removed: Iterable[RollupEntry] = ()):
+    """Apply transaction inserts/deletes to the daily and monthly rollups.
+
+    Also corrects balance checkpoints after the changed dates. An update is a
+    removal of the old snapshot plus an addition of the new one. Does not
+    commit, so the rollups change in the same database transaction as the rows
+    they summarize.
+    """
+    daily: Dict[tuple, list] = defaultdict(lambda: [Decimal("0"), 0])
+    for sign, entries in ((1, added), (-1, removed)):
+        for user_id, transaction_date, category_id, amount in entries:
+            bucket = daily[(user_id, _to_date(transaction_date), category_id)]
+            bucket[0] += sign * Decimal(amount)
+            bucket[1] += sign
+
+    daily = {key: delta for key, delta in daily.items() if delta[0] or delta[1]}
+    if not daily:
+        return
+
+    category_types = dict(
+        db.query(Category.id, Category.type).filter(
+            Category.id.in_({category_id for _, _, category_id in daily})
+        ).all()
+    )
+
+    monthly: Dict[tuple, list] = defaultdict(lambda: [Decimal("0"), 0])
+    balance_deltas: Dict[tuple, Decimal] = defaultdict(Decimal)
+    for (user_id, day, category_id), (amount, count) in daily.items():
+        bucket = monthly[(user_id, day.replace(day=1), category_id)]
+        bucket[0] += amount
+        bucket[1] += count
+        balance_deltas[(user_id, day)] += amount if category_types[category_id] == CategoryType.INCOME else -amount
+
+    _upsert_deltas(db, DailyRollup, daily, category_types)
+    _upsert_deltas(db, MonthlyRollup, monthly, category_types)
+
+    apply_balance_deltas(db, balance_deltas)
+
+def update_category_type(db: Session, category_id: int, category_type):
+    """Propagate a category type change to its rollup rows"""
+    for model in (DailyRollup, MonthlyRollup):
+        db.query(model).filter(model.category_id == category_id).update(
+            {model.category_type: category_type}, synchronize_session=False
+        )
+
+def delete_category_rollups(db: Session, category_id: int):
+    for model in (DailyRollup, MonthlyRollup):
+        db.query(model).filter(model.category_id == category_id).delete(synchronize_session=False)
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None, heartbeat: Optional[Callable[[], None]] = None) -> int:
+    """Recompute rollups from the transactions and archive tables, for one user or everyone.
+
+    heartbeat, if given, is called per user and every REBUILD_HEARTBEAT_ROWS
+    grouped rows, so callers can show liveness during a long rebuild. It is
+    only called while this session holds no uncommitted writes, so it may
+    write from another session even on SQLite; call this with nothing pending.
+    Returns the number of daily rollup rows written. Commits per user.
+    """
+    user_ids = [user_id] if user_id is not None else [row[0] for row in db.query(User.id).all()]
+
+    written = 0
+    for uid in user_ids:
+        if heartbeat:
+            heartbeat()
+        ledger = ledger_entity(db, uid)
+        day = func.date(ledger.transaction_date)
+        rows = db.query(
+            day.label("day"),
+            ledger.category_id,
+            Category.type,
+            func.sum(ledger.amount).label("total"),
+            func.count(ledger.id).label("count"),
+        ).join(Category, ledger.category_id == Category.id).filter(
+            ledger.user_id == uid
+        ).group_by(day, ledger.category_id, Category.type).yield_per(1000)
+
+        daily = []
+        monthly: Dict[tuple, list] = {}
+        for index, row in enumerate(rows, 1):
+            if heartbeat and index % REBUILD_HEARTBEAT_ROWS == 0:
+                heartbeat()
+            period_start = _to_date(row.day)
+            daily.append({
+                "user_id": uid,
+                "period_start": period_start,
+                "category_id": row.category_id,
+                "category_type": row.type,
+                "total_amount": row.total,
+                "transaction_count": row.count,
+            })
+            key = (period_start.replace(day=1), row.category_id)
+            bucket = monthly.setdefault(key, [row.type, Decimal("0"), 0])
+            bucket[1] += Decimal(row.total)
+            bucket[2] += row.count
+
+        # Replaced only after reading, with no heartbeat until the commit: a
+        # heartbeat would wait on the write lock this transaction holds
+        for model in (DailyRollup, MonthlyRollup):
+            db.query(model).filter(model.user_id == uid).delete(synchronize_session=False)
+        if daily:
+            db.bulk_insert_mappings(DailyRollup, daily)
+        if monthly:
+            db.bulk_insert_mappings(MonthlyRollup, [
+                {
+                    "user_id": uid,
+                    "period_start": month,
+                    "category_id": category_id,
+                    "category_type": category_type,
+                    "total_amount": total,
+                    "transaction_count": count,
+                }
+                for (month, category_id), (category_type, total, count) in monthly.items()
+            ])
+        db.commit()
+        written += len(daily)
+
+    return written
@@ -0,0 +1,253 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+from statistics import median
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.category import Category, CategoryType
+from ..models.subscription import Subscription, SubscriptionCadence, SubscriptionScan
+from ..models.transaction import ArchivedTransaction, Transaction
+from ..models.user import User
+from ..utils.database import SessionLocal, engine
+from .archive_service import latest_archived_date
+
+logger = logging.getLogger(__name__)
+
+# cadence: (period in days, tolerance in days, minimum occurrences)
+CADENCES = {
+    SubscriptionCadence.WEEKLY: (7, 1, 4),
+    SubscriptionCadence.MONTHLY: (30.44, 4, 3),
+    SubscriptionCadence.YEARLY: (365.25, 10, 2),
+}
+
+# Consecutive amounts within this ratio of each other belong to the same band
+AMOUNT_TOLERANCE = Decimal("0.15")
+
+# Minimum share of intervals that must match the cadence
+MIN_CONFIDENCE = 0.6
+
+# Rows fetched per round trip while scanning a user's transactions
+SCAN_CHUNK = 10000
+
+# Merchant keys per IN (...) list when rescanning selected merchants
+SCAN_KEYS_CHUNK = 500
+
+# Refreshes of a user take lock user_id % LOCK_STRIPES, so the lock table
+# stays the same size however many users refresh
+LOCK_STRIPES = 64
+_user_locks: List[threading.Lock] = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+def _amount_bands(rows: List[tuple]) -> Iterable[List[tuple]]:
+    """Split rows sorted by amount into bands of near-equal amounts"""
+    band = [rows[0]]
+    for row in rows[1:]:
+        if row[1] > band[-1][1] * (1 + AMOUNT_TOLERANCE):
+            yield band
+            band = []
+        band.append(row)
+    yield band
+
+def _detect_cadence(days: List[date]):
+    """Match the intervals between distinct sorted days against the known cadences"""
+    if len(days) < 2:
+        return None
+    intervals = [(b - a).days for a, b in zip(days, days[1:])]
+    typical = median(intervals)
+
+    for cadence, (period, tolerance, min_occurrences) in CADENCES.items():
+        if len(days) < min_occurrences or abs(typical - period) > tolerance:
+            continue
+        matching = sum(1 for interval in intervals if abs(interval - period) <= tolerance)
+        confidence = matching / len(intervals)
+        if confidence >= MIN_CONFIDENCE:
+            return cadence, typical, confidence
+    return None
+
+def detect_subscriptions(user_id: int, rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+    """Find recurring payments in (merchant_key, amount, date, description, category_id) rows.
+
+    Rows are sorted once by merchant and amount, split into amount bands, and
+    each band's distinct days are checked for a weekly/monthly/yearly cadence,
+    so the whole pass is O(n log n).
+    """
+    detected = []
+    ordered = sorted(rows, key=lambda row: (row[0], row[1]))
+    for merchant_key, merchant_rows in groupby(ordered, key=lambda row: row[0]):
+        merchant_rows = list(merchant_rows)
+        for band, band_rows in enumerate(_amount_bands(merchant_rows)):
+            band_rows.sort(key=lambda row: row[2])
+            days = sorted({row[2] for row in band_rows})
+            match = _detect_cadence(days)
+            if not match:
+                continue
+
+            cadence, typical, confidence = match
+            latest = band_rows[-1]
+            total = sum(row[1] for row in band_rows)
+            detected.append({
+                "user_id": user_id,
+                "merchant_key": merchant_key,
+                "band": band,
+                "description": latest[3],
+                "category_id": latest[4],
+                "cadence": cadence,
+                "average_amount": (total / len(band_rows)).quantize(Decimal("0.01")),
+                "last_amount": latest[1],
+                "occurrences": len(days),
+                "first_date": days[0],
+                "last_date": days[-1],
+                "next_expected_date": days[-1] + timedelta(days=round(typical)),
+                "confidence": round(confidence, 3),
+            })
+    return detected
+
+def _scan_rows(db: Session, user_id: int, merchant_keys: Optional[Set[str]]) -> List[tuple]:
+    """Expense rows of a user as (merchant_key, amount, date, description, category_id).
+
+    With merchant_keys, only those merchants' rows are read, through the
+    (user_id, merchant_key) indexes of the hot and archive tables.
+    """
+    models = [Transaction]
+    if latest_archived_date(db, user_id) is not None:
+        models.append(ArchivedTransaction)
+
+    if merchant_keys is None:
+        key_chunks = [None]
+    else:
+        keys = sorted(key for key in merchant_keys if key)
+        key_chunks = [keys[start:start + SCAN_KEYS_CHUNK] for start in range(0, len(keys), SCAN_KEYS_CHUNK)]
+
+    rows = []
+    for model in models:
+        for keys in key_chunks:
+            stmt = select(
+                model.merchant_key,
+                model.amount,
+                model.transaction_date,
+                model.description,
+                model.category_id,
+            ).join(Category, model.category_id == Category.id).where(
+                model.user_id == user_id,
+                Category.type == CategoryType.EXPENSE,
+                model.merchant_key.in_(keys) if keys is not None else model.merchant_key != "",
+            ).execution_options(yield_per=SCAN_CHUNK)
+
+            for merchant_key, amount, transaction_date, description, category_id in db.execute(stmt):
+                rows.append((merchant_key, Decimal(amount), transaction_date.date(), description, category_id))
+    return rows
+
+def refresh_subscriptions(
+    db: Session,
+    user_id: int,
+    merchant_keys: Optional[Iterable[str]] = None,
+    full: bool = False,
+) -> int:
+    """Re-detect a user's subscriptions and replace the stored ones.
+
+    With merchant_keys, only those merchants are re-detected (use it after
+    updating or deleting transactions). Otherwise only merchants appearing in
+    transactions added since the last scan are re-detected, or all of them
+    with full or on the first scan. Does not commit. Returns the number of
+    subscriptions written.
+    """
+    scan = db.query(SubscriptionScan).filter(SubscriptionScan.user_id == user_id).first()
+    track_watermark = merchant_keys is None
+
+    # Read the watermark before scanning; rows added mid-scan are picked up next time
+    watermark = db.query(Transaction.id).filter(
+        Transaction.user_id == user_id
+    ).order_by(Transaction.id.desc()).limit(1).scalar() or 0
+
+    if merchant_keys is not None:
+        keys = set(merchant_keys)
+    elif full or scan is None:
+        keys = None
+    else:
+        new_merchants = db.query(Transaction.merchant_key).filter(
+            Transaction.user_id == user_id,
+            Transaction.id > scan.last_transaction_id
+        ).distinct().all()
+        keys = {merchant_key for (merchant_key,) in new_merchants if merchant_key}
+
+    detected = []
+    if keys is None or keys:
+        detected = detect_subscriptions(user_id, _scan_rows(db, user_id, keys))
+
+        existing = db.query(Subscription).filter(Subscription.user_id == user_id)
+        if keys is not None:
+            existing = existing.filter(Subscription.merchant_key.in_(keys))
+        existing.delete(synchronize_session=False)
+        if detected:
+            db.bulk_insert_mappings(Subscription, detected)
+
+    if track_watermark:
+        if scan is None:
+            scan = SubscriptionScan(user_id=user_id)
+            db.add(scan)
+        scan.last_transaction_id = max(watermark, scan.last_transaction_id or 0)
+        scan.scanned_at = datetime.utcnow()
+
+    return len(detected)
+
+def run_subscription_refresh(user_id: int, merchant_keys: Optional[Iterable[str]] = None, full: bool = False) -> Optional[int]:
+    """Refresh a user's subscriptions in its own session and commit.
+
+    Used as a request background task, where the response has already been
+    sent, and by the batch workers. Failures are therefore logged and rolled
+    back here instead of raised; the next scan retries the rows. Returns the
+    number of subscriptions written, or None if the refresh failed.
+    Refreshes of the same user are serialized within a process.
+    """
+    with _user_locks[user_id % LOCK_STRIPES]:
+        db = SessionLocal()
+        try:
+            written = refresh_subscriptions(db, user_id, merchant_keys=merchant_keys, full=full)
+            db.commit()
+            return written
+        except Exception:
+            db.rollback()
+            logger.exception("Subscription refresh failed for user %s", user_id)
+            return None
+        finally:
+            db.close()
+
+def _init_worker():
+    # Connections inherited from the parent process must not be shared
+    engine.dispose(close=False)
+
+def refresh_all_subscriptions(workers: int = 4, full: bool = False, user_ids: Optional[List[int]] = None) -> Dict[int, Optional[int]]:
+    """Refresh every user's subscriptions in a pool of worker processes.
+
+    Detection is CPU-bound Python, so users are spread over processes rather
+    than threads. Returns the number of subscriptions written per user, None
+    for users whose refresh failed; one failure doesn't stop the others.
+    """
+    if user_ids is None:
+        db = SessionLocal()
+        try:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id).all()]
+        finally:
+            db.close()
+
+    if workers <= 1:
+        return {user_id: run_subscription_refresh(user_id, full=full) for user_id in user_ids}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {user_id: pool.submit(run_subscription_refresh, user_id, None, full) for user_id in user_ids}
+        written = {}
+        for user_id, future in futures.items():
+            try:
+                written[user_id] = future.result()
+            except Exception:
+                # The worker itself failed (e.g. it died); refresh failures are already None
+                logger.exception("Subscription refresh failed for user %s", user_id)
+                written[user_id] = None
+        return written
+
+def delete_category_subscriptions(db: Session, category_id: int):
+    """Drop subscriptions attributed to a category that is being deleted. Does not commit."""
+    db.query(Subscription).filter(Subscription.category_id == category_id).delete(synchronize_session=False)
@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.token import RefreshToken, RevokedToken
+from ..utils.auth import create_access_token, create_refresh_token, decode_token
+from ..utils.revocation import revocation_list
+
+def _invalid_refresh_token():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+
+def _token_pair(user_id: int, refresh_jti: str, refresh_expires_at: datetime) -> Dict[str, Any]:
+    return {
+        "access_token": create_access_token(
+            data={"sub": str(user_id)},
+            expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+        ),
+        "refresh_token": create_refresh_token(user_id, refresh_jti, refresh_expires_at),
+        "token_type": "bearer",
+        "expires_in": settings.access_token_expire_minutes * 60,
+    }
+
+def issue_tokens(db: Session, user_id: int) -> Dict[str, Any]:
+    """Create an access token and a refresh token starting a new family (login session). Commits."""
+    jti = uuid.uuid4().hex
+    expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    db.add(RefreshToken(jti=jti, family_id=jti, user_id=user_id, expires_at=expires_at))
+    db.commit()
+    return _token_pair(user_id, jti, expires_at)
+
+def revoke_family(db: Session, family_id: str) -> None:
+    """Revoke every refresh token of a login session. Does not commit."""
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+def rotate_refresh_token(db: Session, token: str) -> Dict[str, Any]:
+    """Exchange a refresh token for a new token pair, revoking the old refresh token.
+
+    Presenting an already-rotated token means it leaked: the whole family is
+    revoked, logging out both the legitimate client and the thief. No
+    password hashing is involved. Commits.
+    """
+    claims = decode_token(token, "refresh")
+    stored = db.query(RefreshToken).filter(RefreshToken.jti == claims.get("jti")).first()
+    if stored is None or stored.user_id != int(claims["sub"]):
+        raise _invalid_refresh_token()
+
+    if stored.revoked_at is not None:
+        revoke_family(db, stored.family_id)
+        db.commit()
+        raise _invalid_refresh_token()
+
+    # Compare-and-set, so two concurrent refreshes can't both rotate the token
+    now = datetime.utcnow()
+    new_jti = uuid.uuid4().hex
+    rotated = db.query(RefreshToken).filter(
+        RefreshToken.id == stored.id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: now, RefreshToken.replaced_by: new_jti}, synchronize_session=False)
+    if not rotated:
+        db.rollback()
+        raise _invalid_refresh_token()
+
+    expires_at = now + timedelta(days=settings.refresh_token_expire_days)
+    db.add(RefreshToken(jti=new_jti, family_id=stored.family_id, user_id=stored.user_id, expires_at=expires_at))
+    db.commit()
+    return _token_pair(stored.user_id, new_jti, expires_at)
+
+def revoke_access_token(db: Session, claims: Dict[str, Any]) -> None:
+    """Add an access token to the revocation list until it expires. Commits."""
+    jti = claims.get("jti")
+    if not jti:
+        return  # Issued before revocation support; it expires on its own
+    expires_at = datetime.utcfromtimestamp(claims["exp"])
+    if not db.query(RevokedToken.id).filter(RevokedToken.jti == jti).first():
+        db.add(RevokedToken(jti=jti, user_id=int(claims["sub"]), expires_at=expires_at))
+        db.commit()
+    revocation_list.add(jti, expires_at)
+
+def revoke_refresh_token(db: Session, token: str, user_id: int) -> None:
+    """Revoke the login session a refresh token belongs to. Commits."""
+    try:
+        claims = decode_token(token, "refresh")
+    except HTTPException:
+        return  # Expired or malformed: nothing left to revoke
+    stored = db.query(RefreshToken).filter(RefreshToken.jti == claims.get("jti")).first()
+    if stored is not None and stored.user_id == user_id:
+        revoke_family(db, stored.family_id)
+        db.commit()
@@ -0,0 +1,103 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.category import Category
+from ..models.transaction import Transaction
+from ..utils.cache import analytics_cache
+from .rollup_service import update_rollups
+
+# Rows per multi-row INSERT statement
+BULK_INSERT_BATCH_SIZE = 1000
+
+def compute_content_hash(transaction_date: datetime, amount: Decimal, description: str) -> str:
+    """Stable hash of the fields that identify a statement line.
+
+    Stored on every transaction, so statement imports can skip lines that are
+    already in the ledger however they got there.
+    """
+    key = "|".join([
+        transaction_date.isoformat(),
+        str(Decimal(amount).quantize(Decimal("0.01"))),
+        " ".join(description.split()).lower(),
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def normalize_description(description: str) -> str:
+    """Merchant key of a description: casefolded, without digits or punctuation.
+
+    "NETFLIX.COM 12/03 #4411" and "Netflix.com 13/04 #4492" both map to
+    "netflix com". Stored on every transaction as merchant_key, which
+    subscription detection groups and looks up rows by.
+    """
+    text = unicodedata.normalize("NFKC", description or "").casefold()
+    return " ".join(re.sub(r"[\W\d_]+", " ", text).split())
+
+def get_user_category_ids(db: Session, user_id: int, category_ids: Iterable[int]) -> set:
+    """Return the subset of category_ids that belong to the user, in a single query"""
+    category_ids = set(category_ids)
+    if not category_ids:
+        return set()
+
+    rows = db.query(Category.id).filter(
+        Category.user_id == user_id,
+        Category.id.in_(category_ids)
+    ).all()
+    return {row.id for row in rows}
+
+def insert_transaction_rows(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert prepared transaction rows with batched multi-row INSERTs.
+
+    Also applies the rows to the analytics rollups. Does not commit; returns
+    the new ids in the same order as rows.
+    """
+    for row in rows:
+        if row.get("content_hash") is None:
+            row["content_hash"] = compute_content_hash(row["transaction_date"], row["amount"], row["description"])
+        if row.get("merchant_key") is None:
+            row["merchant_key"] = normalize_description(row["description"])
+
+    ids = []
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        batch = rows[start:start + BULK_INSERT_BATCH_SIZE]
+        # sort_by_parameter_order would make SQLite fall back to one INSERT
+        # per row. Ids are handed out in VALUES order, so sorting the returned
+        # ids restores the order of the batch.
+        ids.extend(sorted(db.scalars(insert(Transaction).values(batch).returning(Transaction.id)).all()))
+
+    update_rollups(db, added=(
+        (row["user_id"], row["transaction_date"], row["category_id"], row["amount"]) for row in rows
+    ))
+    return ids
+
+def bulk_create_transactions(db: Session, user_id: int, items: List[Dict[str, Any]]) -> List[Dict[str, Optional[Any]]]:
+    """Create many transactions for a user in one database transaction.
+
+    Items referencing a category the user doesn't own are rejected individually;
+    the rest are inserted. Returns one {index, id, error} result per item.
+    """
+    valid_category_ids = get_user_category_ids(db, user_id, (item["category_id"] for item in items))
+
+    results = []
+    rows = []
+    accepted = []
+    for index, item in enumerate(items):
+        if item["category_id"] not in valid_category_ids:
+            results.append({"index": index, "id": None, "error": "Category not found"})
+            continue
+        rows.append({**item, "user_id": user_id})
+        accepted.append(len(results))
+        results.append({"index": index, "id": None, "error": None})
+
+    if rows:
+        ids = insert_transaction_rows(db, rows)
+        for position, new_id in zip(accepted, ids):
+            results[position]["id"] = new_id
+        analytics_cache.invalidate_user(db, user_id)
+        db.commit()
+
+    return results
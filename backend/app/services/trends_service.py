@@ -0,0 +1,181 @@
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import Date, Integer, case, cast, func
+from sqlalchemy.orm import Session
+from ..models.category import Category, CategoryType
+from ..models.transaction import Transaction
+from .archive_service import ledger_entity
+
+BUCKETS = ("day", "week", "month", "quarter", "year")
+
+# Upper bound on zero-filled buckets in one response
+MAX_BUCKETS = 5000
+
+def bucket_start(value: date, bucket: str) -> date:
+    """First day of the bucket containing value (weeks start on Monday)"""
+    if bucket == "day":
+        return value
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    if bucket == "quarter":
+        return value.replace(month=(value.month - 1) // 3 * 3 + 1, day=1)
+    return value.replace(month=1, day=1)
+
+def next_bucket(value: date, bucket: str) -> date:
+    if bucket == "day":
+        return value + timedelta(days=1)
+    if bucket == "week":
+        return value + timedelta(weeks=1)
+    months = {"month": 1, "quarter": 3, "year": 12}[bucket]
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1, day=1)
+
+def estimate_bucket_count(start: date, end: date, bucket: str) -> int:
+    days = {"day": 1, "week": 7, "month": 28, "quarter": 90, "year": 365}[bucket]
+    return (end - start).days // days + 1
+
+def iter_buckets(start: date, end: date, bucket: str) -> List[date]:
+    buckets = []
+    current = bucket_start(start, bucket)
+    while current <= end:
+        buckets.append(current)
+        current = next_bucket(current, bucket)
+    return buckets
+
+def local_midnight_utc(value: date, tz: ZoneInfo) -> datetime:
+    """Naive UTC datetime of local midnight on value, comparable with transaction_date"""
+    return datetime.combine(value, time.min, tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+def _utc_offset_segments(start_utc: datetime, end_utc: datetime, tz: ZoneInfo) -> List[tuple]:
+    """Split [start_utc, end_utc) into (segment_end_utc, offset_seconds) runs of constant offset"""
+    def offset_at(moment: datetime) -> int:
+        return int(moment.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds())
+
+    segments = []
+    current = start_utc
+    current_offset = offset_at(current)
+    probe = current
+    while probe < end_utc:
+        following = min(probe + timedelta(days=1), end_utc)
+        if offset_at(following) != current_offset:
+            # Binary search for the transition within this day, to the minute
+            low, high = probe, following
+            while high - low > timedelta(minutes=1):
+                middle = low + (high - low) / 2
+                if offset_at(middle) == current_offset:
+                    low = middle
+                else:
+                    high = middle
+            segments.append((high, current_offset))
+            current_offset = offset_at(high)
+            probe = high
+        else:
+            probe = following
+    segments.append((None, current_offset))
+    return segments
+
+def local_time_expression(dialect: str, tz: ZoneInfo, start_utc: datetime, end_utc: datetime, column=Transaction.transaction_date):
+    if dialect == "postgresql":
+        return func.timezone(tz.key, func.timezone("UTC", column))
+
+    # SQLite has no time zone database, so apply the zone's UTC offset per DST
+    # segment of the requested range
+    segments = _utc_offset_segments(start_utc, end_utc, tz)
+    if len(segments) == 1:
+        return func.datetime(column, f"{segments[0][1]:+d} seconds")
+    whens = [
+        (column < segment_end, func.datetime(column, f"{offset:+d} seconds"))
+        for segment_end, offset in segments[:-1]
+    ]
+    return case(*whens, else_=func.datetime(column, f"{segments[-1][1]:+d} seconds"))
+
+def bucket_expression(dialect: str, bucket: str, local):
+    if dialect == "postgresql":
+        return cast(func.date_trunc(bucket, local), Date)
+
+    if bucket == "day":
+        return func.date(local)
+    if bucket == "week":
+        # Forward to Sunday (or stay), then back to that week's Monday
+        return func.date(local, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", local)
+    if bucket == "quarter":
+        month = cast(func.strftime("%m", local), Integer)
+        return func.printf("%s-%02d-01", func.strftime("%Y", local), (month - 1) // 3 * 3 + 1)
+    return func.strftime("%Y-01-01", local)
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def compute_trends(
+    db: Session,
+    user_id: int,
+    bucket: str,
+    start_date: date,
+    end_date: date,
+    tz: ZoneInfo,
+    category_id: Optional[int] = None,
+    category_type: Optional[CategoryType] = None,
+) -> Dict[str, Any]:
+    """Income/expense totals per time bucket in one grouped query, zero-filled"""
+    start_utc = local_midnight_utc(start_date, tz)
+    end_utc = local_midnight_utc(end_date + timedelta(days=1), tz)
+
+    ledger = ledger_entity(db, user_id, start_utc)
+    dialect = db.get_bind().dialect.name
+    local = local_time_expression(dialect, tz, start_utc, end_utc, ledger.transaction_date)
+    period = bucket_expression(dialect, bucket, local).label("period")
+
+    query = db.query(
+        period,
+        Category.type,
+        func.sum(ledger.amount).label("total"),
+        func.count(ledger.id).label("count"),
+    ).join(Category, ledger.category_id == Category.id).filter(
+        ledger.user_id == user_id,
+        ledger.transaction_date >= start_utc,
+        ledger.transaction_date < end_utc,
+    )
+    if category_id:
+        query = query.filter(ledger.category_id == category_id)
+    if category_type:
+        query = query.filter(Category.type == category_type)
+
+    rows = query.group_by(period, Category.type).all()
+
+    series = {
+        period_start: {"income": Decimal("0"), "expenses": Decimal("0"), "count": 0}
+        for period_start in iter_buckets(start_date, end_date, bucket)
+    }
+    for row in rows:
+        point = series.get(_to_date(row.period))
+        if point is None:
+            continue
+        point["income" if row.type == CategoryType.INCOME else "expenses"] += row.total
+        point["count"] += row.count
+
+    return {
+        "bucket": bucket,
+        "timezone": tz.key,
+        "start_date": start_date,
+        "end_date": end_date,
+        "series": [
+            {
+                "period_start": period_start.isoformat(),
+                "income": float(point["income"]),
+                "expenses": float(point["expenses"]),
+                "net": float(point["income"] - point["expenses"]),
+                "count": point["count"],
+            }
+            for period_start, point in series.items()
+        ]
+    }
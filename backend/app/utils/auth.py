@@ -1,17 +1,90 @@
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from ..models.user import User
-from .database import get_db
+from .cache import TTLCache
+from .password_hashing import pwd_context
+from .revocation import revocation_list
+from .database import get_db, get_async_db
 from ..core.config import settings
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer()
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """Immutable snapshot of the authenticated user, safe to share between requests"""
+    id: int
+    email: str
+    full_name: str
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, email=user.email, full_name=user.full_name, is_active=bool(user.is_active))
+
+class AuthCache:
+    """Per-process caches of decoded tokens (token -> user id) and user snapshots.
+
+    User snapshots are dropped after any committed ORM change to the user and
+    otherwise expire after AUTH_CACHE_USER_TTL_SECONDS, which bounds how long
+    changes made by other processes take to be seen.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, token_ttl: float, user_ttl: float):
+        self.enabled = enabled
+        self.tokens = TTLCache(max_entries, token_ttl)
+        self.users = TTLCache(max_entries, user_ttl)
+        self.requests = 0
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.users.delete(user_id)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self.users.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        users = self.users.stats()
+        return {
+            "enabled": self.enabled,
+            "requests": self.requests,
+            "db_queries_saved": users["hits"],
+            "db_queries_saved_per_request": round(users["hits"] / self.requests, 3) if self.requests else 0.0,
+            "token_decodes_saved": self.tokens.hits,
+            "tokens": self.tokens.stats(),
+            "users": users,
+        }
+
+auth_cache = AuthCache(
+    enabled=settings.auth_cache_enabled,
+    max_entries=settings.auth_cache_max_entries,
+    token_ttl=settings.auth_cache_token_ttl_seconds,
+    user_ttl=settings.auth_cache_user_ttl_seconds,
+)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_changed_user(mapper, connection, target):
+    object_session(target).info.setdefault("changed_user_ids", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # Invalidate on commit rather than flush, so a concurrent request can't
+    # re-cache the old row between the flush and the commit
+    for user_id in session.info.pop("changed_user_ids", ()):
+        auth_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -25,31 +98,109 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode.update({"exp": expire})
+    # jti identifies the token in the revocation list
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def create_refresh_token(user_id: int, jti: str, expires_at: datetime) -> str:
+    to_encode = {"sub": str(user_id), "jti": jti, "exp": expires_at, "type": "refresh"}
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+def decode_token(token: str, token_type: str = "access") -> Dict[str, Any]:
+    """Validate a token's signature, expiry and type and return its claims"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
     try:
-        payload = jwt.decode(credentials.credentials, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-            )
-        return int(user_id)
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
     except JWTError:
+        raise credentials_exception
+
+    # Access tokens issued before refresh tokens existed carry no type
+    if payload.get("sub") is None or payload.get("type", "access") != token_type:
+        raise credentials_exception
+    return payload
+
+def _check_not_revoked(jti: Optional[str]):
+    if revocation_list.is_stale():
+        # Fail closed: a logout made by another process may not be loaded yet
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token revocation list is out of date",
+        )
+    if jti and revocation_list.is_revoked(jti):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Token has been revoked",
         )
 
-def get_current_user(user_id: int = Depends(verify_token), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+def authenticate_token(token: str) -> int:
+    """User id of a valid, unrevoked access token. Cached; never queries the database."""
+    cached = auth_cache.tokens.get(token) if auth_cache.enabled else None
+    if cached is None:
+        payload = decode_token(token)
+        cached = (int(payload["sub"]), payload.get("jti"))
+        if auth_cache.enabled and payload.get("exp") is not None:
+            # Never cache a token beyond its own expiry
+            auth_cache.tokens.set(token, cached, ttl=payload["exp"] - time.time())
+
+    user_id, jti = cached
+    # Checked on every request, cached token or not: a set lookup, no query
+    _check_not_revoked(jti)
+    return user_id
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return authenticate_token(credentials.credentials)
+
+async def verify_token_async(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # Same check as verify_token, declared async so FastAPI doesn't hand it to the threadpool
+    return authenticate_token(credentials.credentials)
+
+def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Claims of the request's access token, for routes that act on the token itself"""
+    payload = decode_token(credentials.credentials)
+    _check_not_revoked(payload.get("jti"))
+    return payload
+
+def _cached_user(user_id: int) -> Optional[CurrentUser]:
+    auth_cache.requests += 1
+    return auth_cache.users.get(user_id) if auth_cache.enabled else None
+
+def _remember_user(user: Optional[User]) -> CurrentUser:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
\ No newline at end of file
+    current_user = CurrentUser.from_user(user)
+    if auth_cache.enabled:
+        auth_cache.users.set(user.id, current_user)
+    return current_user
+
+def _require_active(current_user: CurrentUser) -> CurrentUser:
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
+        )
+    return current_user
+
+def get_current_user(user_id: int = Depends(verify_token), db: Session = Depends(get_db)) -> CurrentUser:
+    """The authenticated user as a CurrentUser snapshot, cached between requests.
+
+    The get_db session is only created, not connected, when the snapshot is
+    cached. Routes that need the ORM User must load it themselves.
+    """
+    current_user = _cached_user(user_id)
+    if current_user is None:
+        current_user = _remember_user(db.query(User).filter(User.id == user_id).first())
+    return _require_active(current_user)
+
+async def get_current_user_async(user_id: int = Depends(verify_token_async), db=Depends(get_async_db)) -> CurrentUser:
+    """get_current_user for the async routers"""
+    current_user = _cached_user(user_id)
+    if current_user is None:
+        current_user = _remember_user(await db.get(User, user_id))
+    return _require_active(current_user)
@@ -0,0 +1,227 @@
+import importlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.user import User
+
+class CacheBackend:
+    """Storage interface for the analytics cache.
+
+    Values are opaque strings, so the same interface can be backed by an
+    external store shared between workers (e.g. Redis/Memcached).
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with per-entry TTL, bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class TTLCache:
+    """In-process LRU of Python objects with a per-entry TTL, bounded by entry count"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any, Any], bool]) -> None:
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class AnalyticsCache:
+    """Per-user result cache invalidated through a per-user data version.
+
+    Every write to a user's transactions or categories bumps users.data_version
+    in its own database transaction; cache keys embed the version, so stale
+    results are never read again and simply age out of the backend. Keeping
+    the version in the database makes a write seen by every worker process
+    as soon as it commits, whatever the backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, db: Session, user_id: int, endpoint: str, params: Dict[str, Any]) -> str:
+        version = self.data_version(db, user_id)
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return f"analytics:{user_id}:{version}:{endpoint}:{encoded}"
+
+    def get_or_compute(
+        self, db: Session, user_id: int, endpoint: str, params: Dict[str, Any], compute: Callable[[], Any]
+    ) -> Any:
+        if not self.enabled:
+            return compute()
+
+        key = self._key(db, user_id, endpoint, params)
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+
+        self.misses += 1
+        result = compute()
+        self.backend.set(key, json.dumps(result, default=str), self.ttl)
+        return result
+
+    def data_version(self, db: Session, user_id: int) -> int:
+        """Current data version of a user, for caches kept outside this class"""
+        return db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+    def invalidate_user(self, db: Session, user_id: int) -> None:
+        """Call in the transaction of any write that changes a user's analytics, before committing.
+
+        Also stamps users.last_write_at for read-your-writes routing; like the
+        version bump, it is discarded if the transaction rolls back.
+        """
+        # A data change, not a change to the user, so updated_at is left alone
+        db.execute(
+            update(User).where(User.id == user_id)
+            .values(data_version=User.data_version + 1, last_write_at=datetime.utcnow(), updated_at=User.updated_at)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, **self.backend.stats()}
+
+
+def _create_backend() -> CacheBackend:
+    if settings.analytics_cache_backend == "memory":
+        return MemoryCacheBackend(
+            max_entries=settings.analytics_cache_max_entries,
+            max_bytes=settings.analytics_cache_max_bytes,
+        )
+
+    # "package.module:ClassName" of a CacheBackend subclass taking no arguments
+    module_name, _, class_name = settings.analytics_cache_backend.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+analytics_cache = AnalyticsCache(
+    _create_backend(),
+    ttl=settings.analytics_cache_ttl_seconds,
+    enabled=settings.analytics_cache_enabled,
+)
@@ -1,16 +1,84 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
 from ..core.config import settings
+from .db_pool import PoolMetrics, engine_options, instrument_engine
+from .query_metrics import instrument_queries
 
-engine = create_engine(settings.database_url)
+def _instrument(engine, metrics: PoolMetrics):
+    instrument_engine(engine, metrics)
+    if settings.sql_metrics_enabled:
+        instrument_queries(engine)
+
+pool_metrics = PoolMetrics("sync")
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, QueuePool, pool_metrics))
+_instrument(engine, pool_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Read replica; without one, reads use the primary
+read_engine = engine
+ReadSessionLocal = SessionLocal
+read_pool_metrics = None
+if settings.read_database_url:
+    read_pool_metrics = PoolMetrics("read")
+    read_engine = create_engine(
+        settings.read_database_url, **engine_options(settings.read_database_url, QueuePool, read_pool_metrics)
+    )
+    _instrument(read_engine, read_pool_metrics)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async drivers for the sync URLs used everywhere else
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a sync database URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+async_pool_metrics = None
+async_read_pool_metrics = None
+if settings.async_database:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_pool_metrics = PoolMetrics("async")
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url),
+        **engine_options(settings.database_url, AsyncAdaptedQueuePool, async_pool_metrics)
+    )
+    _instrument(async_engine.sync_engine, async_pool_metrics)
+    # Objects stay usable after commit: expired attributes can't be lazily
+    # reloaded outside the session's greenlet when the response is serialized
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.read_database_url:
+        async_read_pool_metrics = PoolMetrics("async-read")
+        async_read_engine = create_async_engine(
+            async_database_url(settings.read_database_url),
+            **engine_options(settings.read_database_url, AsyncAdaptedQueuePool, async_read_pool_metrics)
+        )
+        _instrument(async_read_engine.sync_engine, async_read_pool_metrics)
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
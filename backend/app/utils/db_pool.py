@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import Pool, QueuePool
+from ..core.config import settings
+
+# Checkout latencies kept for the percentiles
+RECENT_WAITS = 2048
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's connection pool (per process).
+
+    Wait time is measured around the whole checkout: time queued for a free
+    connection plus, when one is opened, the connect and pre-ping.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=RECENT_WAITS)
+        self.pool: Optional[Pool] = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            self.checkouts = 0
+            self.timeouts = 0
+            self.overflow_events = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.peak_checked_out = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_checkout(self, wait: float, checked_out: int, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._waits.append(wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            result = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[f"wait_{label}_ms"] = round(waits[min(int(len(waits) * q), len(waits) - 1)] * 1000, 3) if waits else 0.0
+
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            result.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        elif pool is not None:
+            result["pool_class"] = type(pool).__name__
+        return result
+
+
+def instrumented_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """A QueuePool subclass reporting checkouts to metrics; survives engine.dispose()"""
+
+    class InstrumentedPool(base):
+        def connect(self):
+            start = time.perf_counter()
+            overflow_before = self.overflow()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            overflow = self.overflow()
+            metrics.record_checkout(
+                time.perf_counter() - start,
+                self.checkedout(),
+                overflowed=overflow > 0 and overflow > overflow_before,
+            )
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def is_memory_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, pool_base: Type[QueuePool], metrics: PoolMetrics) -> Dict[str, Any]:
+    """create_engine keyword arguments for the pool settings.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pool: a second
+    connection would see an empty database.
+    """
+    if is_memory_database(url):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(pool_base, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_engine(engine: Engine, metrics: PoolMetrics) -> None:
+    """Attach metrics to engine and apply the SQLite pragmas to each new connection"""
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "engine_disposed")
+    def _track_new_pool(engine_):
+        metrics.pool = engine_.pool
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+        if engine.dialect.name == "sqlite":
+            _apply_sqlite_pragmas(dbapi_connection)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+
+def _apply_sqlite_pragmas(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the single writer; NORMAL is durable under WAL
+        # except for the last transactions before a power loss
+        if settings.sqlite_journal_mode:
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        if settings.sqlite_synchronous:
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        # Wait for a competing writer instead of failing with "database is locked"
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if settings.sqlite_cache_size_kib:
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    finally:
+        cursor.close()
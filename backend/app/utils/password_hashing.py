@@ -0,0 +1,148 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from ..core.config import settings
+
+# Built from settings at import time, so worker processes get the same parameters
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=settings.password_hash_rounds,
+)
+
+
+class PasswordHashingOverloaded(Exception):
+    """All hashing workers are busy and the wait queue is full, or the call timed out"""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs password hashing in a dedicated, size-limited process pool.
+
+    At most workers + max_queue calls are admitted at once; further calls
+    fail fast with PasswordHashingOverloaded instead of piling up request
+    threads behind CPU-bound work. A call keeps its slot until a worker has
+    finished it, even if the caller gave up waiting after the timeout, so
+    admission never runs ahead of the pool. With workers = 0, hashing runs
+    inline in the calling thread without admission control (the previous
+    behaviour).
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._admission = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0  # Finished by a worker, including calls whose caller timed out
+        self.rejected = 0  # Turned away at admission
+        self.timed_out = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned, not forked: the server process is multi-threaded
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _submit(self, func, *args) -> Future:
+        """Admit a call and hand it to the pool, or raise PasswordHashingOverloaded"""
+        if not self._admission.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PasswordHashingOverloaded()
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            future = self._get_pool().submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is freed when the worker is done, not when the caller stops waiting
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[Future]):
+        with self._stats_lock:
+            self.in_flight -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+        self._admission.release()
+
+    def _abandon(self, future: Future) -> PasswordHashingOverloaded:
+        # Cancelling frees the slot now if no worker has picked the call up yet
+        future.cancel()
+        with self._stats_lock:
+            self.timed_out += 1
+        return PasswordHashingOverloaded()
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        future = self._submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise self._abandon(future)
+
+    async def _run_async(self, func, *args):
+        """Like _run, but awaits the worker instead of blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        if self.workers <= 0:
+            return await loop.run_in_executor(None, func, *args)
+        future = self._submit(func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise self._abandon(future)
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash); new_hash is set when the stored hash uses outdated parameters"""
+        return self._run(_verify_and_update, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password)
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run_async(_verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "rounds": settings.password_hash_rounds,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers if settings.password_hash_workers >= 0 else (os.cpu_count() or 1),
+    max_queue=settings.password_hash_max_queue,
+    timeout=settings.password_hash_timeout_seconds,
+)
@@ -0,0 +1,225 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+# Longest statement text kept for logs
+STATEMENT_PREVIEW = 300
+
+REQUEST_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+DB_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class RequestQueries:
+    """Statements executed on behalf of one request.
+
+    Set in a context variable by QueryMetricsMiddleware; threadpool calls and
+    the async engine's greenlets run in a copy of the request's context, so
+    they all record into the same object.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least threshold times: the N+1 pattern"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Time each statement on engine and add it to the current request's RequestQueries"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        queries = current_queries.get()
+        if queries is not None:
+            queries.record(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class RouteMetrics:
+    """Per-route request latency, query count and database time (per process)"""
+
+    METRICS = (
+        ("http_request_duration_seconds", "Request latency until the response body is sent", REQUEST_SECONDS_BUCKETS),
+        ("http_request_db_queries", "SQL statements executed per request", QUERY_COUNT_BUCKETS),
+        ("http_request_db_seconds", "Time spent executing SQL per request", DB_SECONDS_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self._n_plus_one: Counter = Counter()
+
+    def observe(self, method: str, route: str, seconds: float, queries: RequestQueries, n_plus_one: bool):
+        key = (method, route)
+        with self._lock:
+            histograms = self._routes.get(key)
+            if histograms is None:
+                histograms = self._routes[key] = {name: Histogram(buckets) for name, _, buckets in self.METRICS}
+            histograms["http_request_duration_seconds"].observe(seconds)
+            histograms["http_request_db_queries"].observe(queries.count)
+            histograms["http_request_db_seconds"].observe(queries.seconds)
+            if n_plus_one:
+                self._n_plus_one[key] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, description, _ in self.METRICS:
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), histograms in sorted(self._routes.items()):
+                    lines.extend(histograms[name].samples(name, _labels(method, route)))
+            lines.append("# HELP http_request_n_plus_one_total Requests that repeated one statement at least SQL_N_PLUS_ONE_THRESHOLD times")
+            lines.append("# TYPE http_request_n_plus_one_total counter")
+            for (method, route), count in sorted(self._n_plus_one.items()):
+                lines.append(f"http_request_n_plus_one_total{{{_labels(method, route)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+route_metrics = RouteMetrics()
+
+
+class QueryMetricsMiddleware:
+    """Per-request SQL accounting.
+
+    Adds a Server-Timing header (queries executed before the response
+    starts), then, once the body is sent, records the route's histograms
+    and logs one JSON line to the app.sql logger: at INFO, or at WARNING
+    when a statement was repeated SQL_N_PLUS_ONE_THRESHOLD times. Routes are
+    labelled by their path template, so ids don't create new series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(queries, time.perf_counter() - started).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+            self._finish(scope, queries, time.perf_counter() - started, status_code)
+
+    def _finish(self, scope, queries: RequestQueries, seconds: float, status_code: int):
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or "<unmatched>"
+        repeated = queries.repeated(settings.sql_n_plus_one_threshold)
+        route_metrics.observe(scope["method"], route_path, seconds, queries, n_plus_one=bool(repeated))
+
+        level = logging.WARNING if repeated else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            "method": scope["method"],
+            "route": route_path,
+            "status": status_code,
+            "duration_ms": round(seconds * 1000, 2),
+            "db_queries": queries.count,
+            "db_ms": round(queries.seconds * 1000, 2),
+            "slowest_ms": round(queries.slowest_seconds * 1000, 2),
+            "slowest_statement": _preview(queries.slowest_statement),
+        }
+        if repeated:
+            record["n_plus_one"] = [{"statement": _preview(statement), "count": count} for statement, count in repeated]
+        logger.log(level, json.dumps(record))
+
+
+def _server_timing(queries: RequestQueries, seconds: float) -> str:
+    parts = [
+        f'db;dur={queries.seconds * 1000:.2f};desc="{queries.count} queries"',
+        f"db-slowest;dur={queries.slowest_seconds * 1000:.2f}",
+        f"app;dur={seconds * 1000:.2f}",
+    ]
+    return ", ".join(parts)
+
+
+def _preview(statement: Optional[str]) -> Optional[str]:
+    if statement is None:
+        return None
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_PREVIEW else statement[:STATEMENT_PREVIEW] + "..."
@@ -0,0 +1,73 @@
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from fastapi import Depends
+from sqlalchemy import select
+from ..core.config import settings
+from ..models.user import User
+from .auth import verify_token, verify_token_async
+from .database import SessionLocal, ReadSessionLocal, AsyncSessionLocal, AsyncReadSessionLocal, read_engine, engine
+
+
+class ReadRouter:
+    """Chooses the primary or the read replica for a user's read-only request.
+
+    Users who wrote within READ_YOUR_WRITES_SECONDS read from the primary, so
+    they see their own changes even while the replica lags. Writes are
+    recorded in users.last_write_at by analytics_cache.invalidate_user, which
+    every write path calls inside its transaction before committing: the
+    marker is visible to every worker once the write commits, and a write
+    that rolls back leaves none. It is looked up on the primary, which is
+    never behind.
+    """
+
+    def __init__(self, enabled: bool, recent_write_window: float):
+        self.enabled = enabled
+        self.recent_write_window = recent_write_window
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def _choose(self, last_write_at: Optional[datetime]) -> bool:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.recent_write_window)
+        if last_write_at is not None and last_write_at > cutoff:
+            self.primary_reads += 1
+            return False
+        self.replica_reads += 1
+        return True
+
+    def use_replica(self, user_id: int) -> bool:
+        if not self.enabled:
+            return False
+        with closing(SessionLocal()) as db:
+            last_write_at = db.query(User.last_write_at).filter(User.id == user_id).scalar()
+        return self._choose(last_write_at)
+
+    async def use_replica_async(self, user_id: int) -> bool:
+        if not self.enabled:
+            return False
+        async with AsyncSessionLocal() as db:
+            last_write_at = (await db.execute(select(User.last_write_at).where(User.id == user_id))).scalar()
+        return self._choose(last_write_at)
+
+    def stats(self) -> Dict[str, object]:
+        return {"enabled": self.enabled, "replica_reads": self.replica_reads, "primary_reads": self.primary_reads}
+
+
+read_router = ReadRouter(enabled=read_engine is not engine, recent_write_window=settings.read_your_writes_seconds)
+
+def read_session_factory(user_id: int):
+    """Session factory for a read-only query made on behalf of user_id"""
+    return ReadSessionLocal if read_router.use_replica(user_id) else SessionLocal
+
+def get_read_db(user_id: int = Depends(verify_token)):
+    """get_db for read-only routes: the replica unless the user wrote recently"""
+    db = read_session_factory(user_id)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(user_id: int = Depends(verify_token_async)):
+    session_factory = AsyncReadSessionLocal if await read_router.use_replica_async(user_id) else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
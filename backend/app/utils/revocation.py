@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from ..core.config import settings
+from ..models.token import RevokedToken
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of created_at order are still picked up
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationList:
+    """In-memory set of revoked access-token jtis, mirrored from revoked_tokens.
+
+    verify_token checks it with a dict lookup, so revocation costs no query per
+    request. Revocations made in this process apply immediately; those made by
+    other processes arrive with the next sync. Entries are dropped once the
+    token would have expired anyway, which keeps the set small enough that a
+    plain set beats a probabilistic filter.
+
+    While the sync thread runs, a set whose last successful sync is older than
+    max_staleness seconds is reported stale, and verify_token rejects every
+    token rather than miss revocations made elsewhere in the meantime.
+    """
+
+    def __init__(self, sync_interval: float, max_staleness: float = 0):
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self._revoked: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._synced_until: Optional[datetime] = None
+        self._synced_at: Optional[float] = None  # time.monotonic() of the last successful sync
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.syncs = 0
+        self.failures = 0
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def is_stale(self) -> bool:
+        """Whether the background sync has been failing for longer than max_staleness"""
+        if self.max_staleness <= 0 or self._thread is None or self._synced_at is None:
+            return False
+        return time.monotonic() - self._synced_at > self.max_staleness
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self) -> None:
+        """Load revocations created since the last sync and drop expired entries"""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+            if self._synced_until is not None:
+                query = query.filter(RevokedToken.created_at >= self._synced_until - SYNC_OVERLAP)
+            rows = query.all()
+        finally:
+            db.close()
+
+        with self._lock:
+            for jti, expires_at in rows:
+                self._revoked[jti] = expires_at
+            for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+            self._synced_until = now
+            self._synced_at = time.monotonic()
+            self.syncs += 1
+
+    def purge_expired(self) -> int:
+        """Delete revocations of tokens that have expired since. Commits."""
+        db = SessionLocal()
+        try:
+            deleted = db.query(RevokedToken).filter(
+                RevokedToken.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+                if self.syncs % 720 == 0:
+                    self.purge_expired()
+            except Exception:
+                # Keep the last known set; is_stale() fails closed if this lasts
+                self.failures += 1
+                logger.exception("Token revocation sync failed")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "revoked": len(self._revoked),
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "synced_until": self._synced_until,
+            "stale": self.is_stale(),
+        }
+
+
+revocation_list = RevocationList(
+    settings.token_revocation_sync_seconds,
+    max_staleness=settings.token_revocation_max_staleness_seconds,
+)
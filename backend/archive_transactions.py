@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Script to move old transactions from the transactions table to
+archived_transactions, keeping the hot table (and its indexes) bounded.
+Run it periodically (e.g. nightly from cron). Analytics, balance history and
+exports keep including archived rows; the transaction CRUD endpoints only
+see the hot table.
+
+Usage: python archive_transactions.py [--user-id ID] [--older-than-days N | --before YYYY-MM-DD]
+                                      [--batch-size N] [--dry-run]
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import func
+from app.core.config import settings
+from app.utils.database import SessionLocal
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.archive_service import archive_transactions
+
+def main():
+    """Main function to archive old transactions"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="Only archive this user's transactions")
+    cutoff = parser.add_mutually_exclusive_group()
+    cutoff.add_argument("--older-than-days", type=int, default=settings.archive_after_days,
+                        help="Archive transactions older than this many days (default: ARCHIVE_AFTER_DAYS)")
+    cutoff.add_argument("--before", type=datetime.fromisoformat, default=None,
+                        help="Archive transactions dated before this date instead")
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the transactions that would move")
+    args = parser.parse_args()
+
+    before = args.before or datetime.utcnow() - timedelta(days=args.older_than_days)
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id is not None else [row[0] for row in db.query(User.id).all()]
+        if args.dry_run:
+            pending = db.query(func.count(Transaction.id)).filter(
+                Transaction.user_id.in_(user_ids),
+                Transaction.transaction_date < before
+            ).scalar()
+            print(f"Would archive {pending} transactions dated before {before:%Y-%m-%d}")
+            return
+
+        moved = 0
+        for user_id in user_ids:
+            moved += archive_transactions(db, user_id, before, batch_size=args.batch_size)
+        print(f"Archived {moved} transactions dated before {before:%Y-%m-%d} for {len(user_ids)} users")
+    except Exception as e:
+        print(f"Error archiving transactions: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
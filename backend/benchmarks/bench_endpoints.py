@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Load-test the API with a realistic request mix and check it against a baseline.
+
+Starts the API with uvicorn against a throwaway SQLite database (migrated
+with Alembic) or --database-url, and seeds --users accounts with
+--transactions each through the API. Then --clients virtual users run for
+--seconds, --repeat times, each picking requests from MIX by weight across
+the auth, transactions, categories and analytics routers. Per endpoint it
+reports the median over the runs of p50/p95/p99 latency and throughput,
+plus errors and SQL statements per request (read from the Server-Timing
+header, so streamed responses only count the statements made before the
+first byte).
+
+With --save-baseline the results are written to --baseline. Otherwise,
+when the baseline exists, the run fails (exit status 1) if a hot endpoint's
+p95 (given at least MIN_SAMPLES requests) or statements per request grew
+beyond --max-regression, or if any request failed with a 5xx. Baselines
+are machine-specific: save one on the machine that runs the comparison.
+
+Usage: python benchmarks/bench_endpoints.py [--clients 16] [--seconds 15] [--repeat 3] [--users 4]
+                                            [--transactions 5000] [--database-url URL]
+                                            [--save-baseline] [--max-regression 0.25]
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_endpoints.json")
+PORT = 8768
+BASE_URL = f"http://127.0.0.1:{PORT}"
+PASSWORD = "bench-password"
+
+# Milliseconds of p95 growth always tolerated, so sub-millisecond endpoints don't fail on noise
+P95_SLACK_MS = 2.0
+
+# Fewer requests than this give a p95 too noisy to compare
+MIN_SAMPLES = 100
+
+QUERY_COUNT = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+# (endpoint, weight, hot): hot endpoints are checked against the baseline
+MIX = [
+    ("auth.login", 1, False),
+    ("auth.refresh", 2, False),
+    ("transactions.list", 14, True),
+    ("transactions.list_next_page", 5, True),
+    ("transactions.get", 8, True),
+    ("transactions.create", 4, True),
+    ("transactions.update", 2, False),
+    ("transactions.delete", 2, False),
+    ("transactions.export_90_days", 1, False),
+    ("categories.list", 6, True),
+    ("categories.get", 3, False),
+    ("analytics.dashboard", 8, True),
+    ("analytics.summary", 4, True),
+    ("analytics.spending_by_category", 3, False),
+    ("analytics.recent_transactions", 2, False),
+    ("analytics.trends", 3, True),
+    ("analytics.balance_history", 3, True),
+    ("analytics.rolling", 2, False),
+    ("analytics.month_over_month", 1, False),
+    ("analytics.forecast", 1, False),
+    ("analytics.category_percentiles", 1, False),
+    ("analytics.subscriptions", 1, False),
+]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--seconds", type=float, default=15, help="Measured duration of each run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs against the same server; latencies are the median over runs")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured duration before it")
+    parser.add_argument("--users", type=int, default=4, help="Seeded accounts the virtual users share")
+    parser.add_argument("--transactions", type=int, default=5000, help="Transactions seeded per account")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", help="Existing, migrated database; defaults to a throwaway SQLite file")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="Extra server setting, e.g. ASYNC_DATABASE=true")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed relative growth of p95 and statements per request")
+    parser.add_argument("--json", help="Also write the results to this file")
+    return parser.parse_args()
+
+def start_server(env, workers):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    for _ in range(300):
+        try:
+            httpx.get(f"{BASE_URL}/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+def seed_rows(rng, categories, count):
+    """count transactions over the last three years: monthly salaries and rent, skewed daily spending"""
+    income = [c for c in categories if c["type"] == "income"]
+    expenses = [c for c in categories if c["type"] == "expense"]
+    weights = [1 / (rank + 1) for rank in range(len(expenses))]
+    end = datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(days=3 * 365)
+
+    rows = []
+    month = start.replace(day=1, hour=9, minute=0, second=0)
+    while month < end and len(rows) < count // 10:
+        rows.append({"amount": "4200.00", "description": "Salary", "category_id": income[0]["id"], "transaction_date": month.isoformat()})
+        rows.append({"amount": "1450.00", "description": "Rent", "category_id": expenses[0]["id"], "transaction_date": (month + timedelta(days=2)).isoformat()})
+        month = (month + timedelta(days=32)).replace(day=1)
+    while len(rows) < count:
+        category = rng.choices(expenses, weights)[0]
+        moment = start + timedelta(seconds=rng.randrange(int((end - start).total_seconds())))
+        amount = round(rng.lognormvariate(3, 0.9), 2)
+        rows.append({"amount": f"{amount:.2f}", "description": f"{category['name']} {rng.randrange(40)}",
+                     "category_id": category["id"], "transaction_date": moment.isoformat()})
+    return rows
+
+def seed_user(index, rng, transactions):
+    """Register (or reuse) and seed one bench account; returns its email, categories and some transaction ids"""
+    user = {"email": f"bench-endpoints-{index}@example.com", "password": PASSWORD, "full_name": f"Bench {index}"}
+    with httpx.Client(base_url=BASE_URL, timeout=300) as client:
+        client.post("/api/v1/auth/register", json=user)
+        tokens = client.post("/api/v1/auth/login", json={"email": user["email"], "password": PASSWORD}).raise_for_status().json()
+        client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+        categories = client.get("/api/v1/categories/").raise_for_status().json()
+        existing = client.get("/api/v1/transactions/", params={"limit": 1}).raise_for_status().json()
+        if not existing:
+            rows = seed_rows(rng, categories, transactions)
+            for offset in range(0, len(rows), 5000):
+                client.post("/api/v1/transactions/bulk", json={"transactions": rows[offset:offset + 5000]}).raise_for_status()
+        ids = [row["id"] for row in client.get("/api/v1/transactions/", params={"limit": 100}).raise_for_status().json()]
+    return {"email": user["email"], "categories": categories, "transaction_ids": ids}
+
+
+class VirtualUser:
+    """One client session issuing MIX requests back to back"""
+
+    def __init__(self, account, rng):
+        self.account = account
+        self.rng = rng
+        self.refresh_token = None
+        self.next_cursor = None
+        self.created = []
+        self.client = httpx.AsyncClient(base_url=BASE_URL, timeout=60)
+
+    async def login(self):
+        """Start this user's own login session; refresh tokens can't be shared between clients"""
+        response = await self.client.post("/api/v1/auth/login", json={"email": self.account["email"], "password": PASSWORD})
+        tokens = response.raise_for_status().json()
+        self.refresh_token = tokens["refresh_token"]
+        self.client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+
+    def new_transaction(self):
+        category = self.rng.choice(self.account["categories"])
+        return {
+            "amount": f"{self.rng.uniform(1, 200):.2f}",
+            "description": "Bench purchase",
+            "category_id": category["id"],
+            "transaction_date": (datetime.utcnow() - timedelta(days=self.rng.randrange(30))).isoformat(),
+        }
+
+    def request(self, endpoint):
+        """(method, path, keyword arguments) for one request to endpoint"""
+        today = datetime.utcnow().date()
+        if endpoint == "auth.login":
+            return "POST", "/api/v1/auth/login", {"json": {"email": self.account["email"], "password": PASSWORD}}
+        if endpoint == "auth.refresh":
+            return "POST", "/api/v1/auth/refresh", {"json": {"refresh_token": self.refresh_token}}
+        if endpoint == "transactions.list":
+            return "GET", "/api/v1/transactions/", {"params": {"cursor": "", "limit": 50}}
+        if endpoint == "transactions.list_next_page":
+            return "GET", "/api/v1/transactions/", {"params": {"cursor": self.next_cursor or "", "limit": 50}}
+        if endpoint == "transactions.get":
+            return "GET", f"/api/v1/transactions/{self.rng.choice(self.account['transaction_ids'])}", {}
+        if endpoint == "transactions.create":
+            return "POST", "/api/v1/transactions/", {"json": self.new_transaction()}
+        if endpoint == "transactions.update":
+            if not self.created:
+                return self.request("transactions.create")
+            return "PUT", f"/api/v1/transactions/{self.rng.choice(self.created)}", {"json": {"amount": f"{self.rng.uniform(1, 200):.2f}"}}
+        if endpoint == "transactions.delete":
+            if not self.created:
+                return self.request("transactions.create")
+            return "DELETE", f"/api/v1/transactions/{self.created.pop()}", {}
+        if endpoint == "transactions.export_90_days":
+            return "GET", "/api/v1/transactions/export", {"params": {"start_date": (datetime.utcnow() - timedelta(days=90)).isoformat()}}
+        if endpoint == "categories.list":
+            return "GET", "/api/v1/categories/", {}
+        if endpoint == "categories.get":
+            return "GET", f"/api/v1/categories/{self.rng.choice(self.account['categories'])['id']}", {}
+
+        analytics = {
+            "analytics.dashboard": ("/dashboard", {}),
+            "analytics.summary": ("/summary", {"start_date": (today - timedelta(days=90)).isoformat()}),
+            "analytics.spending_by_category": ("/spending-by-category", {}),
+            "analytics.recent_transactions": ("/recent-transactions", {"limit": 20}),
+            "analytics.trends": ("/trends", {"bucket": self.rng.choice(["week", "month"]), "tz": "Europe/Berlin"}),
+            "analytics.balance_history": ("/balance-history", {"bucket": "month"}),
+            "analytics.rolling": ("/rolling", {}),
+            "analytics.month_over_month": ("/month-over-month", {}),
+            "analytics.forecast": ("/forecast", {}),
+            "analytics.category_percentiles": ("/category-percentiles", {}),
+            "analytics.subscriptions": ("/subscriptions", {}),
+        }
+        path, params = analytics[endpoint]
+        return "GET", f"/api/v1/analytics{path}", {"params": params}
+
+    def observe(self, endpoint, response):
+        if response.status_code >= 300:
+            return
+        if endpoint == "auth.refresh":
+            self.refresh_token = response.json()["refresh_token"]
+        elif endpoint.startswith("transactions.list"):
+            self.next_cursor = response.json()["next_cursor"]
+        elif endpoint == "transactions.create" or (endpoint in ("transactions.update", "transactions.delete") and response.request.method == "POST"):
+            self.created.append(response.json()["id"])
+
+
+async def drive(user, endpoints, weights, stop_at, measure_from, samples):
+    try:
+        while time.perf_counter() < stop_at:
+            endpoint = user.rng.choices(endpoints, weights)[0]
+            method, path, kwargs = user.request(endpoint)
+            started = time.perf_counter()
+            try:
+                response = await user.client.request(method, path, **kwargs)
+            except httpx.HTTPError:
+                if started >= measure_from:
+                    samples[endpoint]["errors"] += 1
+                    samples[endpoint]["5xx"] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            user.observe(endpoint, response)
+            if started < measure_from:
+                continue
+            sample = samples[endpoint]
+            sample["latencies"].append(elapsed)
+            if response.status_code >= 400:
+                sample["errors"] += 1
+                if response.status_code >= 500:
+                    sample["5xx"] += 1
+            match = QUERY_COUNT.search(response.headers.get("server-timing", ""))
+            if match:
+                sample["queries"].append(int(match.group(1)))
+    finally:
+        await user.client.aclose()
+
+async def run_load(accounts, args):
+    endpoints = [endpoint for endpoint, _, _ in MIX]
+    weights = [weight for _, weight, _ in MIX]
+    samples = defaultdict(lambda: {"latencies": [], "queries": [], "errors": 0, "5xx": 0})
+    users = [
+        VirtualUser(accounts[index % len(accounts)], random.Random(args.seed * 1000 + index))
+        for index in range(args.clients)
+    ]
+    for user in users:
+        await user.login()  # One at a time: a burst of logins would queue on password hashing
+    measure_from = time.perf_counter() + args.warmup
+    stop_at = measure_from + args.seconds
+    await asyncio.gather(*(drive(user, endpoints, weights, stop_at, measure_from, samples) for user in users))
+    return samples
+
+def summarize(samples, seconds):
+    results = {}
+    for endpoint, _, hot in MIX:
+        sample = samples.get(endpoint)
+        if not sample or not sample["latencies"]:
+            continue
+        latencies = sorted(sample["latencies"])
+        percentile = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+        results[endpoint] = {
+            "hot": hot,
+            "requests": len(latencies),
+            "errors": sample["errors"],
+            "server_errors": sample["5xx"],
+            "rps": round(len(latencies) / seconds, 2),
+            "p50_ms": round(percentile(0.5), 2),
+            "p95_ms": round(percentile(0.95), 2),
+            "p99_ms": round(percentile(0.99), 2),
+            "queries_per_request": round(statistics.mean(sample["queries"]), 2) if sample["queries"] else None,
+        }
+    return results
+
+def combine(runs):
+    """Median of each metric over repeated runs; counts are summed"""
+    results = {}
+    for endpoint, _, _ in MIX:
+        present = [run[endpoint] for run in runs if endpoint in run]
+        if not present:
+            continue
+        combined = {"hot": present[0]["hot"]}
+        for key in ("requests", "errors", "server_errors"):
+            combined[key] = sum(result[key] for result in present)
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            combined[key] = round(statistics.median(result[key] for result in present), 2)
+        queries = [result["queries_per_request"] for result in present if result["queries_per_request"] is not None]
+        combined["queries_per_request"] = round(statistics.median(queries), 2) if queries else None
+        results[endpoint] = combined
+    return results
+
+def compare(results, baseline, max_regression):
+    """Regression messages for hot endpoints, plus any server errors"""
+    failures = []
+    for endpoint, result in results.items():
+        if result["server_errors"]:
+            failures.append(f"{endpoint}: {result['server_errors']} server errors")
+        base = baseline["endpoints"].get(endpoint)
+        if not result["hot"] or base is None:
+            continue
+        allowed_p95 = base["p95_ms"] * (1 + max_regression) + P95_SLACK_MS
+        if result["requests"] >= MIN_SAMPLES and result["p95_ms"] > allowed_p95:
+            failures.append(f"{endpoint}: p95 {result['p95_ms']:.1f} ms > {allowed_p95:.1f} ms (baseline {base['p95_ms']:.1f} ms)")
+        if result["queries_per_request"] is not None and base.get("queries_per_request") is not None:
+            allowed_queries = base["queries_per_request"] * (1 + max_regression) + 0.5
+            if result["queries_per_request"] > allowed_queries:
+                failures.append(
+                    f"{endpoint}: {result['queries_per_request']:.2f} statements/request > {allowed_queries:.2f} "
+                    f"(baseline {base['queries_per_request']:.2f})"
+                )
+    return failures
+
+def print_report(results, baseline):
+    total = sum(result["requests"] for result in results.values())
+    rps = sum(result["rps"] for result in results.values())
+    print(f"\n{'endpoint':<34}{'req':>7}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sql/req':>9}{'base p95':>10}")
+    for endpoint, result in results.items():
+        base = (baseline or {}).get("endpoints", {}).get(endpoint)
+        queries = f"{result['queries_per_request']:.2f}" if result["queries_per_request"] is not None else "-"
+        print(
+            f"{endpoint + (' *' if result['hot'] else ''):<34}{result['requests']:>7}{result['errors']:>6}{result['rps']:>9.1f}"
+            f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{queries:>9}"
+            f"{(format(base['p95_ms'], '.1f') if base else '-'):>10}"
+        )
+    print(f"\ntotal {total} requests, {rps:.1f} req/s (* hot endpoints, checked against the baseline)")
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_endpoints.db')}"
+    env = {**os.environ, "DATABASE_URL": database_url, "JOB_RUNNER": "external"}
+    env.update(setting.split("=", 1) for setting in args.env)
+    if not args.database_url:
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+                       check=True, capture_output=True)
+
+    server = start_server(env, args.server_workers)
+    try:
+        started = time.perf_counter()
+        accounts = [seed_user(index, random.Random(args.seed + index), args.transactions) for index in range(args.users)]
+        print(f"Seeded {args.users} accounts x {args.transactions} transactions in {time.perf_counter() - started:.1f} s")
+        runs = []
+        for repeat in range(args.repeat):
+            runs.append(summarize(asyncio.run(run_load(accounts, args)), args.seconds))
+            print(f"Run {repeat + 1}/{args.repeat}: {sum(result['requests'] for result in runs[-1].values())} requests")
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = combine(runs)
+    run = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "machine": f"{platform.node()} {platform.machine()} {os.cpu_count()} CPUs, Python {platform.python_version()}",
+            "database": database_url.split(":", 1)[0],
+            **{name: getattr(args, name) for name in ("clients", "seconds", "repeat", "users", "transactions", "seed", "server_workers", "env")},
+        },
+        "endpoints": results,
+    }
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(run, out, indent=2)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as out:
+            json.dump(run, out, indent=2)
+            out.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if baseline is None:
+        print("No baseline to compare against; run with --save-baseline first")
+        return
+
+    mismatched = [name for name in ("clients", "users", "transactions", "server_workers", "env") if baseline["meta"].get(name) != run["meta"][name]]
+    if mismatched:
+        print(f"Warning: baseline was recorded with different {', '.join(mismatched)}")
+    failures = compare(results, baseline, args.max_regression)
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nNo hot endpoint regressed by more than {args.max_regression:.0%} against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy columnar ledger against the equivalent SQL path.
+
+Seeds a throwaway SQLite database with one user and N transactions, then
+times 30-day rolling expense sums and per-category percentiles computed
+(a) with SQL aggregation plus Python and (b) on the ColumnarLedger, both
+cold (including the load) and warm (cached arrays).
+
+Usage: python benchmarks/bench_ledger_engine.py [--rows 200000] [--repeat 5]
+"""
+
+import sys
+import os
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+def timed(label, func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    print(f"{label:<45} best {min(timings) * 1000:9.1f} ms   mean {sum(timings) / len(timings) * 1000:9.1f} ms")
+    return result
+
+def main():
+    args = parse_args()
+    database = os.path.join(tempfile.mkdtemp(), "bench_ledger.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+
+    from sqlalchemy import func, insert
+    from app.models.base import Base
+    from app.models import User, Category, Transaction
+    from app.models.category import CategoryType
+    from app.utils.database import engine, SessionLocal
+    from app.services.ledger_engine import ColumnarLedger
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    db.add(user)
+    db.flush()
+    categories = [
+        Category(name=f"Category {i}", type=CategoryType.INCOME if i < 2 else CategoryType.EXPENSE, user_id=user.id)
+        for i in range(10)
+    ]
+    db.add_all(categories)
+    db.flush()
+
+    random.seed(42)
+    start = datetime(2020, 1, 1)
+    rows = [
+        {
+            "amount": Decimal(random.randint(100, 500000)) / 100,
+            "description": "bench",
+            "transaction_date": start + timedelta(minutes=random.randint(0, 60 * 24 * 365 * 4)),
+            "user_id": user.id,
+            "category_id": categories[random.randrange(10)].id,
+        }
+        for _ in range(args.rows)
+    ]
+    db.execute(insert(Transaction), rows)
+    db.commit()
+    print(f"Seeded {args.rows} transactions into {database}\n")
+
+    range_start, range_end = date(2022, 1, 1), date(2023, 12, 31)
+    expense_ids = [c.id for c in categories if c.type == CategoryType.EXPENSE]
+
+    def sql_rolling():
+        day = func.date(Transaction.transaction_date)
+        totals = dict(db.query(day, func.sum(Transaction.amount)).filter(
+            Transaction.user_id == user.id,
+            Transaction.category_id.in_(expense_ids),
+            Transaction.transaction_date >= datetime.combine(range_start - timedelta(days=29), datetime.min.time()),
+            Transaction.transaction_date < datetime.combine(range_end + timedelta(days=1), datetime.min.time()),
+        ).group_by(day).all())
+        result, current = [], range_start
+        while current <= range_end:
+            window = (current - timedelta(days=i) for i in range(30))
+            result.append(sum(float(totals.get(d.isoformat(), 0)) for d in window))
+            current += timedelta(days=1)
+        return result
+
+    def sql_percentiles():
+        result = {}
+        for category in categories:
+            amounts = [float(a) for (a,) in db.query(Transaction.amount).filter(
+                Transaction.user_id == user.id, Transaction.category_id == category.id
+            ).order_by(Transaction.amount).all()]
+            result[category.id] = amounts[len(amounts) // 2] if amounts else None
+        return result
+
+    ledger = None
+
+    def numpy_cold():
+        nonlocal ledger
+        ledger = ColumnarLedger.load(db, user.id)
+        return ledger.rolling_sums(range_start, range_end, [30], CategoryType.EXPENSE)[30]
+
+    timed("SQL rolling 30-day expenses (2 years)", sql_rolling, args.repeat)
+    timed("NumPy rolling, cold (load + compute)", numpy_cold, args.repeat)
+    timed("NumPy rolling, warm (cached ledger)",
+          lambda: ledger.rolling_sums(range_start, range_end, [30], CategoryType.EXPENSE)[30], args.repeat)
+    timed("SQL per-category medians", sql_percentiles, args.repeat)
+    timed("NumPy per-category percentiles, warm",
+          lambda: ledger.category_percentiles(None, None, [50, 90]), args.repeat)
+    print(f"\nLedger arrays: {ledger.nbytes / 1024 / 1024:.1f} MiB for {len(ledger)} rows")
+
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput and the latency of other endpoints during a login burst.
+
+Starts the API with uvicorn against a throwaway SQLite database, once with
+inline password hashing (PASSWORD_HASH_WORKERS=0, the old behaviour) and once
+with the hashing process pool, then runs --clients concurrent login loops for
+--seconds while a probe thread times GET /api/v1/categories/.
+
+Usage: python benchmarks/bench_login.py [--clients 64] [--seconds 10] [--workers 2]
+"""
+
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+USER = {"email": "bench@example.com", "password": "bench-password", "full_name": "Bench"}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes for the pooled run")
+    parser.add_argument("--max-queue", type=int, default=16)
+    return parser.parse_args()
+
+def start_server(env):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"{BASE_URL}/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+def run(label, env, args):
+    server = start_server(env)
+    try:
+        httpx.post(f"{BASE_URL}/api/v1/auth/register", json=USER, timeout=30)
+        token = httpx.post(f"{BASE_URL}/api/v1/auth/login", json=USER, timeout=30).json()["access_token"]
+
+        stop = threading.Event()
+        counts = {"ok": 0, "503": 0, "other": 0}
+        lock = threading.Lock()
+        probe_latencies = []
+
+        def login_loop():
+            with httpx.Client(base_url=BASE_URL, timeout=60) as client:
+                while not stop.is_set():
+                    status = client.post("/api/v1/auth/login", json=USER).status_code
+                    key = "ok" if status == 200 else "503" if status == 503 else "other"
+                    with lock:
+                        counts[key] += 1
+
+        def probe_loop():
+            with httpx.Client(base_url=BASE_URL, timeout=60, headers={"Authorization": f"Bearer {token}"}) as client:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    client.get("/api/v1/categories/")
+                    probe_latencies.append(time.perf_counter() - started)
+                    time.sleep(0.05)
+
+        threads = [threading.Thread(target=login_loop) for _ in range(args.clients)]
+        threads.append(threading.Thread(target=probe_loop))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        quantiles = statistics.quantiles(probe_latencies, n=20) if len(probe_latencies) > 1 else [0] * 19
+        print(
+            f"{label:<28} logins/s {counts['ok'] / args.seconds:7.1f}   503s {counts['503']:6d}   "
+            f"other errors {counts['other']:4d}   probe p50 {statistics.median(probe_latencies) * 1000:7.1f} ms   "
+            f"p95 {quantiles[18] * 1000:7.1f} ms"
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    args = parse_args()
+    for label, workers in (("inline hashing (before)", 0), (f"process pool ({args.workers} workers)", args.workers)):
+        database = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{database}",
+            "PASSWORD_HASH_WORKERS": str(workers),
+            "PASSWORD_HASH_MAX_QUEUE": str(args.max_queue),
+            "JOB_RUNNER": "external",
+        }
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+                       check=True, capture_output=True)
+        run(label, env, args)
+
+if __name__ == "__main__":
+    main()
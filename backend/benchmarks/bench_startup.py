@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Measure how quickly a new API worker becomes useful.
+
+Migrates a throwaway SQLite database with Alembic, then:
+
+  * imports app.main in fresh interpreters (--runs times) and reports the
+    median import time, with and without the Base.metadata.create_all call
+    the app used to make at import;
+  * starts uvicorn and reports the time until /health answers, and the
+    latency of the first and second login and authenticated request.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--database-url URL]
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PORT = 8767
+BASE_URL = f"http://127.0.0.1:{PORT}"
+USER = {"email": "startup@example.com", "password": "startup-password", "full_name": "Startup"}
+
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+create_all = None
+if {create_all}:
+    from app.models.base import Base
+    from app.utils.database import engine
+    Base.metadata.create_all(bind=engine)
+    create_all = time.perf_counter() - imported
+print(json.dumps({{"import": imported - start, "create_all": create_all}}))
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Existing, migrated database; defaults to a throwaway SQLite file")
+    return parser.parse_args()
+
+def timed_import(env, create_all):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.format(create_all=create_all)],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def timed_request(method, path, **kwargs):
+    start = time.perf_counter()
+    response = httpx.request(method, f"{BASE_URL}{path}", timeout=60, **kwargs)
+    response.raise_for_status()
+    return response, (time.perf_counter() - start) * 1000
+
+def serve(env):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        for _ in range(600):
+            try:
+                httpx.get(f"{BASE_URL}/health", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        else:
+            raise RuntimeError("Server did not start")
+        ready_ms = (time.perf_counter() - start) * 1000
+
+        httpx.post(f"{BASE_URL}/api/v1/auth/register", json=USER, timeout=60)
+        results = {"ready_ms": ready_ms}
+        for attempt in ("first", "second"):
+            response, results[f"{attempt}_login_ms"] = timed_request("POST", "/api/v1/auth/login", json=USER)
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            _, results[f"{attempt}_request_ms"] = timed_request("GET", "/api/v1/transactions/", headers=headers)
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_startup.db')}"
+    env = {**os.environ, "DATABASE_URL": database_url, "JOB_RUNNER": "external"}
+    if not args.database_url:
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, env=env,
+                       check=True, capture_output=True)
+
+    imports = [timed_import(env, create_all=False)["import"] for _ in range(args.runs)]
+    with_create_all = [timed_import(env, create_all=True)["create_all"] for _ in range(args.runs)]
+    print(f"import app.main:                 median {statistics.median(imports) * 1000:7.1f} ms")
+    print(f"create_all on a migrated schema: median {statistics.median(with_create_all) * 1000:7.1f} ms (no longer run at import)")
+
+    results = serve(env)
+    print(f"uvicorn start -> /health:        {results['ready_ms']:7.1f} ms")
+    print(f"login:                           first {results['first_login_ms']:7.1f} ms, second {results['second_login_ms']:7.1f} ms")
+    print(f"GET /transactions/:              first {results['first_request_ms']:7.1f} ms, second {results['second_request_ms']:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script to detect recurring payments (subscriptions) for all users and store
+them for /api/v1/analytics/subscriptions. Run it periodically (e.g. nightly
+from cron); by default only merchants with transactions added since the last
+scan are re-detected.
+
+Usage: python detect_subscriptions.py [--user-id ID] [--workers 4] [--full]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(__file__))
+
+from app.services.subscription_service import refresh_all_subscriptions
+
+def main():
+    """Main function to detect subscriptions"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="Only scan this user's transactions")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--full", action="store_true", help="Re-detect all merchants, not just new ones")
+    args = parser.parse_args()
+
+    try:
+        user_ids = [args.user_id] if args.user_id is not None else None
+        written = refresh_all_subscriptions(workers=args.workers, full=args.full, user_ids=user_ids)
+        failed = [user_id for user_id, count in written.items() if count is None]
+        print(f"Detected {sum(count or 0 for count in written.values())} subscriptions for {len(written) - len(failed)} users")
+        if failed:
+            print(f"Subscription refresh failed for users: {', '.join(map(str, failed))}")
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error detecting subscriptions: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Script to generate a large synthetic dataset for scale testing and benchmarks.
+
+Creates --users users (synthetic-<n>@example.com, all with --password) with
+the default categories and --transactions transactions each over --years
+of history ending at --end-date:
+
+  * monthly salary with a yearly raise, occasional freelance income and
+    quarterly dividends;
+  * rent and utilities, with heating costs peaking in winter;
+  * 2-6 subscriptions per user (Netflix, gym, transit pass, ...) at a fixed
+    price and billing day, so subscription detection finds them;
+  * day-to-day spending spread over the remaining rows, heavier on
+    weekends, around the holidays (shopping) and in summer (entertainment).
+
+Every user's rows come from a generator seeded with --seed and the user's
+number, so the same --seed, --end-date and sizes always produce the same
+data, whatever --workers is (only the ids differ). Rows are written with
+COPY on PostgreSQL and executemany in --batch-size transactions elsewhere,
+then rollups, balance checkpoints and subscriptions are rebuilt per user
+(skip with --skip-derived). --workers processes split the users; on SQLite
+they only parallelise generation, as writes serialise on the database lock.
+Run it against a migrated database, then point benchmarks/bench_endpoints.py
+at it with --database-url to benchmark at that scale.
+
+Usage: python generate_synthetic_data.py [--users 100] [--transactions 10000] [--seed 42]
+                                         [--workers 4] [--end-date YYYY-MM-DD] [--user-offset 0]
+"""
+
+import sys
+import os
+import argparse
+import csv
+import io
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import insert, select
+from app.models.category import Category
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.utils.auth import get_password_hash
+from app.utils.database import SessionLocal, engine
+from app.services.balance_service import refresh_balance_checkpoints
+from app.services.category_service import DEFAULT_CATEGORIES
+from app.services.rollup_service import rebuild_rollups
+from app.services.subscription_service import refresh_subscriptions
+from app.services.transaction_service import compute_content_hash, normalize_description
+
+TRANSACTION_COLUMNS = [
+    "amount", "description", "notes", "transaction_date", "user_id",
+    "category_id", "content_hash", "merchant_key", "created_at", "updated_at",
+]
+
+# (description, category, amount, cadence)
+SUBSCRIPTIONS = [
+    ("Netflix", "Entertainment", "15.49", "monthly"),
+    ("Spotify Premium", "Entertainment", "10.99", "monthly"),
+    ("Disney+", "Entertainment", "7.99", "monthly"),
+    ("PureGym Membership", "Healthcare", "39.00", "monthly"),
+    ("iCloud Storage", "Bills & Utilities", "2.99", "monthly"),
+    ("Mobile Phone Plan", "Bills & Utilities", "25.00", "monthly"),
+    ("Amazon Prime", "Shopping", "139.00", "yearly"),
+    ("Duolingo Plus", "Education", "6.99", "monthly"),
+    ("Coursera Plus", "Education", "399.00", "yearly"),
+    ("HelloFresh Box", "Food & Dining", "59.99", "weekly"),
+    ("Metro Weekly Pass", "Transportation", "32.00", "weekly"),
+]
+
+# Day-to-day spending: category -> (share of rows, lognormal mu, sigma, merchants)
+SPENDING = {
+    "Food & Dining": (0.46, 2.7, 0.7, ["Whole Foods Market", "Trader Joe's", "Starbucks", "Chipotle", "Local Bakery",
+                                        "Pizza Palace", "Sushi Bar", "Corner Deli", "Costco", "Farmers Market"]),
+    "Transportation": (0.17, 2.9, 0.6, ["Shell", "Chevron", "Uber", "Lyft", "City Parking", "Car Wash"]),
+    "Shopping": (0.17, 3.5, 0.9, ["Amazon", "Target", "IKEA", "H&M", "Best Buy", "Etsy", "Walmart"]),
+    "Entertainment": (0.10, 3.1, 0.8, ["AMC Theatres", "Steam", "Ticketmaster", "Bowling Alley", "Museum"]),
+    "Healthcare": (0.06, 3.6, 0.8, ["CVS Pharmacy", "Walgreens", "Dental Clinic", "Optician"]),
+    "Education": (0.04, 3.8, 0.9, ["Barnes & Noble", "Udemy", "School Supplies"]),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--transactions", type=int, default=10000, help="Transactions per user")
+    parser.add_argument("--years", type=float, default=3, help="Years of history per user")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day of history (default: today)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows per COPY or committed executemany")
+    parser.add_argument("--user-offset", type=int, default=0, help="Number of the first user, to add users to an existing dataset")
+    parser.add_argument("--email-prefix", default="synthetic")
+    parser.add_argument("--password", default="synthetic-password")
+    parser.add_argument("--skip-derived", action="store_true", help="Don't rebuild rollups, balance checkpoints and subscriptions")
+    return parser.parse_args()
+
+def _money(value: float) -> Decimal:
+    return Decimal(f"{max(value, 0.5):.2f}")
+
+def _at(day: date, rng: random.Random, earliest: int = 7, latest: int = 22) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(
+        hours=rng.randint(earliest, latest - 1), minutes=rng.randrange(60), seconds=rng.randrange(60)
+    )
+
+def _months(start: date, end: date):
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+def _on_day(month: date, day: int) -> date:
+    return month.replace(day=min(day, 28))
+
+def generate_user_rows(rng: random.Random, user_id: int, categories: dict, count: int, start: date, end: date) -> list:
+    """count transaction rows for one user between start and end (inclusive)"""
+    rows = []
+
+    def add(moment: datetime, category: str, amount: Decimal, description: str):
+        if start <= moment.date() <= end:
+            rows.append((amount, description, None, moment, user_id, categories[category],
+                         compute_content_hash(moment, amount, description), normalize_description(description),
+                         moment, moment))
+
+    # Fixed income and bills
+    salary = rng.lognormvariate(8.2, 0.35)
+    payday = rng.choice([1, 15, 25, 28])
+    rent = salary * rng.uniform(0.22, 0.38)
+    freelancer = rng.random() < 0.3
+    investor = rng.random() < 0.4
+    for month in _months(start, end):
+        raise_factor = 1.03 ** (month.year - start.year)
+        add(_at(_on_day(month, payday), rng, 6, 9), "Salary", _money(salary * raise_factor), "Payroll - Acme Corp")
+        add(_at(_on_day(month, 1), rng, 8, 12), "Bills & Utilities", _money(rent), "Rent - Parkview Apartments")
+        heating = 1 + 0.45 * math.cos(2 * math.pi * (month.month - 1) / 12)
+        add(_at(_on_day(month, 12), rng), "Bills & Utilities", _money(rng.gauss(70, 8) * heating), "City Power & Gas")
+        add(_at(_on_day(month, 18), rng), "Bills & Utilities", _money(rng.gauss(32, 4)), "Water Utility")
+        if freelancer:
+            for _ in range(rng.choice([0, 1, 1, 2, 3])):
+                add(_at(_on_day(month, rng.randint(1, 28)), rng), "Freelance", _money(rng.lognormvariate(6.3, 0.6)), "Freelance invoice")
+        if investor and month.month in (3, 6, 9, 12):
+            add(_at(_on_day(month, 20), rng), "Investment", _money(rng.lognormvariate(5.0, 0.5)), "Brokerage dividend")
+
+    # Subscriptions, each with its own billing day
+    for description, category, amount, cadence in rng.sample(SUBSCRIPTIONS, rng.randint(2, 6)):
+        billed = start + timedelta(days=rng.randrange(28 if cadence != "weekly" else 7))
+        billed = billed.replace(day=min(billed.day, 28))
+        while billed <= end:
+            add(_at(billed, rng, 0, 6), category, Decimal(amount), description)
+            if cadence == "weekly":
+                billed += timedelta(weeks=1)
+            elif cadence == "monthly":
+                billed = (billed.replace(day=1) + timedelta(days=32)).replace(day=billed.day)
+            else:
+                billed = billed.replace(year=billed.year + 1)
+
+    if len(rows) > count:
+        return rng.sample(rows, count)
+
+    # Day-to-day spending fills the rest
+    span = (end - start).days + 1
+    names = list(SPENDING)
+    for _ in range(count - len(rows)):
+        while True:
+            day = start + timedelta(days=rng.randrange(span))
+            weight = (1.3 if day.weekday() >= 5 else 1.0) * (1.5 if day.month == 12 else 1.0)
+            if rng.random() * 1.95 < weight:
+                break
+        shares = [SPENDING[name][0] for name in names]
+        if day.month in (11, 12):
+            shares[names.index("Shopping")] *= 2.5
+        if day.month in (7, 8):
+            shares[names.index("Entertainment")] *= 1.8
+        category = rng.choices(names, shares)[0]
+        _, mu, sigma, merchants = SPENDING[category]
+        # Zipf-like merchant popularity
+        merchant = merchants[min(int(rng.paretovariate(1.2)) - 1, len(merchants) - 1)]
+        add(_at(day, rng), category, _money(rng.lognormvariate(mu, sigma)), merchant)
+    return rows
+
+def write_rows(rows: list):
+    """COPY on PostgreSQL, executemany in one transaction elsewhere"""
+    if engine.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY transactions ({', '.join(TRANSACTION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            connection.commit()
+        finally:
+            connection.close()
+    else:
+        with engine.begin() as connection:
+            connection.execute(insert(Transaction), [dict(zip(TRANSACTION_COLUMNS, row)) for row in rows])
+
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+def generate_users(users: list, args, start: date, end: date) -> int:
+    """Generate, write and post-process the rows of (number, user_id, categories) users"""
+    pending = []
+    written = 0
+    for number, user_id, categories in users:
+        rng = random.Random(f"{args.seed}-{number}")
+        pending.extend(generate_user_rows(rng, user_id, categories, args.transactions, start, end))
+        if len(pending) >= args.batch_size:
+            write_rows(pending)
+            written += len(pending)
+            pending = []
+    if pending:
+        write_rows(pending)
+        written += len(pending)
+
+    if not args.skip_derived:
+        db = SessionLocal()
+        try:
+            for _, user_id, _ in users:
+                rebuild_rollups(db, user_id)
+                refresh_balance_checkpoints(db, user_id, rebuild=True, until=end)
+                refresh_subscriptions(db, user_id, full=True)
+                db.commit()
+        finally:
+            db.close()
+    return written
+
+def create_users(db, args) -> list:
+    """Insert the users and their default categories; returns (number, user_id, {category name: id})"""
+    numbers = range(args.user_offset, args.user_offset + args.users)
+    emails = {f"{args.email_prefix}-{number}@example.com": number for number in numbers}
+    existing = db.scalars(select(User.email).where(User.email.in_(emails))).all()
+    if existing:
+        raise ValueError(f"{len(existing)} users already exist (e.g. {existing[0]}); pick another --user-offset")
+
+    hashed_password = get_password_hash(args.password)
+    db.execute(insert(User), [
+        {"email": email, "hashed_password": hashed_password, "full_name": f"Synthetic User {number}", "is_active": True}
+        for email, number in emails.items()
+    ])
+    user_ids = dict(db.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+    db.execute(insert(Category), [
+        {**category, "user_id": user_id} for user_id in user_ids.values() for category in DEFAULT_CATEGORIES
+    ])
+    categories = {}
+    for user_id, name, category_id in db.execute(
+        select(Category.user_id, Category.name, Category.id).where(Category.user_id.in_(user_ids.values()))
+    ):
+        categories.setdefault(user_id, {})[name] = category_id
+    db.commit()
+    return [(emails[email], user_id, categories[user_id]) for email, user_id in sorted(user_ids.items(), key=lambda item: emails[item[0]])]
+
+def main():
+    """Main function to generate synthetic data"""
+    args = parse_args()
+    end = args.end_date or date.today()
+    start = end - timedelta(days=round(args.years * 365))
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        users = create_users(db, args)
+        print(f"Created {len(users)} users with default categories")
+
+        if args.workers > 1:
+            chunks = [users[worker::args.workers] for worker in range(args.workers)]
+            engine.dispose()
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+                written = sum(pool.map(generate_users, chunks, [args] * len(chunks), [start] * len(chunks), [end] * len(chunks)))
+        else:
+            written = generate_users(users, args, start, end)
+
+        elapsed = time.perf_counter() - started
+        print(f"Created {written} transactions from {start} to {end} in {elapsed:.1f} s ({written / elapsed:,.0f} rows/s)")
+    except Exception as e:
+        print(f"Error generating synthetic data: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
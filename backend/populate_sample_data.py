@@ -16,6 +16,7 @@ from app.utils.database import get_db
 from app.models.user import User
 from app.models.category import Category, CategoryType
 from app.models.transaction import Transaction
+from app.services.transaction_service import normalize_description
 
 # Sample subscription services data
 SAMPLE_SUBSCRIPTIONS = [
@@ -101,6 +102,7 @@ def create_sample_transactions(db: Session, user_id: int, categories: dict):
             transaction = Transaction(
                 user_id=user_id,
                 description=sub["name"],
+                merchant_key=normalize_description(sub["name"]),
                 amount=Decimal(str(sub["amount"])),
                 transaction_date=transaction_date,
                 category_id=category.id,
@@ -117,6 +119,7 @@ def create_sample_transactions(db: Session, user_id: int, categories: dict):
             transaction = Transaction(
                 user_id=user_id,
                 description="Monthly Salary",
+                merchant_key=normalize_description("Monthly Salary"),
                 amount=Decimal("50000000"),  # 50M VND
                 transaction_date=transaction_date,
                 category_id=salary_category.id,
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the analytics rollup tables from the transactions table.
+Use it to backfill rollups on an existing database or to repair drift.
+
+Usage: python rebuild_rollups.py [--user-id ID]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(__file__))
+
+from app.utils.database import SessionLocal
+from app.services.rollup_service import rebuild_rollups
+
+def main():
+    """Main function to rebuild rollups"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        written = rebuild_rollups(db, user_id=args.user_id)
+        print(f"Rebuilt rollups ({written} daily rows)")
+    except Exception as e:
+        print(f"Error rebuilding rollups: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Script to create the monthly balance checkpoints used by
+/api/v1/analytics/balance-history. Run it periodically (e.g. daily from cron)
+so balance lookups only sum the rows since the latest month start.
+
+Usage: python refresh_balance_checkpoints.py [--user-id ID] [--rebuild]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(__file__))
+
+from app.utils.database import SessionLocal
+from app.models.user import User
+from app.services.balance_service import refresh_balance_checkpoints
+
+def main():
+    """Main function to refresh balance checkpoints"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="Only refresh this user's checkpoints")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute existing checkpoints from scratch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_ids = [args.user_id] if args.user_id is not None else [row[0] for row in db.query(User.id).all()]
+        created = 0
+        for user_id in user_ids:
+            created += refresh_balance_checkpoints(db, user_id, rebuild=args.rebuild)
+            db.commit()
+        print(f"Created {created} balance checkpoints for {len(user_ids)} users")
+    except Exception as e:
+        print(f"Error refreshing balance checkpoints: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Script to run background jobs (exports, yearly reports, rollup rebuilds) outside
+the API process. Set JOB_RUNNER=external for the API so it only enqueues jobs;
+several of these workers can share one database.
+
+Usage: python run_jobs.py [--workers N]
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(__file__))
+
+from app.core.config import settings
+from app.services.job_service import JobRunner
+
+def main():
+    """Main function to run the job worker until interrupted"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.job_workers, help="Jobs executed concurrently")
+    args = parser.parse_args()
+
+    runner = JobRunner(args.workers, settings.job_poll_interval_seconds)
+    print(f"Job worker {runner.name} running with {args.workers} workers")
+    try:
+        runner.run_forever()
+    except KeyboardInterrupt:
+        print("Stopping, waiting for running jobs to finish")
+    finally:
+        runner.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Settings are read when the app modules are imported, so configure them first.
+# Tests run on a scratch SQLite file unless DATABASE_URL points at a (throwaway)
+# Postgres database, which runs the Postgres variants of the query plan tests
+_DB_DIR = tempfile.mkdtemp(prefix="finance-tests-")
+if not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.update({
+    "ASYNC_DATABASE": "false",
+    "ANALYTICS_CACHE_ENABLED": "false",
+    "PASSWORD_HASH_WORKERS": "0",
+    "PASSWORD_HASH_ROUNDS": "1000",
+    "JOB_RUNNER": "external",
+    "JOB_RESULTS_DIR": os.path.join(_DB_DIR, "job_results"),
+})
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.models.base import Base
+from app.utils.auth import auth_cache
+from app.utils.database import engine, SessionLocal
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    # Not used as a context manager, so the startup hooks (job runner,
+    # revocation sync thread) don't run
+    return TestClient(app)
+
+
+class StatementCounter:
+    """Statements executed on an engine, recorded by before_cursor_execute"""
+
+    def __init__(self):
+        self.statements = []
+        # (statement, parameters) of each single execution, for replaying under EXPLAIN
+        self.executions = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_statements():
+    """Context manager yielding a StatementCounter for the statements run inside it"""
+
+    @contextmanager
+    def counting(bind=engine):
+        counter = StatementCounter()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            counter.statements.append(statement)
+            if not executemany:
+                counter.executions.append((statement, parameters))
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            yield counter
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+
+    return counting
+
+
+_user_sequence = iter(range(1, 1_000_000))
+
+
+@pytest.fixture
+def make_user(client):
+    """Register and log in a fresh user; returns (user_id, auth headers)"""
+
+    def make():
+        email = f"user{next(_user_sequence)}-{os.getpid()}@example.com"
+        password = "test-password"
+        user = client.post("/api/v1/auth/register", json={"email": email, "password": password, "full_name": "Test User"})
+        assert user.status_code == 200, user.text
+        tokens = client.post("/api/v1/auth/login", json={"email": email, "password": password}).json()
+        return user.json()["id"], {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    yield make
+    auth_cache.clear()
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def categories(client):
+    """Ids of a user's categories of one type ("income" or "expense")"""
+
+    def ids(headers, category_type="expense"):
+        response = client.get("/api/v1/categories/", headers=headers)
+        return [category["id"] for category in response.json() if category["type"] == category_type]
+
+    return ids
+
+
+@pytest.fixture
+def add_transactions(client, categories):
+    """Create count transactions for a user through /transactions/bulk, seven
+    hours apart going back from end, spread over their expense categories"""
+
+    def add(headers, count, end=datetime(2026, 6, 30, 12, 0)):
+        expense_ids = categories(headers)
+        rows = [
+            {
+                "amount": f"{10 + index % 90}.{index % 100:02d}",
+                "description": f"Purchase {index}",
+                "category_id": expense_ids[index % len(expense_ids)],
+                "transaction_date": (end - timedelta(hours=7 * index)).isoformat(),
+            }
+            for index in range(count)
+        ]
+        response = client.post("/api/v1/transactions/bulk", json={"transactions": rows}, headers=headers)
+        assert response.status_code == 200, response.text
+        return [result["id"] for result in response.json()["results"]]
+
+    return add
@@ -0,0 +1,26 @@
+"""CPU-heavy endpoints of the async API run in the threadpool, not on the event loop"""
+
+import inspect
+import pytest
+from app.api.v1_async import analytics, transactions
+
+THREADPOOL_ROUTES = [
+    (transactions.router, "/bulk"),
+    (transactions.router, "/import"),
+    (analytics.router, "/rolling"),
+    (analytics.router, "/category-percentiles"),
+    (analytics.router, "/month-over-month"),
+    (analytics.router, "/forecast"),
+]
+
+
+@pytest.mark.parametrize("router,path", THREADPOOL_ROUTES)
+def test_cpu_heavy_routes_are_sync(router, path):
+    endpoint = next(route.endpoint for route in router.routes if route.path == path)
+    # FastAPI runs plain def endpoints in its threadpool
+    assert not inspect.iscoroutinefunction(endpoint)
+
+
+def test_database_bound_routes_stay_async():
+    endpoint = next(route.endpoint for route in analytics.router.routes if route.path == "/summary")
+    assert inspect.iscoroutinefunction(endpoint)
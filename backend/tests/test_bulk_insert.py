@@ -0,0 +1,65 @@
+"""/transactions/bulk writes rows and rollups with a fixed number of statements"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+
+def _bulk_rows(expense_ids, count):
+    end = datetime(2026, 3, 31, 12, 0)
+    return [
+        {
+            "amount": f"{5 + index % 50}.25",
+            "description": f"Bulk item {index}",
+            "category_id": expense_ids[index % len(expense_ids)],
+            # Same 30 days for every batch size, so the touched buckets match
+            "transaction_date": (end - timedelta(minutes=(index * 997) % (30 * 24 * 60))).isoformat(),
+        }
+        for index in range(count)
+    ]
+
+
+def _post_bulk(client, count_statements, headers, rows):
+    with count_statements() as counter:
+        response = client.post("/api/v1/transactions/bulk", json={"transactions": rows}, headers=headers)
+    assert response.status_code == 200, response.text
+    kinds = Counter(" ".join(statement.split()[:3]) for statement in counter.statements)
+    return response.json(), counter.count, kinds
+
+
+def test_bulk_statement_count_does_not_grow_with_items(client, make_user, categories, count_statements):
+    counts = []
+    for items in (50, 300):
+        _, headers = make_user()
+        client.get("/api/v1/categories/", headers=headers)  # Caches the user snapshot
+        body, count, kinds = _post_bulk(client, count_statements, headers, _bulk_rows(categories(headers), items))
+        assert body["created"] == items
+        assert kinds["INSERT INTO transactions"] == 1
+        assert kinds["INSERT INTO daily_rollups"] == 1
+        assert kinds["INSERT INTO monthly_rollups"] == 1
+        counts.append(count)
+    # Includes the subscription refresh the request schedules
+    assert counts[0] == counts[1]
+    assert counts[1] <= 20
+
+
+def test_bulk_ids_match_items_and_rollups(client, user, categories):
+    _, headers = user
+    rows = _bulk_rows(categories(headers), 120)
+    body = client.post("/api/v1/transactions/bulk", json={"transactions": rows}, headers=headers).json()
+
+    for result in body["results"][::17]:
+        transaction = client.get(f"/api/v1/transactions/{result['id']}", headers=headers).json()
+        assert transaction["description"] == rows[result["index"]]["description"]
+
+    summary = client.get(
+        "/api/v1/analytics/summary", headers=headers, params={"start_date": "2026-01-01", "end_date": "2026-12-31"}
+    ).json()
+    total = sum(float(row["amount"]) for row in rows)
+    assert summary["total_expenses"] == total
+
+    # A second batch into the same days increments the existing buckets
+    client.post("/api/v1/transactions/bulk", json={"transactions": rows}, headers=headers)
+    summary = client.get(
+        "/api/v1/analytics/summary", headers=headers, params={"start_date": "2026-01-01", "end_date": "2026-12-31"}
+    ).json()
+    assert summary["total_expenses"] == 2 * total
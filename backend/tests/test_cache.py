@@ -0,0 +1,62 @@
+"""Analytics cache invalidation and read-your-writes routing"""
+
+from app.utils.cache import AnalyticsCache, MemoryCacheBackend, analytics_cache
+from app.utils.read_routing import ReadRouter
+
+
+def _cache(**options):
+    return AnalyticsCache(MemoryCacheBackend(max_entries=options.pop("max_entries", 10), max_bytes=1024), ttl=60, **options)
+
+
+def test_write_in_one_worker_invalidates_the_others(db, user):
+    user_id, _ = user
+    # Two worker processes, each with its own in-memory backend
+    first, second = _cache(), _cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total": len(calls)}
+
+    assert first.get_or_compute(db, user_id, "summary", {}, compute) == {"total": 1}
+    assert first.get_or_compute(db, user_id, "summary", {}, compute) == {"total": 1}
+
+    second.invalidate_user(db, user_id)
+    db.commit()
+    assert first.get_or_compute(db, user_id, "summary", {}, compute) == {"total": 2}
+
+
+def test_rolled_back_write_keeps_the_version(db, user):
+    user_id, _ = user
+    cache = _cache()
+    version = cache.data_version(db, user_id)
+    cache.invalidate_user(db, user_id)
+    db.rollback()
+    assert cache.data_version(db, user_id) == version
+
+
+def test_write_in_one_worker_routes_reads_to_the_primary_in_the_others(db, make_user):
+    (writer, _), (reader, _) = make_user(), make_user()
+    # Two worker processes, each with its own router
+    first, second = ReadRouter(enabled=True, recent_write_window=60), ReadRouter(enabled=True, recent_write_window=60)
+
+    analytics_cache.invalidate_user(db, writer)
+    db.commit()
+    assert not first.use_replica(writer)
+    assert not second.use_replica(writer)
+    assert second.use_replica(reader)
+
+
+def test_rolled_back_write_leaves_no_marker(db, user):
+    user_id, _ = user
+    router = ReadRouter(enabled=True, recent_write_window=60)
+    analytics_cache.invalidate_user(db, user_id)
+    db.rollback()
+    assert router.use_replica(user_id)
+
+
+def test_marker_expires_after_the_window(db, user):
+    user_id, _ = user
+    analytics_cache.invalidate_user(db, user_id)
+    db.commit()
+    assert ReadRouter(enabled=True, recent_write_window=0).use_replica(user_id)
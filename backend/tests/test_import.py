@@ -0,0 +1,83 @@
+"""Statement imports: amount signs, encodings, OFX categories and dedup"""
+
+OFX = b"""OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260105120000<TRNAMT>-42.10<NAME>Bread &amp; Butter<MEMO>Card &lt;1234&gt;</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260110<TRNAMT>2500.00<NAME>ACME Payroll</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _import(client, headers, content, filename="statement.csv", **params):
+    return client.post(
+        "/api/v1/transactions/import", headers=headers, params=params,
+        files={"file": (filename, content, "application/octet-stream")}
+    )
+
+
+def _category_ids(client, headers):
+    return {category["name"]: category["id"] for category in client.get("/api/v1/categories/", headers=headers).json()}
+
+
+def test_negative_amounts_are_rejected_unless_signed(client, user):
+    _, headers = user
+    csv = b"date,amount,description,category\n2026-01-02,-12.50,Refund,Shopping\n2026-01-03,30.00,Shoes,Shopping\n"
+
+    summary = _import(client, headers, csv).json()
+    assert (summary["imported"], summary["failed"]) == (1, 1)
+    assert "Negative amount" in summary["errors"][0]["error"]
+
+    signed = b"date,amount,description,category\n2026-02-02,-12.50,Groceries,Shopping\n2026-02-03,12.50,Refund,Shopping\n"
+    summary = _import(client, headers, signed, amount_sign="signed").json()
+    assert (summary["imported"], summary["failed"]) == (1, 1)
+    assert "doesn't match expense category" in summary["errors"][0]["error"]
+
+    stored = client.get("/api/v1/transactions/", headers=headers, params={"start_date": "2026-02-01T00:00:00"}).json()
+    assert [(t["description"], t["amount"]) for t in stored] == [("Groceries", "12.50")]
+
+
+def test_undecodable_csv_is_reported_not_a_server_error(client, user):
+    _, headers = user
+    latin1 = "date,amount,description,category\n2026-01-02,4.20,Café crème,Food & Dining\n".encode("latin-1")
+
+    response = _import(client, headers, latin1)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 0
+    assert "Not valid utf-8-sig text" in response.json()["errors"][0]["error"]
+
+    summary = _import(client, headers, latin1, encoding="latin-1").json()
+    assert summary["imported"] == 1
+    assert client.get("/api/v1/transactions/", headers=headers).json()[0]["description"] == "Café crème"
+
+    assert _import(client, headers, latin1, encoding="no-such-codec").status_code == 400
+
+
+def test_ofx_needs_a_default_category_and_uses_the_amount_sign(client, user):
+    _, headers = user
+    assert _import(client, headers, OFX, filename="statement.ofx").status_code == 400
+
+    ids = _category_ids(client, headers)
+    summary = _import(
+        client, headers, OFX, filename="statement.ofx",
+        default_category_id=ids["Food & Dining"], default_income_category_id=ids["Salary"]
+    ).json()
+    assert (summary["imported"], summary["failed"]) == (2, 0)
+
+    stored = {t["description"]: t for t in client.get("/api/v1/transactions/", headers=headers).json()}
+    assert stored["Bread & Butter"]["notes"] == "Card <1234>"
+    assert stored["Bread & Butter"]["category"]["name"] == "Food & Dining"
+    assert stored["ACME Payroll"]["category"]["name"] == "Salary"
+    assert stored["ACME Payroll"]["amount"] == "2500.00"
+
+
+def test_reimport_skips_lines_already_in_the_ledger(client, user):
+    _, headers = user
+    ids = _category_ids(client, headers)
+    client.post("/api/v1/transactions/", headers=headers, json={
+        "amount": "8.00", "description": "Cinema", "category_id": ids["Entertainment"],
+        "transaction_date": "2026-03-01T00:00:00",
+    })
+    csv = b"date,amount,description,category\n2026-03-01,8.00,cinema,Entertainment\n2026-03-02,9.00,Popcorn,Entertainment\n"
+
+    assert _import(client, headers, csv).json()["duplicates"] == 1
+    assert _import(client, headers, csv).json()["duplicates"] == 2
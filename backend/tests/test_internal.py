@@ -0,0 +1,33 @@
+"""/metrics and /internal/* are only served with the internal API token"""
+
+import pytest
+from app.core.config import settings
+
+INTERNAL_PATHS = [
+    "/metrics",
+    "/internal/cache-stats",
+    "/internal/auth-cache-stats",
+    "/internal/password-hashing-stats",
+    "/internal/db-pool-stats",
+    "/internal/job-stats",
+]
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+def test_hidden_without_a_configured_token(client, path, monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "")
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize("path", INTERNAL_PATHS)
+def test_require_the_token(client, path, monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "internal-secret")
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer internal-secret"}).status_code == 200
+
+
+def test_user_tokens_are_not_internal_tokens(client, user, monkeypatch):
+    _, headers = user
+    monkeypatch.setattr(settings, "internal_api_token", "internal-secret")
+    assert client.get("/metrics", headers=headers).status_code == 401
@@ -0,0 +1,145 @@
+"""Jobs are claimed, retried, cancelled and executed end to end through the runner's steps"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+from app.models.rollup import DailyRollup
+from app.services import job_service, rollup_service
+from app.services.job_service import claim_next_job, execute_job
+from app.utils.database import SessionLocal
+
+
+def _submit(client, headers, job_type, params=None):
+    response = client.post("/api/v1/jobs/", headers=headers, json={"type": job_type, "params": params or {}})
+    assert response.status_code == 202, response.text
+    return response.json()["id"]
+
+
+def _claim(worker="test-worker"):
+    db = SessionLocal()
+    try:
+        return claim_next_job(db, worker)
+    finally:
+        db.close()
+
+
+def _run_next(worker="test-worker"):
+    job_id = _claim(worker)
+    if job_id is not None:
+        execute_job(job_id, worker)
+    return job_id
+
+
+def _job(db, job_id) -> Job:
+    db.expire_all()
+    return db.query(Job).filter(Job.id == job_id).one()
+
+
+@pytest.fixture(autouse=True)
+def _no_leftover_jobs(db):
+    # Other tests' jobs would be claimed first
+    db.query(Job).filter(Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])).update(
+        {Job.status: JobStatus.CANCELLED}, synchronize_session=False
+    )
+    db.commit()
+
+
+def _daily_rollups(db, user_id):
+    db.expire_all()
+    return sorted(
+        (str(row.period_start), row.category_id, float(row.total_amount), row.transaction_count)
+        for row in db.query(DailyRollup).filter(DailyRollup.user_id == user_id)
+    )
+
+
+def _fail(ctx, params):
+    raise RuntimeError("report backend unavailable")
+
+
+def test_claims_oldest_pending_job_once(client, db, user):
+    _, headers = user
+    first = _submit(client, headers, "yearly_report", {"year": 2026})
+    second = _submit(client, headers, "yearly_report", {"year": 2025})
+
+    assert _claim("a") == first
+    assert _claim("b") == second
+    assert _claim("c") is None
+
+    job = _job(db, first)
+    assert (job.status, job.worker, job.attempts) == (JobStatus.RUNNING, "a", 1)
+
+
+def test_failed_job_is_retried_with_backoff_then_fails(client, db, user, monkeypatch):
+    _, headers = user
+    monkeypatch.setitem(job_service.JOB_HANDLERS, "yearly_report", (job_service.YearlyReportJobParams, _fail))
+    job_id = _submit(client, headers, "yearly_report", {"year": 2026})
+
+    for attempt in range(1, settings.job_max_attempts):
+        before = datetime.utcnow()
+        assert _run_next() == job_id
+        job = _job(db, job_id)
+        assert (job.status, job.attempts, job.worker) == (JobStatus.PENDING, attempt, None)
+        assert "report backend unavailable" in job.error
+        backoff = timedelta(seconds=settings.job_retry_backoff_seconds * 2 ** (attempt - 1))
+        assert before + backoff <= job.run_after <= datetime.utcnow() + backoff
+
+        # Not runnable again until the backoff has passed
+        assert _claim() is None
+        job.run_after = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+    assert _run_next() == job_id
+    job = _job(db, job_id)
+    assert (job.status, job.attempts) == (JobStatus.FAILED, settings.job_max_attempts)
+
+
+def test_cancelling_pending_and_running_jobs(client, db, user):
+    _, headers = user
+    pending = _submit(client, headers, "yearly_report", {"year": 2026})
+    response = client.post(f"/api/v1/jobs/{pending}/cancel", headers=headers)
+    assert response.json()["status"] == "cancelled"
+    assert _claim() is None
+
+    running = _submit(client, headers, "yearly_report", {"year": 2026})
+    assert _claim() == running
+    response = client.post(f"/api/v1/jobs/{running}/cancel", headers=headers)
+    assert (response.json()["status"], response.json()["cancel_requested"]) == ("running", True)
+
+    # The handler stops at its first progress check
+    execute_job(running, "test-worker")
+    job = _job(db, running)
+    assert (job.status, job.result_path) == (JobStatus.CANCELLED, None)
+
+
+def test_result_download(client, user, add_transactions):
+    _, headers = user
+    add_transactions(headers, 50)
+    job_id = _submit(client, headers, "yearly_report", {"year": 2026})
+    assert client.get(f"/api/v1/jobs/{job_id}/result", headers=headers).status_code == 409
+
+    assert _run_next() == job_id
+    job = client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()
+    assert (job["status"], job["progress"], job["has_result"]) == ("succeeded", 1.0, True)
+
+    response = client.get(f"/api/v1/jobs/{job_id}/result", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    report = response.json()
+    assert report["year"] == 2026
+    assert report["total_expenses"] > 0
+
+
+def test_rebuild_job_heartbeats_without_blocking_on_its_own_writes(client, db, user, add_transactions, monkeypatch):
+    user_id, headers = user
+    add_transactions(headers, 100)
+    expected = _daily_rollups(db, user_id)
+    db.commit()
+    monkeypatch.setattr(rollup_service, "REBUILD_HEARTBEAT_ROWS", 10)
+    monkeypatch.setattr(job_service, "PROGRESS_INTERVAL", 0)
+
+    job_id = _submit(client, headers, "rebuild_rollups")
+    assert _run_next() == job_id
+    job = _job(db, job_id)
+    assert (job.status, job.error) == (JobStatus.SUCCEEDED, None)
+    assert _daily_rollups(db, user_id) == expected
@@ -0,0 +1,72 @@
+"""The Alembic history builds the models' schema and upgrades pre-migration databases"""
+
+import os
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def alembic(database_url, *args):
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", *args], cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": database_url}, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_upgrade_matches_models_and_downgrades(tmp_path):
+    url = f"sqlite:///{tmp_path}/fresh.db"
+    alembic(url, "upgrade", "head")
+    alembic(url, "check")  # Fails when the schema differs from the models
+
+    alembic(url, "downgrade", "base")
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        tables = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+    engine.dispose()
+    assert tables == ["alembic_version"]
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(BACKEND_DIR, "finance_dev.db")), reason="No development database")
+def test_stamp_and_upgrade_pre_migration_database(tmp_path):
+    path = tmp_path / "dev.db"
+    shutil.copy(os.path.join(BACKEND_DIR, "finance_dev.db"), path)
+    url = f"sqlite:///{path}"
+    alembic(url, "stamp", "0001")
+    alembic(url, "upgrade", "head")
+    alembic(url, "check")  # Fails when the schema differs from the models
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        def scalar(sql, **params):
+            return connection.execute(text(sql), params).scalar()
+
+        transactions = scalar("SELECT count(*) FROM transactions")
+        assert transactions > 0
+        assert scalar("SELECT count(*) FROM transactions WHERE content_hash IS NULL") == 0
+        assert scalar("SELECT count(*) FROM transactions WHERE merchant_key IS NULL") == 0
+        for table in ("daily_rollups", "monthly_rollups"):
+            assert scalar(f"SELECT sum(transaction_count) FROM {table}") == transactions
+            assert scalar(f"SELECT sum(total_amount) FROM {table}") == pytest.approx(scalar("SELECT sum(amount) FROM transactions"))
+
+        this_month = datetime.utcnow().date().replace(day=1)
+        for user_id in connection.execute(text("SELECT DISTINCT user_id FROM transactions")).scalars():
+            latest = connection.execute(text(
+                "SELECT checkpoint_date, balance FROM balance_checkpoints WHERE user_id = :user_id "
+                "ORDER BY checkpoint_date DESC LIMIT 1"
+            ), {"user_id": user_id}).one()
+            expected = scalar(
+                "SELECT sum(CASE WHEN c.type = 'INCOME' THEN t.amount ELSE -t.amount END) "
+                "FROM transactions t JOIN categories c ON c.id = t.category_id "
+                "WHERE t.user_id = :user_id AND t.transaction_date < :month",
+                user_id=user_id, month=this_month.isoformat()
+            )
+            assert latest.checkpoint_date == this_month.isoformat()
+            assert Decimal(str(latest.balance)) == Decimal(str(expected))
+    engine.dispose()
@@ -0,0 +1,50 @@
+"""Hashing slots are held until a worker finishes, and rejections are counted apart"""
+
+import time
+import pytest
+from app.utils.password_hashing import PasswordHasher, PasswordHashingOverloaded
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=0, timeout=30)
+    # Start the worker first, so later calls are picked up immediately
+    hasher._run(abs, -1)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_timed_out_call_keeps_its_slot_until_the_worker_finishes(hasher):
+    hasher.timeout = 0.2
+    with pytest.raises(PasswordHashingOverloaded):
+        hasher._run(time.sleep, 1.0)
+
+    # The worker is still busy, so there is no room for another call
+    assert hasher.in_flight == 1
+    with pytest.raises(PasswordHashingOverloaded):
+        hasher._run(abs, -1)
+
+    assert _wait_for(lambda: hasher.in_flight == 0)
+    assert hasher._run(abs, -1) == 1
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["timed_out"]) == (3, 1, 1)
+
+
+def test_rejections_are_not_counted_as_completed(hasher):
+    hasher._admission.acquire()
+    try:
+        for _ in range(3):
+            with pytest.raises(PasswordHashingOverloaded):
+                hasher._run(abs, -1)
+    finally:
+        hasher._admission.release()
+
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["timed_out"]) == (1, 3, 0)
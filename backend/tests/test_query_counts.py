@@ -0,0 +1,48 @@
+"""SQL statements per request must not grow with the number of rows returned"""
+
+# Statements once the user snapshot is cached: the page query (categories
+# joined) for the lists, one query per dashboard section plus the archive
+# probe made by the recent transactions section
+LIST_STATEMENTS = 1
+DASHBOARD_STATEMENTS = 5
+
+
+def _statements(client, count_statements, url, headers, **params):
+    client.get(url, headers=headers, params=params)  # Caches the user snapshot
+    with count_statements() as counter:
+        response = client.get(url, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return counter.count
+
+
+def test_list_statement_count_is_constant(client, make_user, add_transactions, count_statements):
+    counts = []
+    for rows in (5, 100):
+        _, headers = make_user()
+        add_transactions(headers, rows)
+        counts.append(_statements(client, count_statements, "/api/v1/transactions/", headers, limit=100))
+    assert counts == [LIST_STATEMENTS, LIST_STATEMENTS]
+
+
+def test_keyset_page_statement_count_is_constant(client, user, add_transactions, count_statements):
+    _, headers = user
+    add_transactions(headers, 150)
+    first = client.get("/api/v1/transactions/", headers=headers, params={"cursor": "", "limit": 50}).json()
+    assert len(first["data"]) == 50
+
+    assert _statements(client, count_statements, "/api/v1/transactions/", headers, cursor="", limit=50) == LIST_STATEMENTS
+    assert _statements(
+        client, count_statements, "/api/v1/transactions/", headers, cursor=first["next_cursor"], limit=50
+    ) == LIST_STATEMENTS
+
+
+def test_dashboard_statement_count_is_constant(client, make_user, add_transactions, count_statements):
+    counts = []
+    for rows in (5, 200):
+        _, headers = make_user()
+        add_transactions(headers, rows)
+        counts.append(_statements(
+            client, count_statements, "/api/v1/analytics/dashboard", headers,
+            start_date="2026-01-01", end_date="2026-06-30", year=2026, recent_limit=50
+        ))
+    assert counts == [DASHBOARD_STATEMENTS, DASHBOARD_STATEMENTS]
@@ -0,0 +1,121 @@
+"""List, keyset and analytics queries must seek through their indexes, not scan.
+
+Each endpoint is called once, the SELECTs it ran are replayed under the
+database's EXPLAIN, and every one touching a checked table must search it
+through the expected index. The SQLite variants run on the default test
+database; the Postgres ones only when DATABASE_URL is a Postgres database.
+"""
+
+import re
+import pytest
+from app.utils.database import engine
+
+dialect_only = {
+    name: pytest.mark.skipif(engine.dialect.name != name, reason=f"DATABASE_URL is not {name}")
+    for name in ("sqlite", "postgresql")
+}
+
+ROLLUP_UNIQUE = {
+    "daily_rollups": "uq_daily_rollups_user_period_category",
+    "monthly_rollups": "uq_monthly_rollups_user_period_category",
+}
+
+# (url, params, {table: index}) for each checked request; a category_id of None
+# is filled in with one of the user's categories
+CASES = [
+    ("/api/v1/transactions/", {"limit": 50}, {"transactions": "ix_transactions_user_date_id"}),
+    ("/api/v1/transactions/", {"cursor": "", "limit": 50}, {"transactions": "ix_transactions_user_date_id"}),
+    (
+        "/api/v1/transactions/", {"start_date": "2026-05-01T00:00:00", "end_date": "2026-06-01T00:00:00"},
+        {"transactions": "ix_transactions_user_date_id"},
+    ),
+    ("/api/v1/transactions/", {"category_id": None, "limit": 50}, {"transactions": "ix_transactions_user_category_date"}),
+    ("/api/v1/analytics/summary", {"start_date": "2026-03-01", "end_date": "2026-05-31"}, {"monthly_rollups": ROLLUP_UNIQUE["monthly_rollups"]}),
+    ("/api/v1/analytics/summary", {"start_date": "2026-03-10", "end_date": "2026-05-20"}, {"daily_rollups": ROLLUP_UNIQUE["daily_rollups"]}),
+    (
+        "/api/v1/analytics/spending-by-category", {"start_date": "2026-03-10", "end_date": "2026-05-20"},
+        {"daily_rollups": ROLLUP_UNIQUE["daily_rollups"]},
+    ),
+    ("/api/v1/analytics/monthly-trends", {"year": 2026}, {"monthly_rollups": ROLLUP_UNIQUE["monthly_rollups"]}),
+    ("/api/v1/analytics/recent-transactions", {"limit": 10}, {"transactions": "ix_transactions_user_date_id"}),
+]
+
+
+def _sqlite_searches(connection, statement, parameters):
+    """(table, index) of each index search in the plan"""
+    details = [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    searches = set()
+    for detail in details:
+        match = re.match(r"SEARCH (\w+)(?: AS \w+)? USING (?:COVERING )?INDEX (\w+) \(", detail)
+        if match:
+            searches.add(match.groups())
+    return searches, details
+
+
+def _postgres_searches(connection, statement, parameters):
+    # The test tables are tiny, so make the planner show whether an index can be used at all
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    details = [row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters)]
+    searches = set()
+    heap_table = None
+    for detail in details:
+        match = re.search(r"Index (?:Only )?Scan (?:Backward )?using (\w+) on (\w+)", detail)
+        if match:
+            searches.add((match.group(2), match.group(1)))
+        match = re.search(r"Bitmap Heap Scan on (\w+)", detail)
+        if match:
+            heap_table = match.group(1)
+        match = re.search(r"Bitmap Index Scan on (\w+)", detail)
+        if match:
+            searches.add((heap_table, match.group(1)))
+    return searches, details
+
+
+def _index_name(connection, table, index):
+    """SQLite names the index behind a unique constraint sqlite_autoindex_<table>_<n>"""
+    if connection.dialect.name != "sqlite" or not index.startswith("uq_"):
+        return index
+    for row in connection.exec_driver_sql(f"PRAGMA index_list({table})"):
+        if row.origin == "u":
+            return row.name
+    return index
+
+
+def _assert_plans(client, count_statements, headers, category_id, explain):
+    for url, params, expected in CASES:
+        if "category_id" in params:
+            params = {**params, "category_id": category_id}
+        with count_statements() as counter:
+            response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+
+        checked = set()
+        with engine.connect() as connection:
+            for statement, parameters in counter.executions:
+                if not statement.lstrip().upper().startswith("SELECT"):
+                    continue
+                for table, index in expected.items():
+                    if not re.search(rf"\b(?:FROM|JOIN) {table}\b", statement):
+                        continue
+                    searches, plan = explain(connection, statement, parameters)
+                    assert (table, _index_name(connection, table, index)) in searches, (url, params, statement, plan)
+                    checked.add(table)
+                connection.rollback()
+        assert checked == set(expected), (url, params, counter.statements)
+
+
+@pytest.fixture
+def ledger(client, user, categories, add_transactions):
+    _, headers = user
+    add_transactions(headers, 300)
+    return headers, categories(headers)[0]
+
+
+@dialect_only["sqlite"]
+def test_sqlite_queries_use_indexes(client, count_statements, ledger):
+    _assert_plans(client, count_statements, *ledger, _sqlite_searches)
+
+
+@dialect_only["postgresql"]
+def test_postgres_queries_use_indexes(client, count_statements, ledger):
+    _assert_plans(client, count_statements, *ledger, _postgres_searches)
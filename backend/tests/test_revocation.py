@@ -0,0 +1,40 @@
+"""The revocation list logs failed syncs and fails closed once it is stale"""
+
+import logging
+import time
+from app.utils import revocation
+from app.utils.revocation import RevocationList
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failing_sync_is_logged_and_goes_stale(caplog):
+    revocations = RevocationList(sync_interval=0.01, max_staleness=0.1)
+    revocations.start()
+    try:
+        assert not revocations.is_stale()
+
+        def unavailable():
+            raise ConnectionError("database unavailable")
+
+        revocations.sync = unavailable
+        with caplog.at_level(logging.ERROR, logger=revocation.__name__):
+            assert _wait_for(revocations.is_stale)
+        assert revocations.failures > 0
+        assert "Token revocation sync failed" in caplog.text
+    finally:
+        revocations.stop()
+
+
+def test_stale_list_rejects_tokens(client, user, monkeypatch):
+    _, headers = user
+    assert client.get("/api/v1/categories/", headers=headers).status_code == 200
+
+    monkeypatch.setattr(revocation.revocation_list, "is_stale", lambda: True)
+    response = client.get("/api/v1/categories/", headers=headers)
+    assert response.status_code == 503
@@ -0,0 +1,46 @@
+"""Incrementally maintained rollups equal a rebuild from the transactions"""
+
+from app.models.rollup import DailyRollup, MonthlyRollup
+from app.services import rollup_service
+from app.services.rollup_service import rebuild_rollups
+
+
+def _rollups(db, user_id):
+    db.expire_all()
+    return {
+        model.__tablename__: sorted(
+            (str(row.period_start), row.category_id, row.category_type.name, float(row.total_amount), row.transaction_count)
+            for row in db.query(model).filter(model.user_id == user_id, model.transaction_count != 0)
+        )
+        for model in (DailyRollup, MonthlyRollup)
+    }
+
+
+def test_rollups_follow_creates_updates_and_deletes(client, db, user, categories, add_transactions):
+    user_id, headers = user
+    ids = add_transactions(headers, 40)
+    income_id = categories(headers, "income")[0]
+
+    created = client.post("/api/v1/transactions/", headers=headers, json={
+        "amount": "1200.00", "description": "Salary", "category_id": income_id,
+        "transaction_date": "2026-05-28T09:00:00",
+    }).json()
+    client.put(f"/api/v1/transactions/{ids[0]}", headers=headers, json={"amount": "99.99", "transaction_date": "2026-02-01T08:00:00"})
+    client.put(f"/api/v1/transactions/{created['id']}", headers=headers, json={"transaction_date": "2026-06-02T09:00:00"})
+    for transaction_id in ids[5:10]:
+        assert client.delete(f"/api/v1/transactions/{transaction_id}", headers=headers).status_code == 200
+
+    incremental = _rollups(db, user_id)
+    rebuild_rollups(db, user_id)
+    assert incremental == _rollups(db, user_id)
+
+
+def test_rebuild_heartbeats_while_reading(db, user, add_transactions, monkeypatch):
+    user_id, headers = user
+    add_transactions(headers, 200)
+    monkeypatch.setattr(rollup_service, "REBUILD_HEARTBEAT_ROWS", 10)
+    beats = []
+
+    written = rebuild_rollups(db, user_id=user_id, heartbeat=lambda: beats.append(1))
+    # Once for the user, then once per REBUILD_HEARTBEAT_ROWS grouped rows
+    assert len(beats) == 1 + written // 10
@@ -0,0 +1,84 @@
+"""Subscription detection reads merchants through the stored merchant_key"""
+
+import logging
+from datetime import datetime, timedelta
+from app.models.subscription import Subscription
+from app.models.transaction import Transaction
+from app.services import subscription_service
+from app.services.subscription_service import refresh_all_subscriptions, refresh_subscriptions
+
+
+def _monthly(client, headers, category_id, description, amount, months=4):
+    start = datetime(2026, 1, 5, 9, 0)
+    rows = [
+        {
+            "amount": amount,
+            "description": f"{description} {index:02d}/26 #{4400 + index}",
+            "category_id": category_id,
+            "transaction_date": (start + timedelta(days=30 * index)).isoformat(),
+        }
+        for index in range(months)
+    ]
+    response = client.post("/api/v1/transactions/bulk", json={"transactions": rows}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_writes_store_the_normalized_merchant_key(client, db, user, categories):
+    user_id, headers = user
+    category_id = categories(headers)[0]
+    created = client.post("/api/v1/transactions/", headers=headers, json={
+        "amount": "9.99", "description": "NETFLIX.COM 12/03 #4411",
+        "category_id": category_id, "transaction_date": "2026-03-12T10:00:00",
+    }).json()
+    client.put(f"/api/v1/transactions/{created['id']}", headers=headers, json={"description": "Spotify AB 1234"})
+
+    keys = {key for (key,) in db.query(Transaction.merchant_key).filter(Transaction.user_id == user_id)}
+    assert keys == {"spotify ab"}
+
+
+def test_targeted_refresh_reads_only_the_given_merchants(client, db, user, categories, count_statements):
+    user_id, headers = user
+    category_id = categories(headers)[0]
+    _monthly(client, headers, category_id, "Netflix.com", "15.49")
+    _monthly(client, headers, category_id, "Gym Membership", "39.00")
+
+    merchants = {row.merchant_key for row in db.query(Subscription).filter(Subscription.user_id == user_id)}
+    assert merchants == {"netflix com", "gym membership"}
+
+    with count_statements() as counter:
+        assert refresh_subscriptions(db, user_id, merchant_keys={"netflix com"}) == 1
+    db.commit()
+    scans = [statement for statement in counter.statements if "FROM transactions" in statement and "merchant_key IN" in statement]
+    assert len(scans) == 1
+
+
+
+def _failing_for(user_id):
+    def refresh(db, refreshed_user_id, **options):
+        if refreshed_user_id == user_id:
+            raise RuntimeError("detection failed")
+        return original(db, refreshed_user_id, **options)
+
+    original = subscription_service.refresh_subscriptions
+    return refresh
+
+
+def test_failed_background_refresh_is_logged_once_and_not_raised(client, user, categories, monkeypatch, caplog):
+    user_id, headers = user
+    monkeypatch.setattr(subscription_service, "refresh_subscriptions", _failing_for(user_id))
+
+    with caplog.at_level(logging.ERROR, logger=subscription_service.__name__):
+        response = client.post("/api/v1/transactions/", headers=headers, json={
+            "amount": "9.99", "description": "Streaming", "category_id": categories(headers)[0],
+            "transaction_date": "2026-05-05T09:00:00",
+        })
+    assert response.status_code == 200
+    assert caplog.text.count("Subscription refresh failed") == 1
+
+
+def test_one_failing_user_does_not_hide_the_others(make_user, monkeypatch):
+    (failing, _), (healthy, _) = make_user(), make_user()
+    monkeypatch.setattr(subscription_service, "refresh_subscriptions", _failing_for(failing))
+
+    written = refresh_all_subscriptions(workers=1, user_ids=[failing, healthy])
+    assert written == {failing: None, healthy: 0}
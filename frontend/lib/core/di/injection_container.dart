@@ -20,6 +20,7 @@ import '../../features/dashboard/domain/usecases/create_transaction_usecase.dart
 import '../../features/dashboard/domain/usecases/get_balance_usecase.dart';
 import '../../features/dashboard/domain/usecases/get_categories_usecase.dart';
 import '../../features/dashboard/domain/usecases/get_recent_transactions_usecase.dart';
+import '../../features/dashboard/domain/usecases/get_transactions_usecase.dart';
 import '../../features/dashboard/presentation/bloc/dashboard_bloc.dart';
 // Features - Settings
 import '../../features/settings/presentation/bloc/settings_bloc.dart';
@@ -134,6 +135,7 @@ void _initDashboard() {
   // Use cases
   getIt.registerLazySingleton(() => GetBalanceUseCase(getIt<DashboardRepository>()));
   getIt.registerLazySingleton(() => GetRecentTransactionsUseCase(getIt<DashboardRepository>()));
+  getIt.registerLazySingleton(() => GetTransactionsUseCase(getIt<DashboardRepository>()));
   getIt.registerLazySingleton(() => CreateTransactionUseCase(getIt<DashboardRepository>()));
   getIt.registerLazySingleton(() => GetCategoriesUseCase(getIt<DashboardRepository>()));
 
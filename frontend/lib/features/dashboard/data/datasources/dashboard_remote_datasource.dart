@@ -1,12 +1,15 @@
 import '../../../../core/network/dio_client.dart';
+import '../../domain/entities/transactions_page.dart';
 import '../models/balance_model.dart';
 import '../models/transaction_model.dart';
 
 abstract class DashboardRemoteDataSource {
   Future<BalanceModel> getBalance();
   Future<List<TransactionModel>> getRecentTransactions({int limit = 5});
-  Future<List<TransactionModel>> getTransactions({
-    int page = 1,
+  /// Page of transactions after [cursor] (the first page when null), with
+  /// the cursor of the page that follows it.
+  Future<TransactionsPage> getTransactions({
+    String? cursor,
     int limit = 20,
     String? category,
     DateTime? startDate,
@@ -64,16 +67,17 @@ class DashboardRemoteDataSourceImpl implements DashboardRemoteDataSource {
   }
 
   @override
-  Future<List<TransactionModel>> getTransactions({
-    int page = 1,
+  Future<TransactionsPage> getTransactions({
+    String? cursor,
     int limit = 20,
     String? category,
     DateTime? startDate,
     DateTime? endDate,
   }) async {
     try {
+      // An empty cursor requests the first page in keyset-pagination mode
       final queryParams = <String, dynamic>{
-        'page': page,
+        'cursor': cursor ?? '',
         'limit': limit,
       };
 
@@ -94,8 +98,19 @@ class DashboardRemoteDataSourceImpl implements DashboardRemoteDataSource {
         queryParameters: queryParams,
       );
 
-      final List<dynamic> data = response.data['data'] ?? response.data;
-      return data.map((json) => TransactionModel.fromJson(json)).toList();
+      final raw = response.data;
+      final List<dynamic> data;
+      String? nextCursor;
+      if (raw is Map<String, dynamic>) {
+        data = raw['data'] as List<dynamic>? ?? [];
+        nextCursor = raw['next_cursor'] as String?;
+      } else {
+        data = raw as List<dynamic>;
+      }
+      return TransactionsPage(
+        items: data.map((json) => TransactionModel.fromJson(json)).toList(),
+        nextCursor: nextCursor,
+      );
     } catch (e) {
       throw Exception('Failed to get transactions: ${e.toString()}');
     }
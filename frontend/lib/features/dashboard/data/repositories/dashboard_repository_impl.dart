@@ -2,6 +2,7 @@ import 'package:dartz/dartz.dart';
 import '../../../../core/errors/failures.dart';
 import '../../domain/entities/balance_entity.dart';
 import '../../domain/entities/transaction_entity.dart';
+import '../../domain/entities/transactions_page.dart';
 import '../../domain/repositories/dashboard_repository.dart';
 import '../datasources/dashboard_remote_datasource.dart';
 
@@ -35,22 +36,22 @@ class DashboardRepositoryImpl implements DashboardRepository {
   }
 
   @override
-  Future<Either<Failure, List<TransactionEntity>>> getTransactions({
-    int page = 1,
+  Future<Either<Failure, TransactionsPage>> getTransactions({
+    String? cursor,
     int limit = 20,
     String? category,
     DateTime? startDate,
     DateTime? endDate,
   }) async {
     try {
-      final transactions = await remoteDataSource.getTransactions(
-        page: page,
+      final page = await remoteDataSource.getTransactions(
+        cursor: cursor,
         limit: limit,
         category: category,
         startDate: startDate,
         endDate: endDate,
       );
-      return Right(transactions);
+      return Right(page);
     } catch (e) {
       return Left(ServerFailure(e.toString()));
     }
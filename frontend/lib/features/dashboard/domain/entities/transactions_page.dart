@@ -0,0 +1,21 @@
+import 'package:equatable/equatable.dart';
+import 'transaction_entity.dart';
+
+/// One keyset-paginated page of transactions.
+///
+/// Pass [nextCursor] back as the cursor to load the following page; it is
+/// null on the last page.
+class TransactionsPage extends Equatable {
+  final List<TransactionEntity> items;
+  final String? nextCursor;
+
+  const TransactionsPage({
+    required this.items,
+    this.nextCursor,
+  });
+
+  bool get hasMore => nextCursor != null;
+
+  @override
+  List<Object?> get props => [items, nextCursor];
+}
@@ -2,12 +2,13 @@ import 'package:dartz/dartz.dart';
 import '../../../../core/errors/failures.dart';
 import '../entities/balance_entity.dart';
 import '../entities/transaction_entity.dart';
+import '../entities/transactions_page.dart';
 
 abstract class DashboardRepository {
   Future<Either<Failure, BalanceEntity>> getBalance();
   Future<Either<Failure, List<TransactionEntity>>> getRecentTransactions({int limit = 5});
-  Future<Either<Failure, List<TransactionEntity>>> getTransactions({
-    int page = 1,
+  Future<Either<Failure, TransactionsPage>> getTransactions({
+    String? cursor,
     int limit = 20,
     String? category,
     DateTime? startDate,
@@ -0,0 +1,27 @@
+import 'package:dartz/dartz.dart';
+import '../../../../core/errors/failures.dart';
+import '../entities/transactions_page.dart';
+import '../repositories/dashboard_repository.dart';
+
+class GetTransactionsUseCase {
+  final DashboardRepository repository;
+
+  GetTransactionsUseCase(this.repository);
+
+  /// Loads the page after [cursor], or the first page when it is null.
+  Future<Either<Failure, TransactionsPage>> call({
+    String? cursor,
+    int limit = 20,
+    String? category,
+    DateTime? startDate,
+    DateTime? endDate,
+  }) async {
+    return await repository.getTransactions(
+      cursor: cursor,
+      limit: limit,
+      category: category,
+      startDate: startDate,
+      endDate: endDate,
+    );
+  }
+}